@@ -3,41 +3,201 @@ Module ChessAI
 ----------------
 """
 
+from collections import OrderedDict
 from typing import List, Tuple, Dict, Any, Optional, Callable
 import random
+import time
 import ChessEngine
+import ChessCache
+import ChessEval
 
 CHECKMATE: int = 1000
 DEPTH: int = 3  # Profondeur maximale
+MAX_DEPTH: int = 64  # Profondeur maximale d'une recherche limitée par le temps ou les noeuds
+# Un score de mat vaut CHECKMATE moins le nombre de demi-coups avant le mat
+MATE_THRESHOLD: int = CHECKMATE - MAX_DEPTH
 
-def findBestMove(game_state: ChessEngine.GameState, valid_moves: List[ChessEngine.Move], return_queue: Any) -> None:
+# Poids des termes de scoreBoard (un poids nul désactive le terme)
+EVAL_PARAMS: Dict[str, float] = {
+    "center_bonus": 0.5,         # Par pièce sur une case centrale
+    "king_safety_penalty": 0.5,  # Par pièce ennemie adjacente au roi du camp au trait
+    "mobility_bonus": 0.1,       # Par coup disponible pour le camp au trait
+    "repetition_penalty": 10,    # Par occurrence de la position courante
+    "doubled_pawn_penalty": 0.2,   # Par pion doublé
+    "isolated_pawn_penalty": 0.2,  # Par pion sans pion ami sur les colonnes voisines
+    "backward_pawn_penalty": 0.1,  # Par pion arriéré dont la case d'avance est contrôlée
+    "passed_pawn_bonus": 0.1,      # Par rangée d'avance d'un pion passé
+    "pawn_shield_bonus": 0.1,      # Par pion ami devant le roi
+}
+
+# Caches d'évaluation (taille fixe, en bits) : évaluation statique par position et structure de pions
+EVAL_CACHE_BITS: int = 16
+PAWN_HASH_BITS: int = 14
+EVAL_CACHE_SETS: int = 2  # Jeux de poids gardant chacun leurs caches (ChessMatch : un par moteur)
+EVAL_CACHE = ChessEval.HashTable(EVAL_CACHE_BITS)
+PAWN_HASH = ChessEval.HashTable(PAWN_HASH_BITS)
+_eval_cache_params: Tuple[float, ...] = ()  # EVAL_PARAMS avec lesquels EVAL_CACHE et PAWN_HASH ont été remplis
+# Caches des autres jeux de poids récents, du moins au plus récemment utilisé
+_inactive_eval_caches: "OrderedDict[Tuple[float, ...], Tuple[ChessEval.HashTable, ChessEval.HashTable]]" = OrderedDict()
+
+class SearchStopped(Exception):
+    """Levée lorsque la recherche doit s'interrompre (temps, noeuds ou arrêt demandé)."""
+
+class SearchInfo:
+    """
+    Statistiques et limites d'une recherche : nombre de noeuds visités, profondeur
+    atteinte, score du meilleur coup (du point de vue du camp au trait) et
+    variante principale. Les limites (noeuds, échéance, événement d'arrêt) sont
+    optionnelles ; la recherche s'interrompt dès que l'une d'elles est atteinte.
+    """
+
+    def __init__(self, max_nodes: Optional[int] = None, deadline: Optional[float] = None,
+                 stop_event: Any = None, info_callback: Optional[Callable[["SearchInfo"], None]] = None,
+                 tt_max_entries: Optional[int] = None) -> None:
+        self.nodes: int = 0
+        self.depth: int = 0
+        self.score: int = 0
+        self.pv: List[ChessEngine.Move] = []
+        self.start_time: float = time.perf_counter()
+        self.max_nodes = max_nodes
+        self.deadline = deadline  # Échéance en secondes (horloge time.perf_counter)
+        self.stop_event = stop_event  # threading.Event ou multiprocessing.Event
+        self.info_callback = info_callback  # Appelée à la fin de chaque itération
+        self.tt_max_entries = tt_max_entries
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def should_stop(self) -> bool:
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            return True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return True
+        return self.stop_event is not None and self.stop_event.is_set()
+
+class ResultSender:
+    """
+    Extrémité d'envoi d'un multiprocessing.Pipe présentée comme une file
+    (put) : findBestMove y dépose son coup. L'extrémité de lecture est une
+    Connection, attendue par multiprocessing.connection.wait avec le sentinel
+    du processus.
+    """
+
+    def __init__(self, connection: Any) -> None:
+        self.connection = connection
+
+    def put(self, result: Any) -> None:
+        self.connection.send(result)
+        self.connection.close()
+
+def findBestMove(game_state: ChessEngine.GameState, valid_moves: List[ChessEngine.Move], return_queue: Any,
+                 cache_path: Optional[str] = None) -> None:
     """
     Cherche le meilleur coup en itérant en profondeur.
+    Si cache_path (fichier du cache d'analyse persistant) est donné, une
+    position déjà analysée à cette profondeur est jouée sans recherche, et
+    chaque nouvelle analyse y est enregistrée. Le chemin est un argument, et
+    non une variable du module, pour être transmis au processus de l'IA quelle
+    que soit la méthode de démarrage (fork ou spawn). Les positions déjà
+    rencontrées dans la partie sont toujours recherchées : le cache ne connaît
+    pas l'historique des répétitions.
     """
+    if cache_path is None or game_state.position_history.get(game_state.get_position_key(), 0) > 1:
+        best_move, _ = searchBestMove(game_state, valid_moves, DEPTH)
+        return_queue.put(best_move)
+        return
+    with ChessCache.AnalysisCache(cache_path) as cache:
+        entry = cache.lookup(game_state, DEPTH, EVAL_PARAMS)
+        best_move = game_state.parse_uci_move(entry["move"]) if entry else None
+        if best_move is None:
+            best_move, info = searchBestMove(game_state, valid_moves, DEPTH)
+            if best_move is not None:
+                cache.store(game_state, info.depth, EVAL_PARAMS, best_move, info.score, info.pv)
+    return_queue.put(best_move)
+
+def searchBestMove(game_state: ChessEngine.GameState, valid_moves: List[ChessEngine.Move], depth: int = DEPTH,
+                   search_info: Optional[SearchInfo] = None) -> Tuple[Optional[ChessEngine.Move], SearchInfo]:
+    """
+    Approfondissement itératif jusqu'à la profondeur donnée.
+    Retourne le meilleur coup trouvé et les statistiques de la recherche.
+    Si une limite de search_info est atteinte, le coup de la dernière
+    itération complète est retourné (None si aucune n'a abouti).
+    """
+    if search_info is None:
+        search_info = SearchInfo()
     best_move: Optional[ChessEngine.Move] = None
     transposition_table: Dict[int, Dict[str, Any]] = {}
-    for current_depth in range(1, DEPTH + 1):
-        best_score, best_move = negamax(game_state, valid_moves, current_depth, -CHECKMATE, CHECKMATE, 1 if game_state.white_to_move else -1, transposition_table)
-    return_queue.put(best_move)
+    root_ply = len(game_state.move_log)
+    for current_depth in range(1, depth + 1):
+        try:
+            best_score, move = negamax(game_state, valid_moves, current_depth, -CHECKMATE, CHECKMATE, 1 if game_state.white_to_move else -1, transposition_table, search_info)
+        except SearchStopped:
+            # Remet le plateau dans l'état de la racine
+            while len(game_state.move_log) > root_ply:
+                game_state.undoMove()
+            break
+        if move is None:
+            break
+        best_move = move
+        search_info.depth = current_depth
+        search_info.score = best_score
+        search_info.pv = extractPV(game_state, best_move, transposition_table, current_depth)
+        if search_info.info_callback is not None:
+            search_info.info_callback(search_info)
+        if search_info.should_stop():
+            break
+    return best_move, search_info
 
-def negamax(game_state: ChessEngine.GameState, valid_moves: List[ChessEngine.Move], depth: int, alpha: int, beta: int, turn_multiplier: int, transposition_table: Dict[int, Dict[str, Any]]) -> Tuple[int, Optional[ChessEngine.Move]]:
+def extractPV(game_state: ChessEngine.GameState, best_move: Optional[ChessEngine.Move],
+              transposition_table: Dict[int, Dict[str, Any]], depth: int) -> List[ChessEngine.Move]:
+    """
+    Reconstruit la variante principale en suivant les meilleurs coups
+    mémorisés dans la table de transposition.
+    """
+    pv: List[ChessEngine.Move] = []
+    move = best_move
+    while move is not None and len(pv) < depth:
+        pv.append(move)
+        game_state.makeMove(move, validate=False)
+        entry = transposition_table.get(game_state.get_position_key())
+        move = entry.get('move') if entry else None
+        if move is not None and move not in game_state.getValidMoves():
+            move = None
+    for _ in pv:
+        game_state.undoMove()
+    return pv
+
+def negamax(game_state: ChessEngine.GameState, valid_moves: List[ChessEngine.Move], depth: int, alpha: int, beta: int, turn_multiplier: int, transposition_table: Dict[int, Dict[str, Any]], search_info: Optional[SearchInfo] = None) -> Tuple[int, Optional[ChessEngine.Move]]:
     """
     Fonction récursive NegaMax avec élagage alpha‑beta.
     """
-    board_hash: int = get_board_hash(game_state.board, game_state.white_to_move)
+    if search_info is not None:
+        search_info.nodes += 1
+        if search_info.nodes & 31 == 0 and search_info.should_stop():
+            raise SearchStopped()
+    board_hash: int = game_state.get_position_key()
     if board_hash in transposition_table and transposition_table[board_hash]['depth'] >= depth:
         return transposition_table[board_hash]['score'], None
     if depth == 0:
         return turn_multiplier * scoreBoard(game_state), None
+    if not valid_moves:
+        # Mat, ou nulle (pat, 50 coups, répétition, matériel insuffisant)
+        return (-CHECKMATE if game_state.checkmate and not game_state.stalemate else 0), None
 
     valid_moves.sort(key=lambda move: moveOrderingHeuristic(game_state, move), reverse=True)
     max_score: int = -CHECKMATE
     best_move: Optional[ChessEngine.Move] = None
     for move in valid_moves:
         game_state.makeMove(move, validate=False)
-        next_moves = game_state.getValidMoves()
-        score, _ = negamax(game_state, next_moves, depth - 1, -beta, -alpha, -turn_multiplier, transposition_table)
+        # Les feuilles n'ont pas besoin de la liste des coups : scoreBoard détecte seul les fins de partie
+        next_moves = game_state.getValidMoves() if depth > 1 else []
+        score, _ = negamax(game_state, next_moves, depth - 1, -beta, -alpha, -turn_multiplier, transposition_table, search_info)
         score = -score
+        # Un mat plus lointain vaut un peu moins : le plus court est préféré
+        if score > MATE_THRESHOLD:
+            score -= 1
+        elif score < -MATE_THRESHOLD:
+            score += 1
         game_state.undoMove()
         if score > max_score:
             max_score = score
@@ -45,9 +205,22 @@ def negamax(game_state: ChessEngine.GameState, valid_moves: List[ChessEngine.Mov
         alpha = max(alpha, score)
         if alpha >= beta:
             break
-    transposition_table[board_hash] = {'score': max_score, 'depth': depth}
+    if search_info is not None and search_info.tt_max_entries is not None \
+            and len(transposition_table) >= search_info.tt_max_entries:
+        transposition_table.clear()
+    transposition_table[board_hash] = {'score': max_score, 'depth': depth, 'move': best_move}
     return max_score, best_move
 
+def mateDistance(score: int) -> Optional[int]:
+    """
+    Nombre de coups avant le mat pour un score de mat (négatif si le camp au
+    trait est maté), None pour un score ordinaire.
+    """
+    if abs(score) <= MATE_THRESHOLD:
+        return None
+    moves = (CHECKMATE - abs(score) + 1) // 2
+    return moves if score > 0 else -moves
+
 def moveOrderingHeuristic(game_state: ChessEngine.GameState, move: ChessEngine.Move) -> int:
     """
     Calcule un score pour ordonner les coups.
@@ -60,46 +233,112 @@ def moveOrderingHeuristic(game_state: ChessEngine.GameState, move: ChessEngine.M
         score += 15
     # Simulation pour détecter la répétition
     game_state.makeMove(move, validate=False)
-    pos_hash = game_state.get_board_hash_str()
+    pos_hash = game_state.get_position_key()
     game_state.undoMove()
     if pos_hash in game_state.position_history:
         score -= 20  # Pénalité pour position répétée
     return score
 
+def clear_eval_caches() -> None:
+    """
+    Vide EVAL_CACHE et PAWN_HASH et oublie les caches des autres jeux de
+    poids. À appeler quand l'évaluation change sans que EVAL_PARAMS change
+    (tables de position, valeurs des pièces), ou pour mesurer à froid.
+    """
+    EVAL_CACHE.clear()
+    PAWN_HASH.clear()
+    _inactive_eval_caches.clear()
+
+def _select_eval_caches(params: Tuple[float, ...]) -> None:
+    """
+    Installe dans EVAL_CACHE et PAWN_HASH les caches du jeu de poids params.
+    Les caches précédents sont mis de côté : deux configurations qui alternent
+    (match entre moteurs aux poids différents) gardent chacune leurs entrées.
+    Au-delà de EVAL_CACHE_SETS jeux, les tables du plus ancien sont vidées et réutilisées.
+    """
+    global EVAL_CACHE, PAWN_HASH, _eval_cache_params
+    caches = _inactive_eval_caches.pop(params, None)
+    if caches is None and _inactive_eval_caches and len(_inactive_eval_caches) >= EVAL_CACHE_SETS - 1:
+        caches = _inactive_eval_caches.popitem(last=False)[1]
+        for table in caches:
+            table.clear()
+    _inactive_eval_caches[_eval_cache_params] = (EVAL_CACHE, PAWN_HASH)
+    if caches is None:
+        caches = (ChessEval.HashTable(EVAL_CACHE_BITS), ChessEval.HashTable(PAWN_HASH_BITS))
+    EVAL_CACHE, PAWN_HASH = caches
+    _eval_cache_params = params
+
 def scoreBoard(game_state: ChessEngine.GameState) -> int:
     """
-    Évalue le plateau en prenant en compte plusieurs critères :
+    Évalue le plateau du point de vue des blancs : nulle, évaluation statique
+    (mémorisée dans EVAL_CACHE) et pénalité de répétition, qui dépend de
+    l'historique et n'est donc pas mise en cache.
+    """
+    if game_state.is_draw():
+        return 0
+    params = tuple(EVAL_PARAMS.values())
+    if params != _eval_cache_params:
+        _select_eval_caches(params)
+    # La clé de position ne couvre ni les roques ni la prise en passant, dont dépend la mobilité
+    key = game_state.get_position_key()
+    check = (game_state.castling, game_state.enpassant_possible)
+    entry = EVAL_CACHE.get(key, check)
+    if entry is None:
+        entry = staticEval(game_state)
+        EVAL_CACHE.put(key, entry, check)
+    total_score, terminal = entry
+    if terminal:
+        return int(total_score)
+
+    # Pénalité pour répétition de position
+    repetition = game_state.position_history.get(key, 0)
+    if repetition:
+        total_score -= repetition * EVAL_PARAMS["repetition_penalty"]
+
+    return int(total_score)
+
+def staticEval(game_state: ChessEngine.GameState) -> Tuple[float, bool]:
+    """
+    Évaluation ne dépendant que de la position, avec un indicateur de fin de
+    partie (mat ou pat). Critères pris en compte :
+      - Mat et pat
       - Valeur matérielle et positionnelle
       - Contrôle du centre (bonus pour les pièces sur les cases centrales)
       - Sécurité du roi (pénalité si des pièces ennemies se trouvent autour du roi)
       - Mobilité (bonus pour un grand nombre de coups possibles)
-      - Pénalité en cas de répétition de position
+      - Structure de pions et bouclier du roi (ChessEval, structure mémorisée dans PAWN_HASH)
     """
-    if game_state.checkmate:
-        return -CHECKMATE if game_state.white_to_move else CHECKMATE
-    elif game_state.stalemate:
-        return 0
+    # Fin de partie : la liste complète des coups n'est générée que si la mobilité est évaluée
+    mobility: Optional[int] = None
+    if EVAL_PARAMS["mobility_bonus"]:
+        mobility = len(game_state.getLegalMoves())
+        has_move = mobility > 0
+    else:
+        has_move = game_state.has_legal_move()
+    if not has_move:
+        if game_state.checkForPinsAndChecks()[0]:
+            return (-CHECKMATE if game_state.white_to_move else CHECKMATE), True
+        return 0, True
 
     total_score: float = 0
-    center_bonus: float = 0.5
+    center_bonus: float = EVAL_PARAMS["center_bonus"]
     center_squares: List[Tuple[int, int]] = [(3,3), (3,4), (4,3), (4,4)]
 
-    # Valeur matériel et positionnelle
-    for r in range(ChessEngine.DIMENSION):
-        for c in range(ChessEngine.DIMENSION):
-            piece = game_state.board[r][c]
-            if piece != "--":
-                piece_value = ChessEngine.piece_score.get(piece[1], 0)
-                position_score = 0
-                if piece[1] != "K":
-                    position_score = ChessEngine.piece_position_scores.get(piece, [[0]*ChessEngine.DIMENSION]*ChessEngine.DIMENSION)[r][c]
-                # Bonus pour le contrôle du centre
-                if (r, c) in center_squares:
-                    position_score += center_bonus
-                if piece[0] == "w":
-                    total_score += piece_value + position_score
-                else:
-                    total_score -= piece_value + position_score
+    # Valeur matériel et positionnelle (seules les cases occupées sont visitées, dans l'ordre du plateau)
+    occupied = game_state.get_piece_squares("w") | game_state.get_piece_squares("b")
+    for r, c in sorted(occupied):
+        piece = game_state.board[r][c]
+        piece_value = ChessEngine.piece_score.get(piece[1], 0)
+        position_score = 0
+        if piece[1] != "K":
+            position_score = ChessEngine.piece_position_scores.get(piece, [[0]*ChessEngine.DIMENSION]*ChessEngine.DIMENSION)[r][c]
+        # Bonus pour le contrôle du centre
+        if (r, c) in center_squares:
+            position_score += center_bonus
+        if piece[0] == "w":
+            total_score += piece_value + position_score
+        else:
+            total_score -= piece_value + position_score
 
     # Sécurité du roi : pénalité si des pièces ennemies sont adjacentes
     king_safety_penalty = 0
@@ -117,33 +356,22 @@ def scoreBoard(game_state: ChessEngine.GameState) -> int:
         if 0 <= nr < ChessEngine.DIMENSION and 0 <= nc < ChessEngine.DIMENSION:
             adj_piece = game_state.board[nr][nc]
             if adj_piece != "--" and adj_piece[0] == enemy_color:
-                king_safety_penalty += 0.5
+                king_safety_penalty += EVAL_PARAMS["king_safety_penalty"]
     if game_state.white_to_move:
         total_score -= king_safety_penalty
     else:
         total_score += king_safety_penalty
 
     # Mobilité : bonus proportionnel au nombre de coups disponibles
-    mobility_bonus = 0.1 * len(game_state.getValidMoves())
-    if game_state.white_to_move:
-        total_score += mobility_bonus
-    else:
-        total_score -= mobility_bonus
+    if mobility is not None:
+        mobility_bonus = EVAL_PARAMS["mobility_bonus"] * mobility
+        if game_state.white_to_move:
+            total_score += mobility_bonus
+        else:
+            total_score -= mobility_bonus
 
-    # Pénalité pour répétition de position
-    pos_hash = game_state.get_board_hash_str()
-    repetition = game_state.position_history.get(pos_hash, 0)
-    if repetition:
-        total_score -= repetition * 10
-
-    return int(total_score)
-
-def get_board_hash(board: List[List[str]], white_to_move: bool) -> int:
-    """
-    Génère un hash pour l'état du plateau.
-    """
-    board_tuple = tuple(tuple(row) for row in board)
-    return hash((board_tuple, white_to_move))
+    total_score += ChessEval.pawn_score(game_state, EVAL_PARAMS, PAWN_HASH)
+    return total_score, False
 
 def findRandomMove(valid_moves: List[ChessEngine.Move]) -> ChessEngine.Move:
     """
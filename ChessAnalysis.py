@@ -0,0 +1,121 @@
+"""
+Module ChessAnalysis
+---------------------
+Analyse en lot de positions avec ChessAI. Les positions (FEN) ou les parties
+(listes de coups UCI) sont réparties sur un pool de processus avec des limites
+par position (profondeur, temps, noeuds). Les résultats sont produits au fur
+et à mesure par un générateur, et le nombre de positions en cours est borné :
+la mémoire reste constante même pour des millions de positions en entrée.
+
+Exemple :
+    for result in analyse(open("puzzles.fen"), depth=3):
+        print(result["id"], result["best_move"], result["score"])
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import ChessEngine
+import ChessAI
+
+# Une entrée est soit une FEN, soit une partie : liste de coups UCI depuis la
+# position initiale, ou couple (FEN de départ, liste de coups UCI).
+AnalysisInput = Union[str, List[str], Tuple[Optional[str], List[str]]]
+
+
+def analyse_position(job: Tuple[Any, str, List[str], Optional[int], Optional[float], Optional[int]]) -> Dict[str, Any]:
+    """Analyse une position (exécutée dans un processus du pool)."""
+    key, fen, moves, depth, movetime, max_nodes = job
+    result: Dict[str, Any] = {"id": key, "fen": fen, "best_move": None, "score": 0, "pv": [],
+                              "nodes": 0, "depth": 0, "time": 0.0, "error": None}
+    try:
+        game_state = ChessEngine.GameState.from_fen(fen)
+        for text in moves:
+            move = game_state.parse_uci_move(text)
+            if move is None:
+                raise ValueError(f"coup illégal : {text}")
+            game_state.makeMove(move, validate=False)
+        result["fen"] = game_state.get_fen()
+        start = time.perf_counter()
+        deadline = start + movetime if movetime else None
+        search_depth = depth if depth is not None else (ChessAI.MAX_DEPTH if movetime or max_nodes else ChessAI.DEPTH)
+        info = ChessAI.SearchInfo(max_nodes=max_nodes, deadline=deadline)
+        best_move, info = ChessAI.searchBestMove(game_state, game_state.getValidMoves(), search_depth, info)
+        result.update({"best_move": best_move.getUCINotation() if best_move else None, "score": info.score,
+                       "pv": [m.getUCINotation() for m in info.pv], "nodes": info.nodes, "depth": info.depth,
+                       "time": time.perf_counter() - start})
+    except Exception as e:
+        # Une position invalide ne doit pas interrompre l'analyse des autres
+        result["error"] = f"{type(e).__name__} : {e}"
+    return result
+
+
+def iter_jobs(items: Iterable[AnalysisInput]) -> Iterator[Tuple[Any, str, List[str]]]:
+    """
+    Transforme les entrées en positions à analyser. Une FEN donne une position ;
+    une partie est rejouée une seule fois et donne une position par demi-coup
+    (identifiant (index, ply)), analysée indépendamment de l'historique.
+    """
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            fen = item.strip()
+            if fen:
+                yield index, fen, []
+            continue
+        if isinstance(item, tuple):
+            start_fen, moves = item[0] or ChessEngine.START_FEN, item[1]
+        else:
+            start_fen, moves = ChessEngine.START_FEN, item
+        try:
+            game_state = ChessEngine.GameState.from_fen(start_fen)
+        except Exception:
+            yield (index, 0), start_fen, []  # FEN invalide : signalée comme erreur par le processus
+            continue
+        yield (index, 0), game_state.get_fen(), []
+        for ply, text in enumerate(moves, start=1):
+            move = game_state.parse_uci_move(text)
+            if move is None:
+                yield (index, ply), game_state.get_fen(), [text]  # Signalé comme erreur par le processus
+                break
+            game_state.makeMove(move, validate=False)
+            yield (index, ply), game_state.get_fen(), []
+
+
+def analyse(items: Iterable[AnalysisInput], depth: Optional[int] = None, movetime: Optional[float] = None,
+            nodes: Optional[int] = None, workers: Optional[int] = None,
+            max_in_flight: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Analyse les positions en parallèle et produit les résultats dans l'ordre
+    où ils se terminent. Chaque résultat est un dictionnaire : id, fen,
+    best_move, score, pv, nodes, depth, time et error.
+    Au plus max_in_flight positions (par défaut 4 par processus) sont en
+    cours à un instant donné ; l'entrée n'est consommée qu'au fil de l'eau.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    jobs = iter_jobs(items)
+    pending: Set[Future] = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                key, fen, moves = job
+                pending.add(executor.submit(analyse_position, (key, fen, moves, depth, movetime, nodes)))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+if __name__ == "__main__":
+    for line_result in analyse(line for line in sys.stdin if line.strip()):
+        print(line_result["id"], line_result["best_move"], line_result["score"],
+              " ".join(line_result["pv"]), line_result["nodes"], line_result["error"] or "", flush=True)
@@ -0,0 +1,78 @@
+"""
+Module ChessBench
+------------------
+Banc d'essai déterministe de ChessAI : recherche à profondeur fixe sur une
+liste de positions intégrée, puis affichage du nombre total de noeuds, du temps
+et des noeuds par seconde. Le nombre total de noeuds sert de signature : il ne
+doit changer que si la logique de recherche est volontairement modifiée, et
+SIGNATURES est alors mis à jour dans le même commit. Le bench se termine avec
+le code 1 si la signature d'une profondeur connue ne correspond pas.
+
+Usage : python ChessBench.py [profondeur]
+"""
+
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ChessEngine
+import ChessAI
+
+BENCH_DEPTH: int = ChessAI.DEPTH
+
+# Nombre total de noeuds attendu, par profondeur
+SIGNATURES: Dict[int, int] = {1: 194, 2: 1040, 3: 9663}
+
+# Positions de référence (ouverture, milieu de jeu, finales)
+BENCH_POSITIONS: List[str] = [
+    ChessEngine.START_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 1 5",
+    "r3k2r/ppp2ppp/2n1bn2/3qp3/3P4/2N1BN2/PPP2PPP/R2QK2R w KQkq - 0 9",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "8/8/3k4/3p4/3P4/3K4/8/8 w - - 0 1",
+    "8/8/8/4k3/8/8/2QP4/4K3 w - - 0 1",
+]
+
+
+def run_bench(depth: int = BENCH_DEPTH, positions: Optional[List[str]] = None,
+              output: Callable[[str], None] = print) -> Tuple[int, float]:
+    """
+    Lance la recherche à profondeur fixe sur chaque position.
+    Retourne le nombre total de noeuds et le temps écoulé (en secondes).
+    Aucun coup aléatoire n'est utilisé (findRandomMove est exclu).
+    """
+    if positions is None:
+        positions = BENCH_POSITIONS
+    total_nodes = 0
+    total_time = 0.0
+    ChessAI.clear_eval_caches()
+    for i, fen in enumerate(positions, start=1):
+        game_state = ChessEngine.GameState.from_fen(fen)
+        valid_moves = game_state.getValidMoves()
+        start = time.perf_counter()
+        best_move, info = ChessAI.searchBestMove(game_state, valid_moves, depth)
+        elapsed = time.perf_counter() - start
+        total_nodes += info.nodes
+        total_time += elapsed
+        output(f"Position {i}/{len(positions)} : {fen}")
+        output(f"  meilleur coup {best_move if best_move else '(aucun)'}  score {info.score}  "
+               f"noeuds {info.nodes}  temps {elapsed * 1000:.0f} ms")
+    nps = int(total_nodes / total_time) if total_time > 0 else 0
+    output("=" * 40)
+    output(f"Temps total (ms) : {total_time * 1000:.0f}")
+    output(f"Noeuds explorés  : {total_nodes}")
+    output(f"Noeuds/seconde   : {nps}")
+    output(f"Cache d'évaluation : {ChessAI.EVAL_CACHE.hit_rate():.1%} de succès, "
+           f"table des pions : {ChessAI.PAWN_HASH.hit_rate():.1%}")
+    return total_nodes, total_time
+
+
+if __name__ == "__main__":
+    bench_depth = int(sys.argv[1]) if len(sys.argv) > 1 else BENCH_DEPTH
+    nodes, _ = run_bench(bench_depth)
+    expected = SIGNATURES.get(bench_depth)
+    if expected is not None and nodes != expected:
+        print(f"ÉCHEC : signature {nodes}, attendue {expected} à la profondeur {bench_depth}")
+        sys.exit(1)
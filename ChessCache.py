@@ -0,0 +1,121 @@
+"""
+Module ChessCache
+------------------
+Cache d'analyse persistant (SQLite) : pour chaque position, le meilleur coup,
+le score et la variante principale de la recherche la plus profonde déjà
+effectuée. Le fichier est partagé entre les sessions et les processus
+(verrouillage SQLite), et sa taille est bornée : au-delà de max_entries, les
+entrées les moins récemment utilisées sont supprimées.
+
+Une entrée est identifiée par la clé de position (plateau et trait), vérifiée
+par la FEN sans compteurs (roques et prise en passant compris) et par les
+poids d'évaluation utilisés : une analyse faite avec d'autres EVAL_PARAMS
+n'est pas réutilisée.
+
+Exemple :
+    with AnalysisCache("analysis_cache.sqlite") as cache:
+        entry = cache.lookup(game_state, depth=3, params=params)
+"""
+
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+import ChessEngine
+
+MAX_ENTRIES: int = 100000
+EVICTION_FRACTION: float = 0.1  # Part des entrées supprimées lorsque la limite est dépassée
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    key INTEGER PRIMARY KEY,
+    fen TEXT NOT NULL,
+    params TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    move TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    pv TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analysis_last_used ON analysis (last_used);
+"""
+
+
+def _sql_key(key: int) -> int:
+    """Les clés Zobrist sont sur 64 bits non signés, les entiers SQLite sont signés."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def _position_fen(game_state: ChessEngine.GameState) -> str:
+    """FEN sans les compteurs de demi-coups et de coups."""
+    return " ".join(game_state.get_fen().split()[:4])
+
+
+def params_signature(params: Dict[str, float]) -> str:
+    return ",".join(f"{name}={value!r}" for name, value in sorted(params.items()))
+
+
+class AnalysisCache:
+    """Accès au cache d'analyse stocké dans le fichier SQLite path."""
+
+    def __init__(self, path: str, max_entries: int = MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path, timeout=5.0)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "AnalysisCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+    def lookup(self, game_state: ChessEngine.GameState, depth: int,
+               params: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'entrée de la position si elle a été analysée à une profondeur
+        au moins égale à depth : {"depth", "move", "score", "pv"}, coups en
+        notation UCI. None sinon.
+        """
+        key = _sql_key(game_state.get_position_key())
+        row = self.connection.execute(
+            "SELECT fen, params, depth, move, score, pv FROM analysis WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] != _position_fen(game_state) or row[1] != params_signature(params) or row[2] < depth:
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE analysis SET last_used = ? WHERE key = ?", (time.time(), key))
+        return {"depth": row[2], "move": row[3], "score": row[4], "pv": row[5].split()}
+
+    def store(self, game_state: ChessEngine.GameState, depth: int, params: Dict[str, float],
+              move: ChessEngine.Move, score: int, pv: List[ChessEngine.Move]) -> None:
+        """
+        Enregistre une analyse. Une entrée existante n'est remplacée que par une
+        analyse au moins aussi profonde (ou faite avec d'autres paramètres).
+        """
+        key = _sql_key(game_state.get_position_key())
+        fen, signature = _position_fen(game_state), params_signature(params)
+        with self.connection:
+            row = self.connection.execute("SELECT fen, params, depth FROM analysis WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] == fen and row[1] == signature and row[2] > depth:
+                return
+            self.connection.execute(
+                "INSERT OR REPLACE INTO analysis (key, fen, params, depth, move, score, pv, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, fen, signature, depth, move.getUCINotation(), score,
+                 " ".join(m.getUCINotation() for m in pv), time.time()))
+            self._evict()
+
+    def _evict(self) -> None:
+        """Supprime les entrées les moins récemment utilisées au-delà de max_entries."""
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return
+        count = excess + int(self.max_entries * EVICTION_FRACTION)
+        self.connection.execute(
+            "DELETE FROM analysis WHERE key IN (SELECT key FROM analysis ORDER BY last_used LIMIT ?)", (count,))
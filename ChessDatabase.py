@@ -0,0 +1,224 @@
+"""
+Module ChessDatabase
+---------------------
+Base de parties locale avec un index des positions.
+
+Les parties sont stockées sous forme de codes de coups sur 16 bits (format
+ChessSave) dans un seul fichier, et chaque position atteinte est indexée par
+sa clé (GameState.get_position_key) avec la partie, le demi-coup et le coup
+joué ensuite. L'index est un tableau numpy trié par clé, ouvert en memmap :
+une recherche est une dichotomie, sans rejouer ni charger les parties. Les
+ajouts vont dans un fichier d'attente non trié, parcouru à chaque recherche
+et fusionné dans l'index par compact() (automatiquement au-delà de
+PENDING_LIMIT positions).
+
+La clé de position ne couvre que le plateau et le trait : deux positions qui
+ne diffèrent que par les droits de roque ou de prise en passant sont
+confondues.
+
+Fichiers du répertoire de la base :
+    moves.bin    codes u16 de toutes les parties, bout à bout
+    games.bin    par partie : position du premier code, nombre de coups, résultat
+                 et position (en octets) de la FEN de départ dans fens.txt
+    fens.txt     FEN de départ de chaque partie (une ligne par partie)
+    index.bin    positions triées par clé (memmap)
+    pending.bin  positions ajoutées depuis la dernière fusion
+
+Usage : python ChessDatabase.py base/ parties.pgn   (importe et affiche le débit)
+"""
+
+import os
+import sys
+import time
+from typing import BinaryIO, Dict, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+import ChessEngine
+import ChessPGN
+import ChessSave
+
+POSITION_DTYPE = np.dtype([("key", "<u8"), ("game", "<u4"), ("ply", "<u2"), ("move", "<u2")])
+GAME_DTYPE = np.dtype([("offset", "<u8"), ("plies", "<u4"), ("result", "u1"), ("fen_offset", "<u8")])
+RESULT_CODES: Dict[str, int] = {"*": 0, "1-0": 1, "0-1": 2, "1/2-1/2": 3}
+NO_MOVE: int = ChessSave.UNDO_CODE  # Coup d'une position finale (aucun coup joué ensuite)
+PENDING_LIMIT: int = 1 << 16
+
+
+def _read_array(path: str, dtype: np.dtype) -> np.ndarray:
+    """Tableau en memmap (lecture seule), vide si le fichier est vide."""
+    if os.path.getsize(path) < dtype.itemsize:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(os.path.getsize(path) // dtype.itemsize,))
+
+
+class GameDatabase:
+    """Base de parties stockée dans le répertoire directory (créé si besoin)."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.paths = {name: os.path.join(directory, name)
+                      for name in ("moves.bin", "games.bin", "fens.txt", "index.bin", "pending.bin")}
+        self.streams: Dict[str, BinaryIO] = {name: open(path, "ab") for name, path in self.paths.items()
+                                             if name != "index.bin"}
+        if not os.path.exists(self.paths["index.bin"]):
+            open(self.paths["index.bin"], "wb").close()
+        self._index: Optional[np.ndarray] = None
+        # Positions en attente gardées en mémoire après la première lecture, complétées à chaque ajout
+        self._pending: Optional[np.ndarray] = None
+
+    def __enter__(self) -> "GameDatabase":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for stream in self.streams.values():
+            stream.close()
+        self._index = None
+        self._pending = None
+
+    def __len__(self) -> int:
+        return os.path.getsize(self.paths["games.bin"]) // GAME_DTYPE.itemsize
+
+    # ---------------------------------------------------------------- ajout
+
+    def add_game(self, start_fen: str, codes: List[int], result: str = "*") -> int:
+        """Ajoute une partie donnée par sa FEN de départ et ses codes ChessSave."""
+        game_state = ChessEngine.GameState.from_fen(start_fen)
+        for code in codes:
+            game_state.makeMove(ChessSave.decode_move(game_state, code), validate=False)
+        return self.add_game_state(game_state, result)
+
+    def add_game_state(self, game_state: ChessEngine.GameState, result: Optional[str] = None) -> int:
+        """
+        Ajoute la partie jouée dans game_state (résultat déduit de la position si
+        absent) et indexe chacune de ses positions. Les clés sont lues dans la
+        pile d'annulation : la partie n'est pas rejouée. Retourne son identifiant.
+        """
+        game_id = len(self)
+        codes = [ChessSave.encode_move(move) for move in game_state.move_log]
+        positions = np.zeros(len(codes) + 1, dtype=POSITION_DTYPE)
+        positions["key"] = np.array([record[3] for record in game_state.undo_stack]
+                                    + [game_state.get_position_key()], dtype=np.uint64)
+        positions["game"] = game_id
+        positions["ply"] = np.arange(len(codes) + 1)
+        positions["move"] = codes + [NO_MOVE]
+
+        offset = os.path.getsize(self.paths["moves.bin"]) // ChessSave.CODE.size
+        fen_offset = os.path.getsize(self.paths["fens.txt"])
+        self._append("moves.bin", np.array(codes, dtype="<u2").tobytes())
+        self._append("fens.txt", (game_state.start_fen + "\n").encode("utf-8"))
+        self._append("pending.bin", positions.tobytes())
+        if self._pending is not None:
+            self._pending = np.concatenate([self._pending, positions])
+        # La partie n'existe qu'une fois son enregistrement écrit, en dernier
+        result = result or ChessPGN.game_result(game_state)
+        self._append("games.bin", np.array([(offset, len(codes), RESULT_CODES.get(result, 0), fen_offset)],
+                                           dtype=GAME_DTYPE).tobytes())
+        if os.path.getsize(self.paths["pending.bin"]) // POSITION_DTYPE.itemsize >= PENDING_LIMIT:
+            self.compact()
+        return game_id
+
+    def import_pgn(self, stream: TextIO) -> int:
+        """Importe les parties d'un flux PGN (les parties invalides sont ignorées)."""
+        count = 0
+        for game, game_state in ChessPGN.iter_replayed(stream):
+            self.add_game_state(game_state, game.result)
+            count += 1
+        return count
+
+    def _append(self, name: str, data: bytes) -> None:
+        stream = self.streams[name]
+        stream.write(data)
+        stream.flush()
+
+    def compact(self) -> None:
+        """Fusionne les positions en attente dans l'index trié."""
+        pending = self.pending()
+        if not len(pending):
+            return
+        merged = np.concatenate([np.asarray(self.index()), pending])
+        merged = merged[np.argsort(merged["key"], kind="stable")]
+        self._index = None
+        temp_path = self.paths["index.bin"] + ".tmp"
+        merged.tofile(temp_path)
+        os.replace(temp_path, self.paths["index.bin"])
+        self.streams["pending.bin"].truncate(0)
+        self._pending = np.zeros(0, dtype=POSITION_DTYPE)
+
+    # ---------------------------------------------------------- recherche
+
+    def index(self) -> np.ndarray:
+        if self._index is None:
+            self._index = _read_array(self.paths["index.bin"], POSITION_DTYPE)
+        return self._index
+
+    def pending(self) -> np.ndarray:
+        """Positions ajoutées depuis la dernière fusion (lues une fois, puis tenues à jour en mémoire)."""
+        if self._pending is None:
+            self._pending = np.fromfile(self.paths["pending.bin"], dtype=POSITION_DTYPE)
+        return self._pending
+
+    def positions(self, key: int) -> np.ndarray:
+        """Toutes les occurrences indexées de la clé de position donnée."""
+        key = np.uint64(key)
+        index = self.index()
+        keys = index["key"]
+        start, end = np.searchsorted(keys, key, side="left"), np.searchsorted(keys, key, side="right")
+        pending = self.pending()
+        return np.concatenate([index[start:end], pending[pending["key"] == key]])
+
+    def find(self, game_state: ChessEngine.GameState) -> List[Tuple[int, int]]:
+        """Parties ayant atteint la position de game_state : liste de (partie, demi-coup)."""
+        return [(int(entry["game"]), int(entry["ply"])) for entry in self.positions(game_state.get_position_key())]
+
+    def move_stats(self, game_state: ChessEngine.GameState) -> Dict[str, Dict[str, int]]:
+        """
+        Coups joués depuis la position de game_state, en notation UCI, avec le
+        nombre de parties et les résultats : {"games", "white", "draws", "black"}.
+        Directement utilisable comme livre d'ouvertures.
+        """
+        entries = self.positions(game_state.get_position_key())
+        results = _read_array(self.paths["games.bin"], GAME_DTYPE)["result"]
+        stats: Dict[str, Dict[str, int]] = {}
+        for code, game in zip(entries["move"].tolist(), entries["game"].tolist()):
+            if code == NO_MOVE:
+                continue
+            move = ChessSave.decode_move(game_state, code)
+            entry = stats.setdefault(move.getUCINotation(), {"games": 0, "white": 0, "draws": 0, "black": 0})
+            entry["games"] += 1
+            result = int(results[game])
+            if result == RESULT_CODES["1-0"]:
+                entry["white"] += 1
+            elif result == RESULT_CODES["0-1"]:
+                entry["black"] += 1
+            elif result == RESULT_CODES["1/2-1/2"]:
+                entry["draws"] += 1
+        return stats
+
+    def load_game(self, game_id: int) -> ChessEngine.GameState:
+        """Rejoue la partie game_id et retourne l'état final (avec son move_log)."""
+        record = _read_array(self.paths["games.bin"], GAME_DTYPE)[game_id]
+        codes = _read_array(self.paths["moves.bin"], np.dtype("<u2"))
+        with open(self.paths["fens.txt"], "rb") as fens:
+            fens.seek(int(record["fen_offset"]))
+            start_fen = fens.readline().decode("utf-8").strip()
+        game_state = ChessEngine.GameState.from_fen(start_fen)
+        for code in codes[int(record["offset"]):int(record["offset"]) + int(record["plies"])].tolist():
+            game_state.makeMove(ChessSave.decode_move(game_state, code), validate=False)
+        return game_state
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+    with GameDatabase(sys.argv[1]) as database, \
+            open(sys.argv[2], encoding="utf-8", errors="replace") as pgn_file:
+        imported = database.import_pgn(pgn_file)
+        database.compact()
+        total = len(database)
+    elapsed = time.perf_counter() - start_time
+    print(f"{imported} parties importées en {elapsed:.2f} s ({imported / elapsed if elapsed else 0:.1f} parties/s), "
+          f"{total} parties dans la base")
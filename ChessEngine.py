@@ -3,15 +3,31 @@ Module ChessEngine
 -------------------
 Gestion du plateau, des coups, de l’évaluation et du cache des mouvements.
 """
-from typing import List, Tuple, Optional, Any, Callable, Dict
+from typing import List, Tuple, Optional, Any, Callable, Dict, Set
 import copy
-
-import numpy as np
+import random
 
 # Constantes
 DIMENSION: int = 8
 CHECKMATE: int = 1000
 STALEMATE: int = 0
+START_FEN: str = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Droits de roque codés sur 4 bits
+CASTLE_WKS: int = 1
+CASTLE_WQS: int = 2
+CASTLE_BKS: int = 4
+CASTLE_BQS: int = 8
+CASTLE_ALL: int = CASTLE_WKS | CASTLE_WQS | CASTLE_BKS | CASTLE_BQS
+
+# Clés de Zobrist (graine fixe : les clés sont identiques d'un processus à l'autre).
+# La clé de position ne dépend que du plateau et du trait, comme l'ancien hash.
+_zobrist_random = random.Random(0x5EED)
+ZOBRIST_PIECES: Dict[str, List[int]] = {
+    color + piece: [_zobrist_random.getrandbits(64) for _ in range(64)]
+    for color in "wb" for piece in "pRNBQK"
+}
+ZOBRIST_BLACK_TO_MOVE: int = _zobrist_random.getrandbits(64)
 
 from enum import Enum
 
@@ -21,8 +37,10 @@ class Color(Enum):
 
 # Évaluations de base
 piece_score: dict[str, int] = {"K": 0, "Q": 9, "R": 5, "B": 3, "N": 3, "p": 1}
+# Ordre d'essai des pièces dans has_legal_move : les générateurs les moins coûteux d'abord
+LEGAL_MOVE_SEARCH_ORDER: Dict[str, int] = {"K": 0, "N": 1, "p": 2, "B": 3, "R": 4, "Q": 5}
 
-knight_scores = np.array([
+knight_scores: List[List[float]] = [
     [0.0, 0.1, 0.2, 0.2, 0.2, 0.2, 0.1, 0.0],
     [0.1, 0.3, 0.5, 0.5, 0.5, 0.5, 0.3, 0.1],
     [0.2, 0.5, 0.6, 0.65, 0.65, 0.6, 0.5, 0.2],
@@ -31,9 +49,9 @@ knight_scores = np.array([
     [0.2, 0.55, 0.6, 0.65, 0.65, 0.6, 0.55, 0.2],
     [0.1, 0.3, 0.5, 0.55, 0.55, 0.5, 0.3, 0.1],
     [0.0, 0.1, 0.2, 0.2, 0.2, 0.2, 0.1, 0.0]
-])
+]
 
-bishop_scores = np.array([
+bishop_scores: List[List[float]] = [
     [0.0, 0.2, 0.2, 0.2, 0.2, 0.2, 0.2, 0.0],
     [0.2, 0.4, 0.4, 0.4, 0.4, 0.4, 0.4, 0.2],
     [0.2, 0.4, 0.5, 0.6, 0.6, 0.5, 0.4, 0.2],
@@ -42,9 +60,9 @@ bishop_scores = np.array([
     [0.2, 0.6, 0.6, 0.6, 0.6, 0.6, 0.6, 0.2],
     [0.2, 0.5, 0.4, 0.4, 0.4, 0.4, 0.5, 0.2],
     [0.0, 0.2, 0.2, 0.2, 0.2, 0.2, 0.2, 0.0]
-])
+]
 
-rook_scores = np.array([
+rook_scores: List[List[float]] = [
     [0.25] * DIMENSION,
     [0.5, 0.75, 0.75, 0.75, 0.75, 0.75, 0.75, 0.5],
     [0.0, 0.25, 0.25, 0.25, 0.25, 0.25, 0.25, 0.0],
@@ -53,9 +71,9 @@ rook_scores = np.array([
     [0.0, 0.25, 0.25, 0.25, 0.25, 0.25, 0.25, 0.0],
     [0.0, 0.25, 0.25, 0.25, 0.25, 0.25, 0.25, 0.0],
     [0.25, 0.25, 0.25, 0.5, 0.5, 0.25, 0.25, 0.25]
-])
+]
 
-queen_scores = np.array([
+queen_scores: List[List[float]] = [
     [0.0, 0.2, 0.2, 0.3, 0.3, 0.2, 0.2, 0.0],
     [0.2, 0.4, 0.4, 0.4, 0.4, 0.4, 0.4, 0.2],
     [0.2, 0.4, 0.5, 0.5, 0.5, 0.5, 0.4, 0.2],
@@ -64,9 +82,9 @@ queen_scores = np.array([
     [0.2, 0.5, 0.5, 0.5, 0.5, 0.5, 0.4, 0.2],
     [0.2, 0.4, 0.5, 0.4, 0.4, 0.4, 0.4, 0.2],
     [0.0, 0.2, 0.2, 0.3, 0.3, 0.2, 0.2, 0.0]
-])
+]
 
-pawn_scores = np.array([
+pawn_scores: List[List[float]] = [
     [0.8] * DIMENSION,
     [0.7] * DIMENSION,
     [0.3, 0.3, 0.4, 0.5, 0.5, 0.4, 0.3, 0.3],
@@ -75,7 +93,7 @@ pawn_scores = np.array([
     [0.25, 0.15, 0.1, 0.2, 0.2, 0.1, 0.15, 0.25],
     [0.25, 0.3, 0.3, 0.0, 0.0, 0.3, 0.3, 0.25],
     [0.2] * DIMENSION
-])
+]
 
 piece_position_scores = {
     "wN": knight_scores,
@@ -133,31 +151,368 @@ class GameState:
         self.pins: List[Tuple[int, int, int, int]] = []
         self.checks: List[Tuple[int, int, int, int]] = []
         self.enpassant_possible: Tuple[int, int] = ()  # type: ignore
-        self.enpassant_possible_log: List[Tuple[int, int]] = [self.enpassant_possible]  # type: ignore
-        self.current_castling_rights: "CastleRights" = CastleRights(True, True, True, True)
-        self.castle_rights_log: List["CastleRights"] = [CastleRights(
-            self.current_castling_rights.wks, self.current_castling_rights.bks,
-            self.current_castling_rights.wqs, self.current_castling_rights.bqs)]
+        # Droits de roque (bits CASTLE_*), exposés aussi via current_castling_rights
+        self.castling: int = CASTLE_ALL
+        # Pile d'annulation : un enregistrement par demi-coup
+        # (droits de roque, case en passant, compteur des 50 coups, clé de position, clé des pions)
+        self.undo_stack: List[Tuple[int, Tuple[int, int], int, int, int]] = []
         self._valid_moves: Optional[List["Move"]] = None
+        self._legal_moves: Optional[List["Move"]] = None
+        # Index des coups légaux par case de départ, d'arrivée et par couple (départ, arrivée)
+        self._move_index: Optional[Tuple[List["Move"], Dict, Dict, Dict]] = None
+        # Numéro du coup de la position de départ (utile pour les positions FEN)
+        self.start_fullmove: int = 1
 
         # Pour la règle des 50 coups
         self.fifty_move_counter: int = 0
-        self.fifty_move_counter_log: List[int] = [0]
-        # Pour la répétition de positions (utilise une chaîne de hash)
-        self.position_history: Dict[str, int] = {}
-        self.position_history_log: List[Dict[str, int]] = [copy.deepcopy(self.position_history)]
+        # Pour la répétition de positions : nombre d'occurrences de chaque clé de position
+        # sur le chemin courant (incrémenté par makeMove, décrémenté par undoMove)
+        self.position_history: Dict[int, int] = {}
+        self.position_key: int = 0
+        # Clé de Zobrist des seuls pions (table de hachage de la structure de pions)
+        self.pawn_key: int = 0
+        # Cases occupées par camp et nombre de pièces de chaque type, tenus à jour par makeMove/undoMove
+        self.piece_squares: Dict[str, Set[Tuple[int, int]]] = {"w": set(), "b": set()}
+        self.piece_counts: Dict[str, int] = {}
+        # Plateau pour lequel la clé et les listes de pièces ont été calculées
+        self._derived_board: Optional[List[List[str]]] = None
         # On met à jour l'historique avec la position initiale
         self._update_position_history()
+        # Position de départ, pour rejouer la partie (PGN, sauvegarde)
+        self.start_fen: str = self.get_fen()
 
     def _update_position_history(self) -> None:
         """Met à jour le dictionnaire de répétition de positions."""
-        pos_hash: str = self.get_board_hash_str()
-        self.position_history[pos_hash] = self.position_history.get(pos_hash, 0) + 1
+        key = self.get_position_key()
+        self.position_history[key] = self.position_history.get(key, 0) + 1
+
+    def compute_position_key(self) -> int:
+        """Calcule la clé de Zobrist de la position à partir du plateau (plateau et trait)."""
+        key = 0 if self.white_to_move else ZOBRIST_BLACK_TO_MOVE
+        for r, row in enumerate(self.board):
+            for c, piece in enumerate(row):
+                if piece != "--":
+                    key ^= ZOBRIST_PIECES[piece][r * 8 + c]
+        return key
+
+    def compute_pawn_key(self) -> int:
+        """Calcule la clé de Zobrist des pions seuls à partir du plateau."""
+        key = 0
+        for r, row in enumerate(self.board):
+            for c, piece in enumerate(row):
+                if piece[1] == 'p':
+                    key ^= ZOBRIST_PIECES[piece][r * 8 + c]
+        return key
+
+    def _sync_derived(self) -> None:
+        """
+        Recalcule la clé de position, les cases occupées et le matériel si le
+        plateau a été remplacé directement (self.board = ...) depuis le dernier calcul.
+        """
+        if self.board is self._derived_board:
+            return
+        self.position_key = self.compute_position_key()
+        self.pawn_key = self.compute_pawn_key()
+        self.piece_squares = {"w": set(), "b": set()}
+        self.piece_counts = {}
+        for r, row in enumerate(self.board):
+            for c, piece in enumerate(row):
+                if piece != "--":
+                    self.piece_squares[piece[0]].add((r, c))
+                    self.piece_counts[piece] = self.piece_counts.get(piece, 0) + 1
+        self._derived_board = self.board
+
+    def get_position_key(self) -> int:
+        """Clé de la position courante, tenue à jour par makeMove/undoMove."""
+        if self.board is not self._derived_board:
+            self._sync_derived()
+        return self.position_key
+
+    def get_pawn_key(self) -> int:
+        """Clé des pions de la position courante, tenue à jour par makeMove/undoMove."""
+        if self.board is not self._derived_board:
+            self._sync_derived()
+        return self.pawn_key
+
+    def get_piece_squares(self, color: str) -> Set[Tuple[int, int]]:
+        """Cases occupées par les pièces du camp color ('w' ou 'b')."""
+        if self.board is not self._derived_board:
+            self._sync_derived()
+        return self.piece_squares[color]
+
+    def material_signature(self) -> str:
+        """
+        Signature matérielle, par exemple « KQRvKR » : pièces blanches puis noires,
+        de la plus forte à la plus faible.
+        """
+        if self.board is not self._derived_board:
+            self._sync_derived()
+        return "v".join("".join(piece.upper() * self.piece_counts.get(color + piece, 0) for piece in "KQRBNp")
+                        for color in "wb")
+
+    @property
+    def current_castling_rights(self) -> "CastleRights":
+        """Vue CastleRights des droits de roque (stockés sur 4 bits dans castling)."""
+        return CastleRights(bool(self.castling & CASTLE_WKS), bool(self.castling & CASTLE_BKS),
+                            bool(self.castling & CASTLE_WQS), bool(self.castling & CASTLE_BQS))
+
+    @current_castling_rights.setter
+    def current_castling_rights(self, rights: "CastleRights") -> None:
+        self.castling = ((CASTLE_WKS if rights.wks else 0) | (CASTLE_WQS if rights.wqs else 0)
+                         | (CASTLE_BKS if rights.bks else 0) | (CASTLE_BQS if rights.bqs else 0))
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "GameState":
+        """Crée un état de jeu à partir d'une chaîne FEN."""
+        game_state = cls()
+        game_state.load_fen(fen)
+        return game_state
+
+    def load_fen(self, fen: str) -> None:
+        """
+        Remplace la position courante par celle décrite par la chaîne FEN.
+        Les historiques (coups, roques, en passant, répétitions) sont réinitialisés.
+        Une FEN invalide lève ValueError sans modifier la position courante :
+        tous les champs sont lus avant la moindre affectation.
+        """
+        error = ValueError(f"FEN invalide : {fen}")
+        fields = fen.split()
+        if len(fields) < 4 or fields[1] not in ("w", "b"):
+            raise error
+        rows = fields[0].split("/")
+        if len(rows) != DIMENSION:
+            raise error
+        board: List[List[str]] = []
+        kings: Dict[str, List[Tuple[int, int]]] = {"w": [], "b": []}
+        for r, row_text in enumerate(rows):
+            row: List[str] = []
+            for char in row_text:
+                if char.isdigit():
+                    row.extend(["--"] * int(char))
+                else:
+                    color = "w" if char.isupper() else "b"
+                    piece_type = "p" if char.lower() == "p" else char.upper()
+                    if piece_type not in self.move_functions:
+                        raise error
+                    row.append(color + piece_type)
+                    if piece_type == "K":
+                        kings[color].append((r, len(row) - 1))
+            if len(row) != DIMENSION:
+                raise error
+            board.append(row)
+        if len(kings["w"]) != 1 or len(kings["b"]) != 1:
+            raise error
+        enpassant = fields[3]
+        if enpassant != "-" and (len(enpassant) != 2 or enpassant[0] not in Move.files_to_cols
+                                 or enpassant[1] not in "36"):
+            raise error
+        try:
+            fifty_move_counter = int(fields[4]) if len(fields) > 4 else 0
+            start_fullmove = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise error from None
+        self.board = board
+        self.white_king_location, self.black_king_location = kings["w"][0], kings["b"][0]
+        self.white_to_move = fields[1] == "w"
+        castling = fields[2]
+        self.current_castling_rights = CastleRights("K" in castling, "k" in castling,
+                                                    "Q" in castling, "q" in castling)
+        self._derived_board = None
+        if enpassant != "-":
+            self.enpassant_possible = (Move.ranks_to_rows[enpassant[1]], Move.files_to_cols[enpassant[0]])
+        else:
+            self.enpassant_possible = ()  # type: ignore
+        self.fifty_move_counter = fifty_move_counter
+        self.start_fullmove = start_fullmove
+
+        self.move_log = []
+        self.checkmate = False
+        self.stalemate = False
+        self.in_check = False
+        self.pins = []
+        self.checks = []
+        self.undo_stack = []
+        self.position_history = {}
+        self._valid_moves = None
+        self._legal_moves = None
+        self._update_position_history()
+        self.start_fen = self.get_fen()
+
+    def __getstate__(self) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        État transmis par pickle (multiprocessing) : la position courante en FEN
+        et les clés de répétition encore atteignables, c'est-à-dire celles des
+        positions depuis le dernier coup irréversible (prise ou coup de pion).
+        La taille ne dépend pas de la longueur de la partie ; l'historique des
+        coups n'est pas transmis et la copie repart de la position courante.
+        """
+        window = self.undo_stack[len(self.undo_stack) - min(self.fifty_move_counter, len(self.undo_stack)):]
+        keys = [record[3] for record in window] + [self.get_position_key()]
+        return self.get_fen(), [(key, self.position_history[key]) for key in dict.fromkeys(keys)
+                                if key in self.position_history]
+
+    def __setstate__(self, state: Tuple[str, List[Tuple[int, int]]]) -> None:
+        fen, repetitions = state
+        GameState.__init__(self)
+        self.load_fen(fen)
+        self.position_history = dict(repetitions)
+
+    def get_fen(self) -> str:
+        """Retourne la chaîne FEN de la position courante."""
+        rows: List[str] = []
+        for row in self.board:
+            row_text = ""
+            empty = 0
+            for piece in row:
+                if piece == "--":
+                    empty += 1
+                    continue
+                if empty:
+                    row_text += str(empty)
+                    empty = 0
+                char = "P" if piece[1] == "p" else piece[1]
+                row_text += char if piece[0] == "w" else char.lower()
+            if empty:
+                row_text += str(empty)
+            rows.append(row_text)
+        castling = "".join(char for bit, char in ((CASTLE_WKS, "K"), (CASTLE_WQS, "Q"),
+                                                  (CASTLE_BKS, "k"), (CASTLE_BQS, "q"))
+                           if self.castling & bit)
+        if self.enpassant_possible:
+            enpassant = Move.cols_to_files[self.enpassant_possible[1]] + Move.rows_to_ranks[self.enpassant_possible[0]]
+        else:
+            enpassant = "-"
+        plies = len(self.move_log)
+        started_with_black = (not self.white_to_move) if plies % 2 == 0 else self.white_to_move
+        fullmove = self.start_fullmove + (plies + (1 if started_with_black else 0)) // 2
+        return " ".join(["/".join(rows), "w" if self.white_to_move else "b", castling or "-",
+                         enpassant, str(self.fifty_move_counter), str(fullmove)])
+
+    def parse_uci_move(self, text: str) -> Optional["Move"]:
+        """
+        Retrouve parmi les coups légaux celui qui correspond à la notation UCI
+        (ex. e2e4, e7e8n). Pour une promotion, le choix de pièce est reporté sur le coup.
+        """
+        text = text.strip()
+        if len(text) < 4:
+            return None
+        try:
+            start = (Move.ranks_to_rows[text[1]], Move.files_to_cols[text[0]])
+            end = (Move.ranks_to_rows[text[3]], Move.files_to_cols[text[2]])
+        except KeyError:
+            return None
+        move = self.get_move(start, end, legal=True)
+        if move is not None and move.is_pawn_promotion:
+            return move.with_promotion(text[4].upper() if len(text) > 4 else 'Q')
+        return move
+
+    def parse_san_move(self, san: str) -> Optional["Move"]:
+        """
+        Retrouve parmi les coups légaux celui qui correspond à la notation
+        algébrique standard (ex. Nbd7, exd5, e8=Q+, O-O). Retourne None si aucun
+        coup ne correspond ou si la notation est ambiguë.
+        """
+        text = san.rstrip("+#!?")
+        if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+            kingside = len(text) == 3
+            for move in self.getLegalMoves():
+                if move.is_castle_move and (move.end_col > move.start_col) == kingside:
+                    return move
+            return None
+        promotion = None
+        if "=" in text:
+            text, promotion = text.split("=", 1)
+        elif len(text) > 2 and text[-1] in "QRBN" and text[-2].isdigit():
+            text, promotion = text[:-1], text[-1]
+        if len(text) < 2 or text[-2] not in Move.files_to_cols or text[-1] not in Move.ranks_to_rows:
+            return None
+        end = (Move.ranks_to_rows[text[-1]], Move.files_to_cols[text[-2]])
+        piece_type = text[0] if text[0] in "KQRBN" else "p"
+        qualifier = text[1 if piece_type != "p" else 0:-2].replace("x", "")
+        candidates = []
+        for move in self.get_moves_to(end):
+            if move.piece_moved[1] != piece_type or move.is_castle_move:
+                continue
+            start_square = move.getRankFile(move.start_row, move.start_col)
+            if all(char in start_square for char in qualifier):
+                candidates.append(move)
+        if len(candidates) != 1:
+            return None
+        move = candidates[0]
+        if move.is_pawn_promotion:
+            return move.with_promotion((promotion or "Q").upper())
+        return move
+
+    def get_san(self, move: "Move") -> str:
+        """
+        Retourne le coup en notation algébrique standard (SAN), avec
+        désambiguïsation, pièce de promotion et marque d'échec ('+') ou de mat ('#').
+        Doit être appelée avant de jouer le coup.
+        """
+        if move.is_castle_move:
+            san = "O-O" if move.end_col > move.start_col else "O-O-O"
+        else:
+            end_square = move.getRankFile(move.end_row, move.end_col)
+            if move.piece_moved[1] == "p":
+                san = (move.cols_to_files[move.start_col] + "x" if move.is_capture else "") + end_square
+                if move.is_pawn_promotion:
+                    san += "=" + move.promotion_choice
+            else:
+                san = move.piece_moved[1]
+                rivals = [m for m in self.get_moves_to((move.end_row, move.end_col)) if m.piece_moved == move.piece_moved
+                          and (m.start_row, m.start_col) != (move.start_row, move.start_col)]
+                if rivals:
+                    if all(m.start_col != move.start_col for m in rivals):
+                        san += move.cols_to_files[move.start_col]
+                    elif all(m.start_row != move.start_row for m in rivals):
+                        san += move.rows_to_ranks[move.start_row]
+                    else:
+                        san += move.getRankFile(move.start_row, move.start_col)
+                san += ("x" if move.is_capture else "") + end_square
+        self.makeMove(move, validate=False)
+        if self.inCheck():
+            san += "+" if self.getLegalMoves() else "#"
+        self.undoMove()
+        return san
+
+    def _get_move_index(self) -> Tuple[List["Move"], Dict, Dict, Dict]:
+        """
+        Index des coups légaux, construit une seule fois par génération de coups
+        (au premier accès) : par case de départ, par case d'arrivée et par couple
+        (départ, arrivée). Une promotion n'est qu'un coup, le choix de la pièce
+        étant porté par promotion_choice.
+        """
+        moves = self.getLegalMoves()
+        if self._move_index is None or self._move_index[0] is not moves:
+            by_origin: Dict[Tuple[int, int], List["Move"]] = {}
+            by_target: Dict[Tuple[int, int], List["Move"]] = {}
+            by_squares: Dict[Tuple[Tuple[int, int], Tuple[int, int]], "Move"] = {}
+            for move in moves:
+                start, end = (move.start_row, move.start_col), (move.end_row, move.end_col)
+                by_origin.setdefault(start, []).append(move)
+                by_target.setdefault(end, []).append(move)
+                by_squares[(start, end)] = move
+            self._move_index = (moves, by_origin, by_target, by_squares)
+        return self._move_index
+
+    def get_moves_from(self, square: Tuple[int, int], legal: bool = False) -> List["Move"]:
+        """
+        Coups partant de la case donnée. Par défaut, seuls les coups valides sont
+        retournés (aucun si la partie est nulle) ; legal=True ignore l'arbitrage des nulles.
+        """
+        if not legal and not self.getValidMoves():
+            return []
+        return self._get_move_index()[1].get(square, [])
+
+    def get_moves_to(self, square: Tuple[int, int]) -> List["Move"]:
+        """Coups légaux arrivant sur la case donnée."""
+        return self._get_move_index()[2].get(square, [])
 
-    def get_board_hash_str(self) -> str:
-        """Retourne une chaîne représentant l'état du plateau et le tour de jeu."""
-        board_tuple = tuple(tuple(row) for row in self.board)
-        return str(hash((board_tuple, self.white_to_move)))
+    def get_move(self, start: Tuple[int, int], end: Tuple[int, int], legal: bool = False) -> Optional["Move"]:
+        """Retrouve en O(1) le coup de start vers end, ou None s'il n'est pas jouable."""
+        if not legal and not self.getValidMoves():
+            return None
+        return self._get_move_index()[3].get((start, end))
 
     def insufficient_material(self) -> bool:
         """
@@ -165,41 +520,68 @@ class GameState:
         Par exemple : roi seul vs roi seul, roi et un fou/cavalier vs roi.
         Cette implémentation simple ignore certains cas rares.
         """
-        pieces = [p for row in self.board for p in row if p != "--"]
-        non_king = [p for p in pieces if p[1] != "K"]
-        if not non_king:
-            return True
-        if len(non_king) == 1:
-            return True
-        return False
+        if self.board is not self._derived_board:
+            self._sync_derived()
+        counts = self.piece_counts
+        non_king = len(self.piece_squares["w"]) + len(self.piece_squares["b"]) - counts.get("wK", 0) - counts.get("bK", 0)
+        return non_king <= 1
 
     def makeMove(self, move: "Move", promotion_callback: Optional[Callable[[], str]] = None,
                  validate: bool = True) -> None:
         """
         Applique un mouvement sur le plateau.
         Vérifie que le mouvement est valide avant application.
-        Met à jour le compteur des 50 coups et l'historique de position.
+        Met à jour le compteur des 50 coups, la clé de position et l'historique de position.
+        L'état irréversible est sauvegardé dans un seul enregistrement de undo_stack.
         """
-        if validate and move not in self.getValidMoves():
+        if validate and self.get_move((move.start_row, move.start_col), (move.end_row, move.end_col)) is None:
             raise ValueError("Mouvement non valide.")
-            # Sauvegarde des compteurs pour pouvoir annuler
-        self.fifty_move_counter_log.append(self.fifty_move_counter)
-        self.position_history_log.append(copy.deepcopy(self.position_history))
-        self.board[move.start_row][move.start_col] = "--"
-        self.board[move.end_row][move.end_col] = move.piece_moved
+        key = self.get_position_key()
+        # Sauvegarde de l'état irréversible pour pouvoir annuler
+        self.undo_stack.append((self.castling, self.enpassant_possible, self.fifty_move_counter, key, self.pawn_key))
+        board = self.board
+        zobrist = ZOBRIST_PIECES
+        start_sq = move.start_row * 8 + move.start_col
+        end_sq = move.end_row * 8 + move.end_col
+        own_squares = self.piece_squares[move.piece_moved[0]]
+        board[move.start_row][move.start_col] = "--"
+        key ^= zobrist[move.piece_moved][start_sq]
+        own_squares.discard((move.start_row, move.start_col))
+        own_squares.add((move.end_row, move.end_col))
+        if move.piece_moved[1] == 'p':
+            self.pawn_key ^= zobrist[move.piece_moved][start_sq]
+            if not move.is_pawn_promotion:
+                self.pawn_key ^= zobrist[move.piece_moved][end_sq]
+        if move.piece_captured != "--":
+            self.piece_counts[move.piece_captured] -= 1
+            if move.piece_captured[1] == 'p':
+                capture_sq = move.start_row * 8 + move.end_col if move.is_enpassant_move else end_sq
+                self.pawn_key ^= zobrist[move.piece_captured][capture_sq]
+            if not move.is_enpassant_move:
+                key ^= zobrist[move.piece_captured][end_sq]
+                self.piece_squares[move.piece_captured[0]].discard((move.end_row, move.end_col))
+        placed = move.piece_moved
+        # Si le mouvement est une promotion, on demande le choix
+        if move.is_pawn_promotion:
+            promoted_piece = promotion_callback() if promotion_callback else move.promotion_choice
+            move.promotion_choice = promoted_piece
+            placed = move.piece_moved[0] + promoted_piece
+            self.piece_counts[move.piece_moved] -= 1
+            self.piece_counts[placed] = self.piece_counts.get(placed, 0) + 1
+        board[move.end_row][move.end_col] = placed
+        key ^= zobrist[placed][end_sq]
         self.move_log.append(move)
         self.white_to_move = not self.white_to_move
+        key ^= ZOBRIST_BLACK_TO_MOVE
         if move.piece_moved == 'wK':
             self.white_king_location = (move.end_row, move.end_col)
         elif move.piece_moved == 'bK':
             self.black_king_location = (move.end_row, move.end_col)
-        # Si le mouvement est une promotion, on demande le choix
-        if move.is_pawn_promotion:
-            promoted_piece = promotion_callback() if promotion_callback else 'Q'
-            self.board[move.end_row][move.end_col] = move.piece_moved[0] + promoted_piece
         # En passant
         if move.is_enpassant_move:
-            self.board[move.start_row][move.end_col] = "--"
+            board[move.start_row][move.end_col] = "--"
+            key ^= zobrist[move.piece_captured][move.start_row * 8 + move.end_col]
+            self.piece_squares[move.piece_captured[0]].discard((move.start_row, move.end_col))
         # Mise à jour du compteur des 50 coups : réinitialiser en cas de capture ou de mouvement de pion
         if move.is_capture or move.piece_moved[1] == 'p':
             self.fifty_move_counter = 0
@@ -213,83 +595,103 @@ class GameState:
         # Roque
         if move.is_castle_move:
             if move.end_col - move.start_col == 2:  # Roque court
-                self.board[move.end_row][move.end_col - 1] = self.board[move.end_row][move.end_col + 1]
-                self.board[move.end_row][move.end_col + 1] = '--'
+                rook_from, rook_to = move.end_col + 1, move.end_col - 1
             else:
-                self.board[move.end_row][move.end_col + 1] = self.board[move.end_row][move.end_col - 2]
-                self.board[move.end_row][move.end_col - 2] = '--'
-        self.enpassant_possible_log.append(self.enpassant_possible)
+                rook_from, rook_to = move.end_col - 2, move.end_col + 1
+            rook = board[move.end_row][rook_from]
+            board[move.end_row][rook_to] = rook
+            board[move.end_row][rook_from] = '--'
+            if rook != "--":
+                key ^= zobrist[rook][move.end_row * 8 + rook_from] ^ zobrist[rook][move.end_row * 8 + rook_to]
+                own_squares.discard((move.end_row, rook_from))
+                own_squares.add((move.end_row, rook_to))
         self.updateCastleRights(move)
-        self.castle_rights_log.append(CastleRights(
-            self.current_castling_rights.wks, self.current_castling_rights.bks,
-            self.current_castling_rights.wqs, self.current_castling_rights.bqs))
+        self.position_key = key
         self._valid_moves = None
+        self._legal_moves = None
         # Met à jour l'historique des positions
-        self._update_position_history()
+        self.position_history[key] = self.position_history.get(key, 0) + 1
 
     def undoMove(self) -> None:
-        """Annule le dernier mouvement effectué et restaure les compteurs et l'historique."""
+        """Annule le dernier mouvement effectué et restaure l'état irréversible et l'historique."""
         if not self.move_log:
             return
         move = self.move_log.pop()
-        self.board[move.start_row][move.start_col] = move.piece_moved
-        self.board[move.end_row][move.end_col] = move.piece_captured
+        # La position quittée n'est plus sur le chemin courant
+        key = self.get_position_key()
+        count = self.position_history.get(key, 0) - 1
+        if count > 0:
+            self.position_history[key] = count
+        else:
+            self.position_history.pop(key, None)
+        (self.castling, self.enpassant_possible, self.fifty_move_counter, self.position_key,
+         self.pawn_key) = self.undo_stack.pop()
+        board = self.board
+        own_squares = self.piece_squares[move.piece_moved[0]]
+        own_squares.discard((move.end_row, move.end_col))
+        own_squares.add((move.start_row, move.start_col))
+        if move.is_pawn_promotion:
+            promoted = board[move.end_row][move.end_col]
+            self.piece_counts[promoted] -= 1
+            self.piece_counts[move.piece_moved] += 1
+        if move.piece_captured != "--":
+            self.piece_counts[move.piece_captured] += 1
+            capture_row = move.start_row if move.is_enpassant_move else move.end_row
+            self.piece_squares[move.piece_captured[0]].add((capture_row, move.end_col))
+        board[move.start_row][move.start_col] = move.piece_moved
+        board[move.end_row][move.end_col] = move.piece_captured
         self.white_to_move = not self.white_to_move
         if move.piece_moved == 'wK':
             self.white_king_location = (move.start_row, move.start_col)
         elif move.piece_moved == 'bK':
             self.black_king_location = (move.start_row, move.start_col)
         if move.is_enpassant_move:
-            self.board[move.end_row][move.end_col] = "--"
-            self.board[move.start_row][move.end_col] = move.piece_captured
-        self.enpassant_possible_log.pop()
-        self.enpassant_possible = self.enpassant_possible_log[-1]
-        self.castle_rights_log.pop()
-        self.current_castling_rights = self.castle_rights_log[-1]
+            board[move.end_row][move.end_col] = "--"
+            board[move.start_row][move.end_col] = move.piece_captured
         if move.is_castle_move:
             if move.end_col - move.start_col == 2:
-                self.board[move.end_row][move.end_col + 1] = self.board[move.end_row][move.end_col - 1]
-                self.board[move.end_row][move.end_col - 1] = '--'
+                rook_from, rook_to = move.end_col + 1, move.end_col - 1
             else:
-                self.board[move.end_row][move.end_col - 2] = self.board[move.end_row][move.end_col + 1]
-                self.board[move.end_row][move.end_col + 1] = '--'
+                rook_from, rook_to = move.end_col - 2, move.end_col + 1
+            if board[move.end_row][rook_to] != "--":
+                own_squares.discard((move.end_row, rook_to))
+                own_squares.add((move.end_row, rook_from))
+            board[move.end_row][rook_from] = board[move.end_row][rook_to]
+            board[move.end_row][rook_to] = '--'
         self.checkmate = False
         self.stalemate = False
         self._valid_moves = None
-        # Restaure les compteurs
-        self.fifty_move_counter = self.fifty_move_counter_log.pop()
-        self.position_history = self.position_history_log.pop()
+        self._legal_moves = None
 
     def updateCastleRights(self, move: "Move") -> None:
         """Met à jour les droits de roque en fonction du mouvement."""
-        if move.piece_captured == "wR":
+        # Seule la prise d'une tour sur sa case d'origine retire un droit (une tour promue peut être prise en a1)
+        if move.piece_captured == "wR" and move.end_row == 7:
             if move.end_col == 0:
-                self.current_castling_rights.wqs = False
+                self.castling &= ~CASTLE_WQS
             elif move.end_col == 7:
-                self.current_castling_rights.wks = False
-        elif move.piece_captured == "bR":
+                self.castling &= ~CASTLE_WKS
+        elif move.piece_captured == "bR" and move.end_row == 0:
             if move.end_col == 0:
-                self.current_castling_rights.bqs = False
+                self.castling &= ~CASTLE_BQS
             elif move.end_col == 7:
-                self.current_castling_rights.bks = False
+                self.castling &= ~CASTLE_BKS
         if move.piece_moved == 'wK':
-            self.current_castling_rights.wqs = False
-            self.current_castling_rights.wks = False
+            self.castling &= ~(CASTLE_WKS | CASTLE_WQS)
         elif move.piece_moved == 'bK':
-            self.current_castling_rights.bqs = False
-            self.current_castling_rights.bks = False
+            self.castling &= ~(CASTLE_BKS | CASTLE_BQS)
         elif move.piece_moved == 'wR':
             if move.start_row == 7:
                 if move.start_col == 0:
-                    self.current_castling_rights.wqs = False
+                    self.castling &= ~CASTLE_WQS
                 elif move.start_col == 7:
-                    self.current_castling_rights.wks = False
+                    self.castling &= ~CASTLE_WKS
         elif move.piece_moved == 'bR':
             if move.start_row == 0:
                 if move.start_col == 0:
-                    self.current_castling_rights.bqs = False
+                    self.castling &= ~CASTLE_BQS
                 elif move.start_col == 7:
-                    self.current_castling_rights.bks = False
+                    self.castling &= ~CASTLE_BKS
 
     def getValidMoves(self) -> List["Move"]:
         """Retourne la liste des mouvements valides en tenant compte de l’état actuel.
@@ -298,24 +700,42 @@ class GameState:
         """
         if self._valid_moves is not None:
             return self._valid_moves
+        moves: List["Move"] = self.getLegalMoves()
+        # Vérification des règles de draw
+        if self.is_draw():
+            # On force l'arrêt en considérant la partie comme nulle (draw)
+            moves = []
+            self.stalemate = True
+        else:
+            self.stalemate = False
+        if not moves and self.in_check:
+            self.checkmate = True
+        else:
+            self.checkmate = False
+        self._valid_moves = moves
+        return moves
+
+    def getLegalMoves(self) -> List["Move"]:
+        """
+        Retourne les coups légaux selon les règles de déplacement seules, sans
+        arbitrer les nulles (50 coups, répétition, matériel insuffisant).
+        Utilisée pour relire des parties qui continuent après une nulle réclamable.
+        """
+        if self._legal_moves is not None:
+            return self._legal_moves
+        # Clouages de la position courante calculés avant la génération (les générateurs consomment la liste)
+        self.in_check, pins, self.checks = self.checkForPinsAndChecks()
+        self.pins = list(pins)
         moves: List["Move"] = self.getAllPossibleMoves()
-        self.in_check, self.pins, self.checks = self.checkForPinsAndChecks()
+        self.pins = pins
         kingRow, kingCol = (self.white_king_location if self.white_to_move else self.black_king_location)
         if self.in_check:
             if len(self.checks) == 1:
                 # Filtrer les coups pour ne sauver le roi que dans des cases autorisées
-                check = self.checks[0]
-                validSquares: List[Tuple[int, int]] = []
-                if self.board[check[0]][check[1]][1] == 'N':
-                    validSquares = [(check[0], check[1])]
-                else:
-                    for i in range(1, DIMENSION):
-                        validSquare = (kingRow + check[2] * i, kingCol + check[3] * i)
-                        validSquares.append(validSquare)
-                        if validSquare == (check[0], check[1]):
-                            break
+                validSquares = self._check_block_squares(self.checks[0], kingRow, kingCol)
+                # La prise en passant, déjà vérifiée par simulation, peut prendre le pion qui fait échec
                 moves = [move for move in moves if (move.piece_moved == 'wK' or move.piece_moved == 'bK') or (
-                            (move.end_row, move.end_col) in validSquares)]
+                            (move.end_row, move.end_col) in validSquares) or move.is_enpassant_move]
             else:
                 moves = []  # Si le roi est en échec double, seuls les mouvements du roi sont autorisés
                 self.getKingMoves(kingRow, kingCol, moves)
@@ -325,22 +745,65 @@ class GameState:
                 self.getCastleMoves(self.white_king_location[0], self.white_king_location[1], moves)
             else:
                 self.getCastleMoves(self.black_king_location[0], self.black_king_location[1], moves)
-        # Vérification des règles de draw
-        current_hash: str = self.get_board_hash_str()
-        repetition = self.position_history.get(current_hash, 0)
-        if self.fifty_move_counter >= 100 or self.insufficient_material() or repetition >= 3:
-            # On force l'arrêt en considérant la partie comme nulle (draw)
-            moves = []
-            self.stalemate = True
-        else:
-            self.stalemate = False
-        if not moves and self.in_check:
-            self.checkmate = True
-        else:
-            self.checkmate = False
-        self._valid_moves = moves
+        self._legal_moves = moves
         return moves
 
+    def _check_block_squares(self, check: Tuple[int, int, int, int], king_row: int,
+                             king_col: int) -> List[Tuple[int, int]]:
+        """Cases où une pièce (autre que le roi) pare l'échec : prise de la pièce ou interposition."""
+        if self.board[check[0]][check[1]][1] == 'N':
+            return [(check[0], check[1])]
+        squares: List[Tuple[int, int]] = []
+        for i in range(1, DIMENSION):
+            square = (king_row + check[2] * i, king_col + check[3] * i)
+            squares.append(square)
+            if square == (check[0], check[1]):
+                break
+        return squares
+
+    def has_legal_move(self) -> bool:
+        """
+        Vrai si le camp au trait a au moins un coup légal (règles de déplacement
+        seules, comme getLegalMoves). S'arrête au premier coup trouvé, en
+        essayant le roi puis les pièces les moins mobiles, et ne modifie ni les
+        coups en cache ni checkmate, stalemate, in_check et pins. Le roque n'est
+        pas essayé : s'il est possible, le roi peut aussi avancer d'une case.
+        """
+        if self._legal_moves is not None:
+            return bool(self._legal_moves)
+        if self.board is not self._derived_board:
+            self._sync_derived()
+        in_check, pins, checks = self.checkForPinsAndChecks()
+        king_row, king_col = self.white_king_location if self.white_to_move else self.black_king_location
+        moves: List["Move"] = []
+        self.getKingMoves(king_row, king_col, moves)
+        if moves:
+            return True
+        if len(checks) > 1:
+            return False
+        valid_squares = self._check_block_squares(checks[0], king_row, king_col) if in_check else None
+        squares = self.piece_squares[Color.WHITE.value if self.white_to_move else Color.BLACK.value]
+        saved_pins = self.pins
+        self.pins = pins  # Les générateurs consomment la liste des clouages : on leur prête celle calculée ici
+        try:
+            for r, c in sorted(squares, key=lambda square: LEGAL_MOVE_SEARCH_ORDER[self.board[square[0]][square[1]][1]]):
+                piece = self.board[r][c][1]
+                if piece == 'K':
+                    continue
+                moves = []
+                self.move_functions[piece](r, c, moves)
+                if any(valid_squares is None or (move.end_row, move.end_col) in valid_squares
+                       or move.is_enpassant_move for move in moves):
+                    return True
+            return False
+        finally:
+            self.pins = saved_pins
+
+    def is_draw(self) -> bool:
+        """Nulle par la règle des 50 coups, la triple répétition ou le matériel insuffisant (sans effet de bord)."""
+        return (self.fifty_move_counter >= 100 or self.insufficient_material()
+                or self.position_history.get(self.get_position_key(), 0) >= 3)
+
     def inCheck(self) -> bool:
         """Retourne True si le roi du joueur courant est en échec."""
         if self.white_to_move:
@@ -364,14 +827,12 @@ class GameState:
     def getAllPossibleMoves(self) -> List["Move"]:
         """Retourne tous les mouvements possibles sans filtrer pour les échecs."""
         moves: List["Move"] = []
-        for r in range(DIMENSION):
-            for c in range(DIMENSION):
-                if self.board[r][c] == "--":
-                    continue
-                turn: str = self.board[r][c][0]
-                if (turn == Color.WHITE.value and self.white_to_move) or (turn == Color.BLACK.value and not self.white_to_move):
-                    piece: str = self.board[r][c][1]
-                    self.move_functions[piece](r, c, moves)
+        if self.board is not self._derived_board:
+            self._sync_derived()
+        # Parcours des seules cases occupées par le camp au trait, dans l'ordre du plateau
+        squares = self.piece_squares[Color.WHITE.value if self.white_to_move else Color.BLACK.value]
+        for r, c in sorted(squares):
+            self.move_functions[self.board[r][c][1]](r, c, moves)
         return moves
 
     def getPawnMoves(self, row: int, col: int, moves: List["Move"]) -> None:
@@ -409,9 +870,25 @@ class GameState:
                     target = self.board[row + move_amount][new_col]
                     if target[0] == enemy_color:
                         moves.append(Move((row, col), (row + move_amount, new_col), self.board))
-                    if (row + move_amount, new_col) == self.enpassant_possible:
+                    if ((row + move_amount, new_col) == self.enpassant_possible
+                            and not self._enpassant_exposes_king(row, col, row + move_amount, new_col)):
                         moves.append(Move((row, col), (row + move_amount, new_col), self.board, is_enpassant_move=True))
 
+    def _enpassant_exposes_king(self, row: int, col: int, end_row: int, end_col: int) -> bool:
+        """
+        Vrai si la prise en passant laisse le roi en échec : les deux pions
+        quittent la même rangée (échec horizontal découvert) ou le pion pris
+        masquait une diagonale, ce que les clouages ne détectent pas.
+        """
+        board = self.board
+        pawn, captured = board[row][col], board[row][end_col]
+        board[row][col] = board[row][end_col] = "--"
+        board[end_row][end_col] = pawn
+        try:
+            return self.checkForPinsAndChecks()[0]
+        finally:
+            board[row][col], board[row][end_col], board[end_row][end_col] = pawn, captured, "--"
+
     def getRookMoves(self, r: int, c: int, moves: List["Move"]) -> None:
         """
         Ajoute à la liste 'moves' tous les mouvements valides de la tour située en (r, c).
@@ -545,11 +1022,9 @@ class GameState:
         """
         if self.squareUnderAttack(row, col):
             return
-        if (self.white_to_move and self.current_castling_rights.wks) or (
-                not self.white_to_move and self.current_castling_rights.bks):
+        if self.castling & (CASTLE_WKS if self.white_to_move else CASTLE_BKS):
             self.getKingsideCastleMoves(row, col, moves)
-        if (self.white_to_move and self.current_castling_rights.wqs) or (
-                not self.white_to_move and self.current_castling_rights.bqs):
+        if self.castling & (CASTLE_WQS if self.white_to_move else CASTLE_BQS):
             self.getQueensideCastleMoves(row, col, moves)
 
     def getKingsideCastleMoves(self, row, col, moves):
@@ -646,6 +1121,8 @@ class Move():
         self.moveID: int = self.start_row * 1000 + self.start_col * 100 + self.end_row * 10 + self.end_col
         self.is_pawn_promotion: bool = (self.piece_moved == 'wp' and self.end_row == 0) or (
                     self.piece_moved == 'bp' and self.end_row == 7)
+        # Pièce choisie pour la promotion (mise à jour par makeMove)
+        self.promotion_choice: str = 'Q'
         self.is_enpassant_move: bool = is_enpassant_move
         if self.is_enpassant_move:
             self.piece_captured = 'wp' if self.piece_moved == 'bp' else 'bp'
@@ -655,9 +1132,26 @@ class Move():
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, Move) and self.moveID == other.moveID
 
+    def with_promotion(self, piece: str) -> "Move":
+        """
+        Copie du coup avec la pièce de promotion donnée. Les coups des listes
+        en cache ne sont jamais modifiés : un coup analysé sans être joué ne
+        change pas celui que le moteur jouera ensuite.
+        """
+        move = copy.copy(self)
+        move.promotion_choice = piece
+        return move
+
     def getRankFile(self, r: int, c: int) -> str:
         return self.cols_to_files[c] + self.rows_to_ranks[r]
 
+    def getUCINotation(self) -> str:
+        """Retourne le coup en notation UCI (ex. e2e4, e7e8q)."""
+        notation = self.getRankFile(self.start_row, self.start_col) + self.getRankFile(self.end_row, self.end_col)
+        if self.is_pawn_promotion:
+            notation += self.promotion_choice.lower()
+        return notation
+
     def getChessNotation(self) -> str:
         if self.is_pawn_promotion:
             return self.getRankFile(self.end_row, self.end_col) + "Q"
@@ -0,0 +1,135 @@
+"""
+Module ChessEval
+-----------------
+Termes de structure de pions de l'évaluation et tables de hachage associées.
+
+La structure de pions (pions doublés, isolés, arriérés et passés) ne dépend
+que des pions, qui bougent rarement : elle est mémorisée dans une table
+indexée par la clé de Zobrist des pions (GameState.get_pawn_key). Le bouclier
+de pions devant le roi dépend aussi du roi et reste calculé à chaque appel,
+pour quelques accès au plateau.
+
+HashTable est une table de taille fixe (puissance de deux) à une entrée par
+case, remplacée à chaque écriture : la mémoire est bornée et l'accès reste
+en temps constant. Chaque table compte ses sondages et ses succès.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import ChessEngine
+
+# Poids de EVAL_PARAMS pris en compte par pawn_structure_score
+PAWN_STRUCTURE_TERMS: Tuple[str, ...] = ("doubled_pawn_penalty", "isolated_pawn_penalty",
+                                         "backward_pawn_penalty", "passed_pawn_bonus")
+
+
+class HashTable:
+    """
+    Table de hachage de taille fixe : 2 ** size_bits entrées, indexées par les
+    bits de poids faible de la clé. Une écriture remplace l'entrée de sa case.
+    check complète la clé lorsque celle-ci ne décrit pas tout l'état utile.
+    """
+
+    def __init__(self, size_bits: int) -> None:
+        self.mask = (1 << size_bits) - 1
+        self.entries: List[Optional[Tuple[int, Any, Any]]] = [None] * (1 << size_bits)
+        self.probes = 0
+        self.hits = 0
+
+    def get(self, key: int, check: Any = None) -> Any:
+        """Valeur mémorisée pour (key, check), None si absente ou remplacée."""
+        self.probes += 1
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key and entry[1] == check:
+            self.hits += 1
+            return entry[2]
+        return None
+
+    def put(self, key: int, value: Any, check: Any = None) -> None:
+        self.entries[key & self.mask] = (key, check, value)
+
+    def clear(self) -> None:
+        self.entries = [None] * len(self.entries)
+        self.probes = 0
+        self.hits = 0
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+
+def pawn_squares(game_state: ChessEngine.GameState, color: str) -> List[Tuple[int, int]]:
+    """Cases des pions du camp color."""
+    board = game_state.board
+    return [(r, c) for r, c in game_state.get_piece_squares(color) if board[r][c][1] == 'p']
+
+
+def pawn_structure_features(white_pawns: Iterable[Tuple[int, int]],
+                            black_pawns: Iterable[Tuple[int, int]]) -> Dict[str, float]:
+    """
+    Coefficient de chaque poids de structure de pions, du point de vue des
+    blancs : nombre de pions doublés, isolés et arriérés (comptés en négatif,
+    ce sont des pénalités) et somme des avances des pions passés. Le score
+    vaut la somme des poids multipliés par leurs coefficients.
+    """
+    white_pawns, black_pawns = list(white_pawns), list(black_pawns)
+    features = dict.fromkeys(PAWN_STRUCTURE_TERMS, 0.0)
+    # Les blancs avancent vers les lignes d'indice décroissant
+    for sign, own, enemy, direction in ((1, white_pawns, black_pawns, -1), (-1, black_pawns, white_pawns, 1)):
+        files = [0] * ChessEngine.DIMENSION
+        for _, c in own:
+            files[c] += 1
+        features["doubled_pawn_penalty"] -= sign * sum(count - 1 for count in files if count > 1)
+        for r, c in own:
+            neighbours = [row for row, col in own if abs(col - c) == 1]
+            if not neighbours:
+                features["isolated_pawn_penalty"] -= sign
+            elif all((row - r) * direction > 0 for row in neighbours) and any(
+                    (row, col) in ((r + 2 * direction, c - 1), (r + 2 * direction, c + 1)) for row, col in enemy):
+                # Arriéré : les pions voisins sont tous devant et la case d'avance est contrôlée
+                features["backward_pawn_penalty"] -= sign
+            if not any(abs(col - c) <= 1 and (row - r) * direction > 0 for row, col in enemy):
+                features["passed_pawn_bonus"] += sign * (6 - r if direction < 0 else r - 1)
+    return features
+
+
+def pawn_structure_score(white_pawns: Iterable[Tuple[int, int]], black_pawns: Iterable[Tuple[int, int]],
+                         params: Dict[str, float]) -> float:
+    """
+    Score de la structure de pions du point de vue des blancs : pénalités pour
+    les pions doublés, isolés et arriérés, bonus pour les pions passés
+    (proportionnel à leur avance).
+    """
+    features = pawn_structure_features(white_pawns, black_pawns)
+    return sum(params[name] * value for name, value in features.items())
+
+
+def king_shield_count(game_state: ChessEngine.GameState) -> int:
+    """Pions amis sur les deux rangées devant le roi blanc, moins ceux devant le roi noir."""
+    board = game_state.board
+    count = 0
+    for sign, (king_row, king_col), pawn, direction in ((1, game_state.white_king_location, "wp", -1),
+                                                        (-1, game_state.black_king_location, "bp", 1)):
+        for distance in (1, 2):
+            row = king_row + direction * distance
+            if not 0 <= row < ChessEngine.DIMENSION:
+                break
+            for col in (king_col - 1, king_col, king_col + 1):
+                if 0 <= col < ChessEngine.DIMENSION and board[row][col] == pawn:
+                    count += sign
+    return count
+
+
+def king_shield_score(game_state: ChessEngine.GameState, params: Dict[str, float]) -> float:
+    """Bonus (point de vue des blancs) par pion ami sur les deux rangées devant chaque roi."""
+    bonus = params["pawn_shield_bonus"]
+    return bonus * king_shield_count(game_state) if bonus else 0.0
+
+
+def pawn_score(game_state: ChessEngine.GameState, params: Dict[str, float], pawn_hash: HashTable) -> float:
+    """Structure de pions (mémorisée dans pawn_hash) et bouclier des rois, du point de vue des blancs."""
+    key = game_state.get_pawn_key()
+    structure = pawn_hash.get(key)
+    if structure is None:
+        structure = pawn_structure_score(pawn_squares(game_state, "w"), pawn_squares(game_state, "b"), params)
+        pawn_hash.put(key, structure)
+    return structure + king_shield_score(game_state, params)
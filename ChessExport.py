@@ -0,0 +1,199 @@
+"""
+Module ChessExport
+-------------------
+Export des positions de parties en tableaux numpy pour l'apprentissage.
+
+Chaque position jouée d'une partie donne :
+    planes    (12, 8, 8) uint8  une case à 1 par pièce, un plan par type de
+                                pièce (PLANE_PIECES), dans la disposition de
+                                GameState.board (ligne 0 = 8e rangée)
+    features  (13,) uint8       trait aux blancs, quatre droits de roque et
+                                colonne de prise en passant (FEATURE_NAMES)
+    moves     () uint16         coup joué ensuite, codé comme ChessSave :
+                                code & 0xFFF = départ + 64 × arrivée
+    results   () uint8          résultat de la partie (ChessDatabase.RESULT_CODES)
+
+Les tableaux sont écrits dans des fichiers .npy de SHARD_SIZE positions
+(planes_00000.npy, features_00000.npy, ...), ouverts en memmap et remplis
+par blocs de CHUNK_SIZE positions : la mémoire utilisée ne dépend que de la
+taille d'un bloc, quelle que soit la taille du jeu de données. Les fichiers se
+relisent avec np.load(path, mmap_mode="r") ou load_shards().
+
+Usage : python ChessExport.py parties.pgn sortie/
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, TextIO, Tuple
+
+import numpy as np
+
+import ChessEngine
+import ChessPGN
+import ChessSave
+from ChessDatabase import RESULT_CODES
+
+PLANE_PIECES: Tuple[str, ...] = ("wp", "wN", "wB", "wR", "wQ", "wK", "bp", "bN", "bB", "bR", "bQ", "bK")
+PIECE_INDEX: Dict[str, int] = {piece: index for index, piece in enumerate(PLANE_PIECES)}
+EMPTY_INDEX: int = len(PLANE_PIECES)
+FEATURE_NAMES: Tuple[str, ...] = (("white_to_move", "wks", "wqs", "bks", "bqs")
+                                  + tuple("ep_" + ChessEngine.Move.cols_to_files[col] for col in range(8)))
+ARRAYS: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "planes": ("u1", (len(PLANE_PIECES), 8, 8)),
+    "features": ("u1", (len(FEATURE_NAMES),)),
+    "moves": ("<u2", ()),
+    "results": ("u1", ()),
+}
+SHARD_SIZE: int = 1 << 16
+CHUNK_SIZE: int = 1 << 12
+
+
+def square_indices(game_state: ChessEngine.GameState) -> List[int]:
+    """Indice de plan de chaque case (EMPTY_INDEX pour une case vide), dans l'ordre du plateau."""
+    return [PIECE_INDEX.get(piece, EMPTY_INDEX) for row in game_state.board for piece in row]
+
+
+def position_features(game_state: ChessEngine.GameState) -> List[int]:
+    """Trait, droits de roque et colonne de prise en passant, dans l'ordre de FEATURE_NAMES."""
+    rights = game_state.current_castling_rights
+    features = [int(game_state.white_to_move), int(rights.wks), int(rights.wqs), int(rights.bks), int(rights.bqs)]
+    enpassant = [0] * ChessEngine.DIMENSION
+    if game_state.enpassant_possible:
+        enpassant[game_state.enpassant_possible[1]] = 1
+    return features + enpassant
+
+
+def to_planes(indices: np.ndarray) -> np.ndarray:
+    """Plans (N, 12, 8, 8) à partir des indices de cases (N, 64), en une opération vectorisée."""
+    planes = indices[:, None, :] == np.arange(len(PLANE_PIECES), dtype=indices.dtype)[None, :, None]
+    return planes.astype(np.uint8).reshape(len(indices), len(PLANE_PIECES), 8, 8)
+
+
+def position_planes(game_state: ChessEngine.GameState) -> np.ndarray:
+    """Plans (12, 8, 8) d'une seule position."""
+    return to_planes(np.array([square_indices(game_state)], dtype=np.uint8))[0]
+
+
+def iter_positions(stream: TextIO) -> Iterator[Tuple[ChessEngine.GameState, ChessEngine.Move, str]]:
+    """
+    Rejoue les parties d'un flux PGN et produit (position, coup joué, résultat)
+    avant chaque coup. Une partie s'arrête à son premier coup invalide.
+    """
+    for game in ChessPGN.read_games(stream):
+        try:
+            game_state = ChessEngine.GameState.from_fen(game.start_fen())
+        except ValueError:
+            continue
+        for san in game.moves:
+            move = game_state.parse_san_move(san)
+            if move is None:
+                break
+            yield game_state, move, game.result
+            game_state.makeMove(move, validate=False)
+
+
+class ShardWriter:
+    """
+    Écrit un tableau ligne à ligne dans des fichiers .npy en memmap de
+    shard_size lignes (directory/name_00000.npy, ...). Le dernier fichier est
+    ramené au nombre de lignes écrites par close().
+    """
+
+    def __init__(self, directory: str, name: str, dtype: str, shape: Tuple[int, ...], shard_size: int) -> None:
+        self.directory = directory
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.shape = shape
+        self.shard_size = shard_size
+        self.shard_count = 0
+        self.current: np.ndarray = np.zeros((0,) + shape, dtype=self.dtype)
+        self.filled = 0
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{self.name}_{number:05d}.npy")
+
+    def write(self, block: np.ndarray) -> None:
+        start = 0
+        while start < len(block):
+            if self.filled == len(self.current):
+                self._next_shard()
+            count = min(len(block) - start, len(self.current) - self.filled)
+            self.current[self.filled:self.filled + count] = block[start:start + count]
+            self.filled += count
+            start += count
+        self.current.flush()
+
+    def _next_shard(self) -> None:
+        self.current = np.lib.format.open_memmap(self._path(self.shard_count), mode="w+", dtype=self.dtype,
+                                                 shape=(self.shard_size,) + self.shape)
+        self.shard_count += 1
+        self.filled = 0
+
+    def close(self) -> None:
+        if not self.shard_count or self.filled == len(self.current):
+            return
+        # Dernier fichier incomplet : recopié à sa taille exacte (au plus shard_size lignes)
+        path = self._path(self.shard_count - 1)
+        data = np.array(self.current[:self.filled])
+        del self.current
+        np.save(path, data)
+        self.current = np.zeros((0,) + self.shape, dtype=self.dtype)
+        self.filled = 0
+
+
+def export_positions(positions: Iterator[Tuple[ChessEngine.GameState, ChessEngine.Move, str]], directory: str,
+                     shard_size: int = SHARD_SIZE, chunk_size: int = CHUNK_SIZE) -> int:
+    """Écrit les positions dans les fichiers .npy de directory. Retourne leur nombre."""
+    os.makedirs(directory, exist_ok=True)
+    writers = {name: ShardWriter(directory, name, dtype, shape, shard_size) for name, (dtype, shape) in ARRAYS.items()}
+    chunk: Dict[str, list] = {name: [] for name in ARRAYS}
+    count = 0
+
+    def flush() -> None:
+        writers["planes"].write(to_planes(np.array(chunk["planes"], dtype=np.uint8)))
+        for name in ("features", "moves", "results"):
+            writers[name].write(np.array(chunk[name], dtype=ARRAYS[name][0]))
+        for rows in chunk.values():
+            rows.clear()
+
+    for game_state, move, result in positions:
+        chunk["planes"].append(square_indices(game_state))
+        chunk["features"].append(position_features(game_state))
+        chunk["moves"].append(ChessSave.encode_move(move))
+        chunk["results"].append(RESULT_CODES.get(result, 0))
+        count += 1
+        if len(chunk["moves"]) >= chunk_size:
+            flush()
+    if chunk["moves"]:
+        flush()
+    for writer in writers.values():
+        writer.close()
+    return count
+
+
+def export_pgn(stream: TextIO, directory: str, shard_size: int = SHARD_SIZE, chunk_size: int = CHUNK_SIZE) -> int:
+    """Exporte toutes les positions jouées des parties d'un flux PGN."""
+    return export_positions(iter_positions(stream), directory, shard_size, chunk_size)
+
+
+def load_shards(directory: str, name: str) -> List[np.ndarray]:
+    """Fichiers du tableau name (planes, features, moves ou results), ouverts en memmap, dans l'ordre."""
+    return [np.load(path, mmap_mode="r") for path in sorted(glob.glob(os.path.join(directory, name + "_*.npy")))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export des positions de parties PGN en tableaux numpy")
+    parser.add_argument("pgn")
+    parser.add_argument("output")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    with open(args.pgn, encoding="utf-8", errors="replace") as pgn_file:
+        exported = export_pgn(pgn_file, args.output, args.shard_size, args.chunk_size)
+    elapsed = time.perf_counter() - start_time
+    print(f"{exported} positions exportées en {elapsed:.2f} s "
+          f"({exported / elapsed if elapsed else 0:.0f} positions/s)", file=sys.stderr)
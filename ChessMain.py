@@ -3,9 +3,11 @@ Fichier Principal, gérant les entrées/sorties, la personnalisation et les sauv
 """
 
 import pygame as p
-import sys, os, pickle, logging
-from multiprocessing import Process, Queue
-import ChessEngine, ChessAI
+import sys, os, logging, threading
+from collections import OrderedDict
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+import ChessEngine, ChessAI, ChessSave
 
 # --------------------------------------------------
 # Constantes d'affichage
@@ -16,7 +18,17 @@ MOVE_LOG_PANEL_WIDTH = 250
 LEFT_PANEL_WIDTH = 250
 MOVE_LOG_PANEL_HEIGHT = BOARD_HEIGHT
 MAX_FPS = 15
+ANIMATION_FPS = 60
+LOADING_BLINK_MS = 500  # Période de l'animation « IA réfléchit... »
+AI_MOVE_EVENT = p.USEREVENT + 1  # Posté par le thread qui attend le résultat de l'IA
 SQ_SIZE = BOARD_HEIGHT // DIMENSION
+MIN_SQ_SIZE = 32
+
+# Fichiers de sauvegarde (format ChessSave) et journal de la partie en cours
+SAVE_FILE = "saved_game.cps"
+JOURNAL_FILE = "current_game.journal"
+RECOVERY_FILE = "recovered_game.journal"
+ANALYSIS_CACHE_FILE = "analysis_cache.sqlite"  # Cache d'analyse de l'IA (ChessCache)
 
 # Drapeau pour inverser le plateau (True = plateau retourné, i.e. les noirs en bas)
 flip_board = False
@@ -32,26 +44,168 @@ logging.info("Lancement du jeu d'échecs")
 # Gestion des ressources
 # --------------------------------------------------
 class ResourceManager:
+    """
+    Cache des images de pièces. Les 12 images sont chargées une seule fois
+    depuis le disque et converties au format de l'écran (convert_alpha) ; les
+    versions mises à l'échelle sont gardées par taille de case, en évinçant
+    la taille la moins récemment utilisée au-delà de MAX_SIZES. Avec
+    use_atlas, les 12 pièces d'une taille sont regroupées dans une seule
+    surface et get_image retourne des sous-surfaces de cet atlas.
+    """
+    PIECES = ("wp", "wR", "wN", "wB", "wQ", "wK", "bp", "bR", "bN", "bB", "bQ", "bK")
+    MAX_SIZES = 4
     _instance = None
 
-    def __new__(cls, sq_size, image_path="images"):
+    def __new__(cls, sq_size, image_path="images", use_atlas=False):
         if cls._instance is None:
             cls._instance = super(ResourceManager, cls).__new__(cls)
-            cls._instance.sq_size = sq_size
             cls._instance.image_path = image_path
-            cls._instance.cache = {}
+            cls._instance.use_atlas = use_atlas
+            cls._instance.originals = {}
+            cls._instance.cache = OrderedDict()  # taille de case -> {pièce: surface}
+        cls._instance.sq_size = sq_size
         return cls._instance
 
-    def get_image(self, piece):
-        if piece in self.cache:
-            return self.cache[piece]
-        path = os.path.join(self.image_path, piece + ".png")
-        if not os.path.exists(path):
-            logging.error(f"Image not found: {path}")
-            raise FileNotFoundError(f"Image not found: {path}")
-        image = p.transform.scale(p.image.load(path), (self.sq_size, self.sq_size))
-        self.cache[piece] = image
-        return image
+    def load_originals(self):
+        for piece in self.PIECES:
+            path = os.path.join(self.image_path, piece + ".png")
+            if not os.path.exists(path):
+                logging.error(f"Image not found: {path}")
+                raise FileNotFoundError(f"Image not found: {path}")
+            image = p.image.load(path)
+            # Conversion au format de l'écran pour des blits rapides (nécessite une fenêtre ouverte)
+            self.originals[piece] = image.convert_alpha() if p.display.get_surface() else image
+
+    def images_for_size(self, sq_size):
+        images = self.cache.get(sq_size)
+        if images is not None:
+            self.cache.move_to_end(sq_size)
+            return images
+        if not self.originals:
+            self.load_originals()
+        scale = lambda image: (p.transform.smoothscale if image.get_bitsize() in (24, 32) else p.transform.scale)(
+            image, (sq_size, sq_size))
+        scaled = {piece: scale(image) for piece, image in self.originals.items()}
+        if self.use_atlas:
+            atlas = p.Surface((sq_size * len(self.PIECES), sq_size), p.SRCALPHA)
+            images = {}
+            for index, piece in enumerate(self.PIECES):
+                atlas.blit(scaled[piece], (index * sq_size, 0))
+                images[piece] = atlas.subsurface(p.Rect(index * sq_size, 0, sq_size, sq_size))
+        else:
+            images = scaled
+        self.cache[sq_size] = images
+        while len(self.cache) > self.MAX_SIZES:
+            self.cache.popitem(last=False)
+        return images
+
+    def get_image(self, piece, sq_size=None):
+        images = self.images_for_size(sq_size or self.sq_size)
+        if piece not in images:
+            logging.error(f"Image not found: {piece}")
+            raise FileNotFoundError(f"Image not found: {piece}")
+        return images[piece]
+
+# --------------------------------------------------
+# Polices et fond du plateau mis en cache
+# --------------------------------------------------
+_font_cache = {}
+
+def get_font(name, size, bold=False, italic=False):
+    """Retourne une police partagée (créée une seule fois par combinaison)."""
+    key = (name, size, bold, italic)
+    font = _font_cache.get(key)
+    if font is None:
+        font = p.font.SysFont(name, size, bold, italic)
+        _font_cache[key] = font
+    return font
+
+# Fond du plateau (cases et coordonnées) pré-rendu : clé (taille de case, couleurs, flip)
+_board_background = {"key": None, "surface": None}
+
+def get_board_background(sq_size):
+    """
+    Retourne le fond du plateau rendu une seule fois. Il n'est recalculé que si
+    la taille des cases, les couleurs (customization_menu) ou le flip changent.
+    """
+    key = (sq_size, tuple(ui_manager.board_color1), tuple(ui_manager.board_color2), flip_board)
+    if _board_background["key"] != key:
+        surface = p.Surface((DIMENSION * sq_size, DIMENSION * sq_size))
+        font = get_font("Arial", 16, bold=True)
+        for row in range(DIMENSION):
+            for col in range(DIMENSION):
+                render_square_background(surface, row, col, sq_size, font)
+        _board_background["key"] = key
+        _board_background["surface"] = surface.convert() if p.display.get_surface() else surface
+    return _board_background["surface"]
+
+def invalidate_board_background():
+    _board_background["key"] = None
+
+# --------------------------------------------------
+# Historique des coups
+# --------------------------------------------------
+class MoveLogView:
+    """
+    Rendu incrémental de l'historique des coups. Chaque ligne (« N. coup coup »)
+    est rendue une seule fois puis gardée en cache ; seuls les coups nouveaux ou
+    annulés entraînent un nouveau rendu, et seule la dernière ligne (en jaune)
+    est rendue à part. Au dessin, seules les lignes visibles dans la fenêtre de
+    défilement sont copiées : le coût ne dépend plus de la longueur de la partie.
+    """
+
+    def __init__(self):
+        self.font = None
+        self.move_log = None
+        self.lines = []  # [coups de la ligne (tuple), surface blanche ou None]
+        self.last_line = (None, None)  # (coups, surface jaune)
+
+    def sync(self, move_log, font):
+        """Met le cache en accord avec move_log en ne traitant que la fin modifiée."""
+        if font is not self.font or move_log is not self.move_log:
+            self.font, self.move_log = font, move_log
+            self.lines = []
+            self.last_line = (None, None)
+        line_count = (len(move_log) + 1) // 2
+        del self.lines[line_count:]
+        # Remonte depuis la fin tant que les lignes en cache ne correspondent plus aux coups
+        index = len(self.lines)
+        while index > 0 and self.lines[index - 1][0] != tuple(move_log[2 * (index - 1):2 * index]):
+            index -= 1
+        del self.lines[index:]
+        for i in range(index, line_count):
+            self.lines.append([tuple(move_log[2 * i:2 * i + 2]), None])
+
+    def line_height(self):
+        return self.font.get_height() + 2
+
+    @staticmethod
+    def line_text(number, moves):
+        text = f"{number}. {moves[0]} "
+        if len(moves) > 1:
+            text += f"{moves[1]}"
+        return text
+
+    def line_surface(self, index):
+        moves = self.lines[index][0]
+        if index == len(self.lines) - 1:
+            if self.last_line[0] != moves:
+                self.last_line = (moves, self.font.render(self.line_text(index + 1, moves), True, p.Color('yellow')))
+            return self.last_line[1]
+        if self.lines[index][1] is None:
+            self.lines[index][1] = self.font.render(self.line_text(index + 1, moves), True, p.Color('white'))
+        return self.lines[index][1]
+
+    def draw(self, screen, rect, offset):
+        """Dessine les lignes visibles dans rect, décalées de offset pixels."""
+        line_height = self.line_height()
+        first = max(0, (offset - 5) // line_height)
+        last = min(len(self.lines), (offset - 5 + rect.height) // line_height + 1)
+        previous_clip = screen.get_clip()
+        screen.set_clip(rect)
+        for index in range(first, last):
+            screen.blit(self.line_surface(index), (rect.x + 5, rect.y + 5 - offset + index * line_height))
+        screen.set_clip(previous_clip)
 
 # --------------------------------------------------
 # UI Manager
@@ -72,6 +226,13 @@ class UIManager:
         self.black_time = 0
         self.last_time = p.time.get_ticks()
         self.is_running = True
+        self.move_log_view = MoveLogView()
+        self._timer_texts = {}  # (texte, actif) -> surface rendue
+
+    def resize(self, board_size):
+        """Adapte les panneaux à la nouvelle taille du plateau."""
+        self.board_width = self.board_height = board_size
+        self.move_log_panel_height = board_size
 
     def update_timer(self, white_to_move):
         current_time = p.time.get_ticks()
@@ -84,70 +245,75 @@ class UIManager:
             else:
                 self.black_time += elapsed
 
+    @staticmethod
+    def format_time(seconds):
+        minutes = int(seconds // 60)
+        seconds = int(seconds % 60)
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def ms_until_timer_change(self, white_to_move):
+        """Millisecondes avant que la seconde affichée change (None si le chronomètre est arrêté)."""
+        if not self.is_running:
+            return None
+        elapsed = self.white_time if white_to_move else self.black_time
+        return int((1 - elapsed % 1) * 1000) + 1
+
+    def timer_state(self, white_to_move):
+        """Contenu affiché par le chronomètre (change au plus une fois par seconde)."""
+        return self.format_time(self.white_time), self.format_time(self.black_time), white_to_move
+
     def draw_timer(self, screen, white_to_move):
         # Fond du chronomètre
         timer_rect = p.Rect(10, 10, LEFT_PANEL_WIDTH - 20, 100)
         p.draw.rect(screen, p.Color('black'), timer_rect)
         p.draw.rect(screen, p.Color('white'), timer_rect, 2)
 
-        # Police pour le chronomètre
-        font = p.font.SysFont("Arial", 24, bold=True)
-        
-        # Formatage du temps
-        def format_time(seconds):
-            minutes = int(seconds // 60)
-            seconds = int(seconds % 60)
-            return f"{minutes:02d}:{seconds:02d}"
-
-        # Affichage du temps des blancs
-        white_text = font.render(f"Blancs: {format_time(self.white_time)}", True, 
-                               p.Color('white') if white_to_move else p.Color('gray'))
-        screen.blit(white_text, (20, 20))
-
-        # Affichage du temps des noirs
-        black_text = font.render(f"Noirs: {format_time(self.black_time)}", True, 
-                               p.Color('white') if not white_to_move else p.Color('gray'))
-        screen.blit(black_text, (20, 60))
+        # Affichage du temps des blancs puis des noirs
+        screen.blit(self.timer_text(f"Blancs: {self.format_time(self.white_time)}", white_to_move), (20, 20))
+        screen.blit(self.timer_text(f"Noirs: {self.format_time(self.black_time)}", not white_to_move), (20, 60))
+        return timer_rect
+
+    def timer_text(self, text, active):
+        """Rendu d'une ligne du chronomètre, refait seulement quand la seconde affichée change."""
+        key = (text, active)
+        surface = self._timer_texts.get(key)
+        if surface is None:
+            if len(self._timer_texts) > 8:
+                self._timer_texts.clear()
+            font = get_font("Arial", 24, bold=True)
+            surface = font.render(text, True, p.Color('white') if active else p.Color('gray'))
+            self._timer_texts[key] = surface
+        return surface
+
+    def left_panel_rect(self):
+        return p.Rect(0, 0, LEFT_PANEL_WIDTH, self.move_log_panel_height)
+
+    def move_log_rect(self):
+        return p.Rect(self.board_width + LEFT_PANEL_WIDTH, 0, self.move_log_panel_width, self.move_log_panel_height)
+
+    def draw_left_panel(self, screen, white_to_move):
+        # Panneau gauche et chronomètre
+        p.draw.rect(screen, p.Color('black'), self.left_panel_rect())
+        self.draw_timer(screen, white_to_move)
 
     def draw_move_log(self, screen, game_state, font):
-        # Panneau gauche
-        left_panel_rect = p.Rect(0, 0, LEFT_PANEL_WIDTH, self.move_log_panel_height)
-        p.draw.rect(screen, p.Color('black'), left_panel_rect)
-        
-        # Affichage du chronomètre
-        self.draw_timer(screen, game_state.white_to_move)
-        
-        # Panneau droit (historique des coups)
-        move_log_rect = p.Rect(self.board_width + LEFT_PANEL_WIDTH, 0, self.move_log_panel_width, self.move_log_panel_height)
+        self.draw_left_panel(screen, game_state.white_to_move)
+        self.draw_move_log_panel(screen, game_state, font)
+
+    def draw_move_log_panel(self, screen, game_state, font):
+        # Panneau droit (historique des coups), seules les lignes visibles sont dessinées
+        move_log_rect = self.move_log_rect()
         p.draw.rect(screen, p.Color('black'), move_log_rect)
-        
-        # Affichage des coups
-        move_texts = []
-        for i in range(0, len(game_state.move_log), 2):
-            move_str = f"{i//2 + 1}. {game_state.move_log[i]} "
-            if i+1 < len(game_state.move_log):
-                move_str += f"{game_state.move_log[i+1]}"
-            move_texts.append(move_str)
-        
-        # Zone de défilement pour l'historique des coups
-        scroll_area = p.Surface((self.move_log_panel_width, self.move_log_panel_height))
-        scroll_area.fill(p.Color('black'))
-        y = 5 - self.move_log_offset
-        for i, text in enumerate(move_texts):
-            color = p.Color('yellow') if i == len(move_texts)-1 else p.Color('white')
-            text_surf = font.render(text, True, color)
-            scroll_area.blit(text_surf, (5, y))
-            y += font.get_height() + 2
-        screen.blit(scroll_area, (self.board_width + LEFT_PANEL_WIDTH, 0))
+        self.move_log_view.sync(game_state.move_log, font)
+        self.move_log_view.draw(screen, move_log_rect, self.move_log_offset)
 
     def handle_scroll(self, event, mouse_pos):
-        move_log_rect = p.Rect(self.board_width + LEFT_PANEL_WIDTH, 0, self.move_log_panel_width, self.move_log_panel_height)
-        if move_log_rect.collidepoint(mouse_pos):
+        if self.move_log_rect().collidepoint(mouse_pos):
             self.move_log_offset = max(0, self.move_log_offset - event.y * self.SCROLL_SPEED)
 
     def draw_loading_indicator(self, screen):
-        font = p.font.SysFont("Arial", 24)
-        dots = "." * ((p.time.get_ticks() // 500) % 4)
+        font = get_font("Arial", 24)
+        dots = "." * ((p.time.get_ticks() // LOADING_BLINK_MS) % 4)
         text = font.render("IA réfléchit" + dots, True, p.Color('white'))
         screen.blit(text, (self.board_width + LEFT_PANEL_WIDTH + 10, self.board_height - 40))
 
@@ -166,7 +332,7 @@ class Button:
     def draw(self, screen):
         color = p.Color('dodgerblue2') if self.hovered else p.Color('lightgray')
         p.draw.rect(screen, color, self.rect)
-        font = p.font.SysFont("Arial", 24)
+        font = get_font("Arial", 24)
         text_surf = font.render(self.text, True, p.Color('black'))
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
@@ -201,77 +367,101 @@ class Animation:
         """Fonction easing pour une interpolation plus fluide (t entre 0 et 1)."""
         return 1 - pow(1 - t, 3)
 
-    @staticmethod
-    def animate_move(move: ChessEngine.Move, screen: p.Surface, board: list, sq_size: int, clock: p.time.Clock):
-        d_row = move.end_row - move.start_row
-        d_col = move.end_col - move.start_col
-        frames_per_square = 3  # augmente pour une animation plus longue
-        frame_count = int((abs(d_row) + abs(d_col)) * frames_per_square)
-        resource_manager = ResourceManager(sq_size)
-        for frame in range(frame_count + 1):
-            t = frame / frame_count  # t varie de 0 à 1
-            eased_t = Animation.easeOutCubic(t)
-            row = move.start_row + d_row * eased_t
-            col = move.start_col + d_col * eased_t
-            if flip_board:
-                disp_row = DIMENSION - 1 - row
-                disp_start_row = DIMENSION - 1 - move.start_row
-                disp_end_row = DIMENSION - 1 - move.end_row
+
+class MoveAnimation:
+    """
+    Animation d'un coup sous forme d'interpolation temporelle, avancée par la
+    boucle principale à chaque image (elle ne bloque plus les événements).
+    Le plateau est déjà dans son état final : pendant l'animation, la case
+    d'arrivée montre encore la pièce capturée et seule la pièce jouée est
+    dessinée par-dessus, à sa position courante.
+    """
+    SECONDS_PER_SQUARE = 3 / 60  # 3 images à 60 FPS par case, comme l'ancienne animation
+
+    def __init__(self, move: ChessEngine.Move, start_ticks=None):
+        self.move = move
+        self.d_row = move.end_row - move.start_row
+        self.d_col = move.end_col - move.start_col
+        self.duration = (abs(self.d_row) + abs(self.d_col)) * self.SECONDS_PER_SQUARE * 1000
+        self.start_ticks = p.time.get_ticks() if start_ticks is None else start_ticks
+
+    def progress(self, now=None):
+        now = p.time.get_ticks() if now is None else now
+        if self.duration <= 0:
+            return 1.0
+        return Animation.easeOutCubic(min(1.0, max(0.0, (now - self.start_ticks) / self.duration)))
+
+    def finished(self, now=None):
+        now = p.time.get_ticks() if now is None else now
+        return now - self.start_ticks >= self.duration
+
+    def position(self, now=None):
+        """Position (ligne, colonne) fractionnaire de la pièce en mouvement."""
+        t = self.progress(now)
+        return self.move.start_row + self.d_row * t, self.move.start_col + self.d_col * t
+
+    def square_overrides(self):
+        """Contenu affiché à la place du plateau final pendant l'animation."""
+        move = self.move
+        overrides = {(move.end_row, move.end_col): "--"}
+        if move.piece_captured != '--':
+            if move.is_enpassant_move:
+                enpassant_row = move.end_row + 1 if move.piece_captured[0] == 'b' else move.end_row - 1
+                overrides[(enpassant_row, move.end_col)] = move.piece_captured
             else:
-                disp_row = row
-                disp_start_row = move.start_row
-                disp_end_row = move.end_row
-            draw_board(screen, sq_size)
-            draw_pieces(screen, board, sq_size, resource_manager)
-            color = ui_manager.board_color1 if (disp_end_row + move.end_col) % 2 == 0 else ui_manager.board_color2
-            end_square = p.Rect(move.end_col * sq_size + LEFT_PANEL_WIDTH, disp_end_row * sq_size, sq_size, sq_size)
-            p.draw.rect(screen, color, end_square)
-            if move.piece_captured != '--':
-                if move.is_enpassant_move:
-                    enpassant_row = move.end_row + 1 if move.piece_captured[0] == 'b' else move.end_row - 1
-                    if flip_board:
-                        enpassant_row = DIMENSION - 1 - enpassant_row
-                    end_square = p.Rect(move.end_col * sq_size + LEFT_PANEL_WIDTH, enpassant_row * sq_size, sq_size, sq_size)
-                image = resource_manager.get_image(move.piece_captured)
-                screen.blit(image, end_square)
-            image = resource_manager.get_image(move.piece_moved)
-            screen.blit(image, p.Rect(col * sq_size + LEFT_PANEL_WIDTH, disp_row * sq_size, sq_size, sq_size))
-            p.display.flip()
-            clock.tick(60)
+                overrides[(move.end_row, move.end_col)] = move.piece_captured
+        return overrides
+
+    def sprite(self, sq_size, now=None):
+        """Retourne (pièce, rectangle écran) de la pièce en mouvement."""
+        row, col = self.position(now)
+        disp_row = row if not flip_board else DIMENSION - 1 - row
+        rect = p.Rect(round(col * sq_size) + LEFT_PANEL_WIDTH, round(disp_row * sq_size), sq_size, sq_size)
+        return self.move.piece_moved, rect
 
 
 # --------------------------------------------------
 # Fonctions de dessin
 # --------------------------------------------------
-def draw_board(screen, sq_size):
-    font = p.font.SysFont("Arial", 16, bold=True)
+def square_rect(row, col, sq_size):
+    """Rectangle écran de la case (row, col) du plateau, en tenant compte du flip."""
+    display_row = row if not flip_board else DIMENSION - 1 - row
+    return p.Rect(col * sq_size + LEFT_PANEL_WIDTH, display_row * sq_size, sq_size, sq_size)
+
+def render_square_background(surface, row, col, sq_size, font):
+    """Dessine le fond d'une case et ses coordonnées éventuelles sur la surface du plateau."""
     text_color = p.Color("black")
+    display_row = row if not flip_board else DIMENSION - 1 - row
+    rect = p.Rect(col * sq_size, display_row * sq_size, sq_size, sq_size)
+    color = ui_manager.board_color1 if (display_row + col) % 2 == 0 else ui_manager.board_color2
+    p.draw.rect(surface, color, rect)
 
-    for row in range(DIMENSION):
-        display_row = row if not flip_board else DIMENSION - 1 - row
-        for col in range(DIMENSION):
-            color = ui_manager.board_color1 if (display_row + col) % 2 == 0 else ui_manager.board_color2
-            p.draw.rect(screen, color, p.Rect(col * sq_size + LEFT_PANEL_WIDTH, display_row * sq_size, sq_size, sq_size))
+    if flip_board:
+        file_letter = chr(ord('h') - col)
+        rank_num = row + 1
+    else:
+        file_letter = chr(ord('a') + col)
+        rank_num = 8 - row
 
-            if flip_board:
-                file_letter = chr(ord('h') - col)
-                rank_num = row + 1
-            else:
-                file_letter = chr(ord('a') + col)
-                rank_num = 8 - row
+    # Affichage des numéros uniquement sur la colonne de gauche
+    if col == 0:
+        rank_text = font.render(str(rank_num), True, text_color)
+        surface.blit(rank_text, (rect.x + 2, rect.y + 2))
 
-            # Affichage des numéros uniquement sur la colonne de gauche
-            if col == 0:
-                rank_text = font.render(str(rank_num), True, text_color)
-                screen.blit(rank_text, (col * sq_size + LEFT_PANEL_WIDTH + 2, display_row * sq_size + 2))
+    # Affichage des lettres uniquement sur la ligne du bas
+    if row == DIMENSION - 1:
+        file_text = font.render(file_letter, True, text_color)
+        text_rect = file_text.get_rect(bottomright=(rect.right - 2, rect.bottom - 2))
+        surface.blit(file_text, text_rect)
 
-            # Affichage des lettres uniquement sur la ligne du bas
-            if row == DIMENSION - 1:
-                file_text = font.render(file_letter, True, text_color)
-                text_rect = file_text.get_rect(
-                    bottomright=(col * sq_size + LEFT_PANEL_WIDTH + sq_size - 2, display_row * sq_size + sq_size - 2))
-                screen.blit(file_text, text_rect)
+def draw_square(screen, row, col, sq_size):
+    """Recopie une case du fond pré-rendu et retourne son rectangle écran."""
+    rect = square_rect(row, col, sq_size)
+    screen.blit(get_board_background(sq_size), rect, rect.move(-LEFT_PANEL_WIDTH, 0))
+    return rect
 
+def draw_board(screen, sq_size):
+    screen.blit(get_board_background(sq_size), (LEFT_PANEL_WIDTH, 0))
 
 def draw_pieces(screen, board, sq_size, resource_manager):
     for row in range(DIMENSION):
@@ -282,65 +472,236 @@ def draw_pieces(screen, board, sq_size, resource_manager):
             if piece != "--":
                 screen.blit(resource_manager.get_image(piece), p.Rect(col * sq_size + LEFT_PANEL_WIDTH, display_row * sq_size, sq_size, sq_size))
 
-def highlightSquares(screen, game_state, valid_moves, square_selected, sq_size):
+def square_overlays(game_state, valid_moves, square_selected):
+    """
+    Calques de surbrillance par case (coordonnées du plateau) : liste de
+    (couleur, alpha) dans l'ordre d'application (échec, dernier coup,
+    sélection, cibles de la pièce sélectionnée).
+    """
+    overlays = {}
     if game_state.in_check:
-        king_row, king_col = game_state.white_king_location if game_state.white_to_move else game_state.black_king_location
-        if flip_board:
-            king_row = DIMENSION - 1 - king_row
-        s = p.Surface((sq_size, sq_size))
-        s.set_alpha(150)
-        s.fill(p.Color('red'))
-        screen.blit(s, (king_col * sq_size + LEFT_PANEL_WIDTH, king_row * sq_size))
+        king = game_state.white_king_location if game_state.white_to_move else game_state.black_king_location
+        overlays.setdefault(king, []).append(('red', 150))
     if game_state.move_log:
         last_move = game_state.move_log[-1]
-        if flip_board:
-            disp_end_row = DIMENSION - 1 - last_move.end_row
-        else:
-            disp_end_row = last_move.end_row
-        s = p.Surface((sq_size, sq_size))
-        s.set_alpha(100)
-        s.fill(p.Color('green'))
-        screen.blit(s, (last_move.end_col * sq_size + LEFT_PANEL_WIDTH, disp_end_row * sq_size))
+        overlays.setdefault((last_move.end_row, last_move.end_col), []).append(('green', 100))
     if square_selected:
         row, col = square_selected
-        # Pour la sélection, on ne transforme pas car la conversion s'effectue lors de l'interprétation des clics
-        s = p.Surface((sq_size, sq_size))
-        s.set_alpha(100)
-        s.fill(p.Color('blue'))
-        # Convertir la ligne de sélection
-        disp_row = row if not flip_board else DIMENSION - 1 - row
-        screen.blit(s, (col * sq_size + LEFT_PANEL_WIDTH, disp_row * sq_size))
-        s.fill(p.Color('yellow'))
-        for move in valid_moves:
-            if move.start_row == row and move.start_col == col:
-                target_row = move.end_row if not flip_board else DIMENSION - 1 - move.end_row
-                screen.blit(s, (move.end_col * sq_size + LEFT_PANEL_WIDTH, target_row * sq_size))
+        overlays.setdefault((row, col), []).append(('blue', 100))
+        for move in game_state.get_moves_from((row, col)) if valid_moves else []:
+            overlays.setdefault((move.end_row, move.end_col), []).append(('yellow', 100))
+    return overlays
+
+def draw_overlays(screen, rect, layers):
+    for color, alpha in layers:
+        s = p.Surface((rect.width, rect.height))
+        s.set_alpha(alpha)
+        s.fill(p.Color(color))
+        screen.blit(s, rect)
+
+def highlightSquares(screen, game_state, valid_moves, square_selected, sq_size):
+    for (row, col), layers in square_overlays(game_state, valid_moves, square_selected).items():
+        draw_overlays(screen, square_rect(row, col, sq_size), layers)
 
 def drawEndGameText(screen, text, board_width, board_height):
-    font = p.font.SysFont("Helvitica", 32, True, False)
+    font = get_font("Helvitica", 32, True, False)
     text_object = font.render(text, True, p.Color("gray"))
     text_location = p.Rect(0, 0, board_width, board_height).move(board_width/2 - text_object.get_width()/2,
                                                                  board_height/2 - text_object.get_height()/2)
     screen.blit(text_object, text_location)
     text_object = font.render(text, True, p.Color('black'))
     screen.blit(text_object, text_location.move(2, 2))
+    return p.Rect(text_location.topleft, text_object.get_size()).inflate(4, 4).move(1, 1)
+
+# --------------------------------------------------
+# Boucle événementielle
+# --------------------------------------------------
+def wait_for_ai_result(process, result_reader):
+    """
+    Attend le coup de l'IA dans un thread et le signale à la boucle principale
+    par un événement AI_MOVE_EVENT. Le processus accompagne l'événement pour
+    que les résultats d'une recherche abandonnée (annulation, nouvelle partie)
+    soient ignorés. Si le processus meurt sans résultat, move vaut None.
+    Le thread dort jusqu'à ce que le tube soit lisible ou que le processus se
+    termine (sentinel) : aucun sondage périodique. Le coup envoyé reste dans le
+    tube après la fin du processus : il est lu même si la fin est vue en
+    premier ; un tube vide et fermé (EOFError) signifie qu'il n'y a pas de coup.
+    """
+    wait([result_reader, process.sentinel])
+    try:
+        ai_move = result_reader.recv() if result_reader.poll() else None
+    except EOFError:
+        ai_move = None
+    finally:
+        result_reader.close()
+    if p.display.get_init():
+        p.event.post(p.event.Event(AI_MOVE_EVENT, move=ai_move, process=process))
+
+def next_wakeup(animation, ai_thinking, game_over, white_to_move):
+    """
+    Délai maximal (ms) avant de redessiner si aucun événement n'arrive : prochaine
+    image de l'animation, prochaine étape de l'indicateur de l'IA ou prochain
+    changement de la seconde affichée. None : attendre le prochain événement.
+    """
+    if animation is not None:
+        return 0
+    delays = []
+    if ai_thinking:
+        delays.append(LOADING_BLINK_MS - p.time.get_ticks() % LOADING_BLINK_MS)
+    if not game_over:
+        timer_delay = ui_manager.ms_until_timer_change(white_to_move)
+        if timer_delay is not None:
+            delays.append(timer_delay)
+    return min(delays) if delays else None
+
+def wait_events(timeout):
+    """Bloque jusqu'au prochain événement (ou jusqu'au délai) puis vide la file."""
+    if timeout == 0:
+        return p.event.get()
+    first = p.event.wait(timeout) if timeout is not None else p.event.wait()
+    events = [first] if first.type != p.NOEVENT else []
+    return events + p.event.get()
+
+# --------------------------------------------------
+# Rendu par zones modifiées
+# --------------------------------------------------
+class DirtyRenderer:
+    """
+    Ne redessine que les zones qui ont changé depuis l'image précédente :
+    cases dont la pièce ou la surbrillance a changé, chronomètre (une fois
+    par seconde), historique des coups, popup de promotion. Les zones
+    redessinées sont envoyées à l'écran avec p.display.update(rects).
+    Pendant une animation, seules les cases sous la pièce en mouvement (à
+    l'image précédente et à l'image courante) sont recomposées.
+    invalidate() force un rendu complet (menus, redimensionnement).
+    """
+
+    def __init__(self, screen, resource_manager, sq_size):
+        self.screen = screen
+        self.resource_manager = resource_manager
+        self.sq_size = sq_size
+        self.full_redraw = True
+        self._pieces = None
+        self._overlays = {}
+        self._board_style = None
+        self._timer_state = None
+        self._move_log_state = None
+        self._popup_shown = False
+        self._end_text = None
+        self._sprite_rect = None
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def squares_under(self, rect):
+        """Cases du plateau (coordonnées du plateau) recouvertes par un rectangle écran."""
+        squares = []
+        first_col = max(0, (rect.left - LEFT_PANEL_WIDTH) // self.sq_size)
+        last_col = min(DIMENSION - 1, (rect.right - 1 - LEFT_PANEL_WIDTH) // self.sq_size)
+        first_row = max(0, rect.top // self.sq_size)
+        last_row = min(DIMENSION - 1, (rect.bottom - 1) // self.sq_size)
+        for display_row in range(first_row, last_row + 1):
+            row = display_row if not flip_board else DIMENSION - 1 - display_row
+            squares.extend((row, col) for col in range(first_col, last_col + 1))
+        return squares
+
+    def render(self, game_state, valid_moves, square_selected, move_log_font, ai_thinking=False,
+               promotion_popup=None, end_text=None, animation=None):
+        full = self.full_redraw
+        rects = []
+        board_style = (flip_board, tuple(ui_manager.board_color1), tuple(ui_manager.board_color2))
+        # Un changement de style ou la disparition de la popup ou du texte de fin
+        # (qui recouvrent le plateau) impose de tout redessiner
+        if board_style != self._board_style or (self._popup_shown and not promotion_popup) \
+                or (self._end_text and end_text != self._end_text):
+            full = True
+
+        # Plateau : cases dont la pièce ou les calques ont changé
+        overlays = square_overlays(game_state, valid_moves, square_selected)
+        board = game_state.board
+        sprite = None
+        if animation is not None:
+            board = [row[:] for row in board]
+            for (row, col), piece in animation.square_overrides().items():
+                board[row][col] = piece
+            sprite = animation.sprite(self.sq_size)
+        if full or self._pieces is None:
+            dirty = [(r, c) for r in range(DIMENSION) for c in range(DIMENSION)]
+        else:
+            dirty = [(r, c) for r in range(DIMENSION) for c in range(DIMENSION) if board[r][c] != self._pieces[r][c]]
+            dirty.extend(square for square in set(overlays) | set(self._overlays)
+                         if overlays.get(square) != self._overlays.get(square) and square not in dirty)
+            # Cases sous la pièce en mouvement, à l'image précédente et à l'image courante
+            for rect in (self._sprite_rect, sprite[1] if sprite else None):
+                if rect is not None:
+                    dirty.extend(square for square in self.squares_under(rect) if square not in dirty)
+            if dirty and end_text:
+                # Le texte de fin est redessiné en entier : les cases qu'il recouvre aussi
+                dirty = [(r, c) for r in range(DIMENSION) for c in range(DIMENSION)]
+        if dirty:
+            for row, col in dirty:
+                rect = draw_square(self.screen, row, col, self.sq_size)
+                if board[row][col] != "--":
+                    self.screen.blit(self.resource_manager.get_image(board[row][col]), rect)
+                draw_overlays(self.screen, rect, overlays.get((row, col), []))
+                rects.append(rect)
+        if sprite is not None:
+            self.screen.blit(self.resource_manager.get_image(sprite[0]), sprite[1])
+        self._sprite_rect = sprite[1] if sprite else None
+        self._pieces = [row[:] for row in board]
+        self._overlays = overlays
+        self._board_style = board_style
+
+        # Panneau gauche : chronomètre
+        timer_state = ui_manager.timer_state(game_state.white_to_move)
+        if full:
+            ui_manager.draw_left_panel(self.screen, game_state.white_to_move)
+            rects.append(ui_manager.left_panel_rect())
+        elif timer_state != self._timer_state:
+            rects.append(ui_manager.draw_timer(self.screen, game_state.white_to_move))
+        self._timer_state = timer_state
+
+        # Panneau droit : historique des coups et indicateur de réflexion de l'IA
+        dots = (p.time.get_ticks() // LOADING_BLINK_MS) % 4 if ai_thinking else None
+        last_move = game_state.move_log[-1] if game_state.move_log else None
+        move_log_state = (len(game_state.move_log), id(last_move), ui_manager.move_log_offset, dots)
+        if full or move_log_state != self._move_log_state:
+            ui_manager.draw_move_log_panel(self.screen, game_state, move_log_font)
+            if ai_thinking:
+                ui_manager.draw_loading_indicator(self.screen)
+            rects.append(ui_manager.move_log_rect())
+        self._move_log_state = move_log_state
+
+        if promotion_popup:
+            promotion_popup.draw(self.screen)
+            rects.append(promotion_popup.rect)
+        self._popup_shown = bool(promotion_popup)
+
+        if end_text and (dirty or end_text != self._end_text):
+            rects.append(drawEndGameText(self.screen, end_text, ui_manager.board_width, ui_manager.board_height))
+        self._end_text = end_text
+
+        if full:
+            p.display.flip()
+        elif rects:
+            p.display.update(rects)
+        self.full_redraw = False
 
 # --------------------------------------------------
 # Sauvegarde / Chargement
 # --------------------------------------------------
-def save_game(game_state, filename="saved_game.pkl"):
+def save_game(game_state, filename=SAVE_FILE):
     try:
-        with open(filename, "wb") as f:
-            pickle.dump(game_state, f)
+        ChessSave.save_game(game_state, filename)
         logging.info("Partie sauvegardée avec succès.")
     except Exception as e:
         logging.error(f"Erreur lors de la sauvegarde : {e}")
 
-def load_game(filename="saved_game.pkl"):
+def load_game(filename=SAVE_FILE):
     try:
-        with open(filename, "rb") as f:
-            logging.info("Partie chargée avec succès.")
-            return pickle.load(f)
+        game_state = ChessSave.load_game(filename)
+        logging.info("Partie chargée avec succès.")
+        return game_state
     except Exception as e:
         logging.error(f"Erreur lors du chargement : {e}")
         raise
@@ -434,6 +795,7 @@ def customization_menu(screen, ui_manager):
         def callback(c1=col1, c2=col2):
             ui_manager.board_color1 = c1
             ui_manager.board_color2 = c2
+            invalidate_board_background()
         buttons.append(Button(f"Couleurs {i+1}", pos, (button_width, button_height), callback))
     while True:
         menu_surface.fill(p.Color("white"))
@@ -465,13 +827,14 @@ def show_shortcuts_menu(screen):
         ("R", "Réinitialiser la partie"),
         ("S", "Sauvegarder la partie"),
         ("L", "Charger la partie"),
+        ("J", "Reprendre la partie interrompue"),
         ("C", "Personnaliser les couleurs"),
         ("H", "Afficher/masquer les raccourcis")
     ]
     
     # Affichage des raccourcis
-    font = p.font.SysFont("Arial", 24)
-    title_font = p.font.SysFont("Arial", 32, bold=True)
+    font = get_font("Arial", 24)
+    title_font = get_font("Arial", 32, bold=True)
     
     # Titre
     title = title_font.render("Raccourcis Clavier", True, p.Color("black"))
@@ -538,6 +901,7 @@ def main():
 
     move_made = False
     animate = False
+    animation = None
     square_selected = ()
     player_clicks = []
     game_over = False
@@ -546,8 +910,7 @@ def main():
     promotion_popup = None
     promotion_pending_move = None
     move_finder_process = None
-    return_queue = None
-    move_log_font = p.font.SysFont("Arial", 14)
+    move_log_font = get_font("Arial", 14)
 
     # Choix du mode de jeu
     mode, player_one, player_two = gameModeMenu(screen)
@@ -559,9 +922,18 @@ def main():
 
     game_state = ChessEngine.GameState(flip_board=flip_board)
     valid_moves = game_state.getValidMoves()
+    # Un journal restant vient d'une session interrompue : il est mis de côté pour la touche J
+    if os.path.exists(JOURNAL_FILE):
+        os.replace(JOURNAL_FILE, RECOVERY_FILE)
+        logging.info("Journal d'une partie interrompue disponible (touche J)")
+    journal = ChessSave.GameJournal(JOURNAL_FILE)
+    journal.start(game_state)
+    sq_size = SQ_SIZE
+    renderer = DirtyRenderer(screen, resource_manager, sq_size)
 
-    # Boucle principale
+    # Boucle principale : bloque sur les événements au lieu de tourner à MAX_FPS
     while True:
+        events = wait_events(next_wakeup(animation, ai_thinking, game_over, game_state.white_to_move))
         # Mise à jour du chronomètre uniquement si la partie n'est pas terminée
         if not game_over:
             ui_manager.update_timer(game_state.white_to_move)
@@ -570,12 +942,48 @@ def main():
         
         # Conversion des clics : si flip_board, convertir la ligne (pour la saisie)
         human_turn = (game_state.white_to_move and player_one) or (not game_state.white_to_move and player_two)
-        for e in p.event.get():
+        for e in events:
             if e.type == p.QUIT:
+                journal.close(remove=True)
                 p.quit()
                 sys.exit()
+            if e.type == AI_MOVE_EVENT:
+                # Résultat d'une recherche abandonnée : ignoré
+                if not ai_thinking or e.process is not move_finder_process:
+                    continue
+                ai_move = e.move
+                if ai_move is None:
+                    logging.warning("L'IA s'est terminée sans coup (code %s) : coup aléatoire joué",
+                                    move_finder_process.exitcode)
+                    ai_move = ChessAI.findRandomMove(valid_moves)
+                game_state.makeMove(ai_move)
+                journal.record_move(ai_move)
+                if ai_move.is_capture:
+                    if capture_sound:
+                        capture_sound.play()
+                else:
+                    if move_sound:
+                        move_sound.play()
+                move_made = True
+                animate = True
+                ai_thinking = False
+                logging.info(f"Coup joué par l'IA : {ai_move}")
+                continue
             if e.type == p.MOUSEWHEEL:
                 ui_manager.handle_scroll(e, p.mouse.get_pos())
+            if e.type == p.VIDEORESIZE:
+                # Nouvelle taille de case : les pièces sont remises à l'échelle une fois puis mises en cache
+                sq_size = max(MIN_SQ_SIZE, min((e.w - LEFT_PANEL_WIDTH - MOVE_LOG_PANEL_WIDTH) // DIMENSION,
+                                               e.h // DIMENSION))
+                ui_manager.resize(sq_size * DIMENSION)
+                renderer.screen = screen = p.display.get_surface()
+                renderer.sq_size = resource_manager.sq_size = sq_size
+                screen.fill(p.Color('black'))
+            if e.type in (p.VIDEORESIZE, p.VIDEOEXPOSE, p.WINDOWEXPOSED, p.WINDOWRESTORED):
+                renderer.invalidate()
+            # Une nouvelle saisie termine immédiatement l'animation en cours
+            if e.type in (p.MOUSEBUTTONDOWN, p.KEYDOWN):
+                animation = None
             # Si une popup de promotion est active, traiter ses clics en priorité
             if promotion_popup:
                 if e.type == p.MOUSEBUTTONDOWN:
@@ -583,6 +991,7 @@ def main():
                         if btn.rect.collidepoint(e.pos):
                             promotion_callback = lambda: btn.text
                             game_state.makeMove(promotion_pending_move, promotion_callback=promotion_callback)
+                            journal.record_move(promotion_pending_move)
                             move_made = True
                             animate = True
                             promotion_popup = None
@@ -592,13 +1001,13 @@ def main():
                 if not game_over and human_turn:
                     location = p.mouse.get_pos()
                     # Ajuster la position de la souris en tenant compte du panneau gauche
-                    col = (location[0] - LEFT_PANEL_WIDTH) // SQ_SIZE
+                    col = (location[0] - LEFT_PANEL_WIDTH) // sq_size
                     # Conversion de la coordonnée verticale selon flip_board
                     if flip_board:
-                        row = DIMENSION - 1 - (location[1] // SQ_SIZE)
+                        row = DIMENSION - 1 - (location[1] // sq_size)
                     else:
-                        row = location[1] // SQ_SIZE
-                    if col >= DIMENSION or row >= DIMENSION or col < 0:
+                        row = location[1] // sq_size
+                    if col >= DIMENSION or row >= DIMENSION or col < 0 or row < 0:
                         continue
                     # Premier clic ou modification de sélection
                     if not player_clicks:
@@ -621,33 +1030,35 @@ def main():
                             square_selected = (row, col)
                             player_clicks.append(square_selected)
                     if len(player_clicks) == 2:
-                        move = ChessEngine.Move(player_clicks[0], player_clicks[1], game_state.board)
-                        for valid_move in valid_moves:
-                            if move == valid_move:
-                                if valid_move.is_pawn_promotion:
-                                    promotion_pending_move = valid_move
-                                    promotion_popup = PromotionPopup((BOARD_WIDTH // 2 - 150 + LEFT_PANEL_WIDTH, BOARD_HEIGHT // 2 - 50),
-                                                                     (300, 100), lambda piece: piece)
+                        valid_move = game_state.get_move(player_clicks[0], player_clicks[1])
+                        if valid_move is not None:
+                            if valid_move.is_pawn_promotion:
+                                promotion_pending_move = valid_move
+                                promotion_popup = PromotionPopup((ui_manager.board_width // 2 - 150 + LEFT_PANEL_WIDTH,
+                                                                  ui_manager.board_height // 2 - 50),
+                                                                 (300, 100), lambda piece: piece)
+                            else:
+                                game_state.makeMove(valid_move)
+                                journal.record_move(valid_move)
+                                move_made = True
+                                if valid_move.is_capture:
+                                    if capture_sound:
+                                        capture_sound.play()
                                 else:
-                                    game_state.makeMove(valid_move)
-                                    move_made = True
-                                    if valid_move.is_capture:
-                                        if capture_sound:
-                                            capture_sound.play()
-                                    else:
-                                        if move_sound:
-                                            move_sound.play()
-                                    logging.info(f"Coup joué : {valid_move}")
-                                square_selected = ()
-                                player_clicks = []
-                                break
+                                    if move_sound:
+                                        move_sound.play()
+                                logging.info(f"Coup joué : {valid_move}")
+                            square_selected = ()
+                            player_clicks = []
             if e.type == p.KEYDOWN:
                 if e.key == p.K_z: # Retour en arrière
                     if game_state.move_log:
                         game_state.undoMove()
+                        journal.record_undo()
                         logging.info("Undo effectué")
                     if game_state.move_log:
                         game_state.undoMove()
+                        journal.record_undo()
                     move_made = True
                     animate = False
                     game_over = False
@@ -658,6 +1069,7 @@ def main():
                 if e.key == p.K_r: # Réinitialiser la partie
                     game_state = ChessEngine.GameState()
                     valid_moves = game_state.getValidMoves()
+                    journal.start(game_state)
                     square_selected = ()
                     player_clicks = []
                     move_made = False
@@ -670,64 +1082,54 @@ def main():
                     move_undone = True
                 if e.key == p.K_s: # Sauvegarder la partie
                     save_game(game_state)
-                if e.key == p.K_l: # Charger la partie
+                if e.key in (p.K_l, p.K_j): # Charger la partie sauvegardée ou la partie interrompue
                     try:
-                        game_state = load_game()
+                        game_state = load_game(SAVE_FILE if e.key == p.K_l else RECOVERY_FILE)
                         valid_moves = game_state.getValidMoves()
+                        journal.start(game_state)
                     except Exception as ex:
                         logging.error(f"Erreur lors du chargement : {ex}")
                 if e.key == p.K_c: # Personnaliser les couleurs
                     customization_menu(screen, ui_manager)
+                    renderer.invalidate()
                 if e.key == p.K_h: # Afficher les raccourcis
                     show_shortcuts_menu(screen)
+                    renderer.invalidate()
 
-        if not game_over and not human_turn and not move_undone and not promotion_popup:
+        if not game_over and not human_turn and not move_undone and not promotion_popup and not move_made:
             if not ai_thinking:
                 ai_thinking = True
-                return_queue = Queue()
-                move_finder_process = Process(target=ChessAI.findBestMove, args=(game_state, valid_moves, return_queue))
+                result_reader, result_writer = Pipe(duplex=False)
+                move_finder_process = Process(target=ChessAI.findBestMove,
+                                              args=(game_state, valid_moves, ChessAI.ResultSender(result_writer),
+                                                    ANALYSIS_CACHE_FILE))
                 move_finder_process.start()
-            if move_finder_process and not move_finder_process.is_alive():
-                ai_move = return_queue.get()
-                if ai_move is None:
-                    ai_move = ChessAI.findRandomMove(valid_moves)
-                game_state.makeMove(ai_move)
-                if ai_move.is_capture:
-                    if capture_sound:
-                        capture_sound.play()
-                else:
-                    if move_sound:
-                        move_sound.play()
-                move_made = True
-                animate = True
-                ai_thinking = False
-                logging.info(f"Coup joué par l'IA : {ai_move}")
+                result_writer.close()  # Seul le processus de l'IA écrit : sa fin ferme le tube
+                # Le résultat arrive sous forme d'événement AI_MOVE_EVENT, sans sonder le processus
+                threading.Thread(target=wait_for_ai_result, args=(move_finder_process, result_reader),
+                                 daemon=True).start()
 
         if move_made:
-            if animate:
-                Animation.animate_move(game_state.move_log[-1], screen, game_state.board, SQ_SIZE, clock)
+            # L'animation est avancée par la boucle principale ; un nouveau coup remplace la précédente
+            animation = MoveAnimation(game_state.move_log[-1]) if animate and game_state.move_log else None
             valid_moves = game_state.getValidMoves()
             move_made = False
             animate = False
             move_undone = False
 
-        draw_board(screen, SQ_SIZE)
-        draw_pieces(screen, game_state.board, SQ_SIZE, resource_manager)
-        highlightSquares(screen, game_state, valid_moves, square_selected, SQ_SIZE)
-        ui_manager.draw_move_log(screen, game_state, move_log_font)
-        if ai_thinking:
-            ui_manager.draw_loading_indicator(screen)
-        if promotion_popup:
-            promotion_popup.draw(screen)
+        end_text = None
         if game_state.checkmate:
             game_over = True
             end_text = "Noir gagne par échec et mat" if game_state.white_to_move else "Blanc gagne par échec et mat"
-            drawEndGameText(screen, end_text, BOARD_WIDTH, BOARD_HEIGHT)
         elif game_state.stalemate:
             game_over = True
-            drawEndGameText(screen, "Impasse", BOARD_WIDTH, BOARD_HEIGHT)
-        clock.tick(MAX_FPS)
-        p.display.flip()
+            end_text = "Impasse"
+        if animation is not None and animation.finished():
+            animation = None
+        # Seules les zones modifiées sont redessinées et envoyées à l'écran
+        renderer.render(game_state, valid_moves, square_selected, move_log_font, ai_thinking,
+                        promotion_popup, end_text, animation)
+        clock.tick(ANIMATION_FPS if animation is not None else MAX_FPS)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
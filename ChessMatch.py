@@ -0,0 +1,228 @@
+"""
+Module ChessMatch
+------------------
+Match sans affichage entre deux configurations de ChessAI (profondeur, temps
+par coup, poids d'évaluation). Les parties sont réparties sur un pool de
+processus (un par coeur par défaut), chaque ouverture de la suite est jouée
+deux fois en inversant les couleurs, et les nulles sont arbitrées par les
+règles existantes (50 coups, répétition, matériel insuffisant).
+
+Les parties sont écrites en PGN au fur et à mesure, suivies d'un résumé :
+score, écart Elo avec intervalle de confiance à 95 %, noeuds par seconde
+et temps moyen par coup.
+
+Usage : python ChessMatch.py --games 20 --depth-a 3 --depth-b 2 --pgn match.pgn
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from datetime import date
+from multiprocessing import Pool
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import ChessEngine
+import ChessAI
+import ChessPGN
+
+MAX_PLIES: int = 400  # Au-delà, la partie est arbitrée nulle
+
+# Suite d'ouvertures (coups en notation UCI depuis la position initiale)
+OPENINGS: List[List[str]] = [
+    ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"],
+    ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4"],
+    ["e2e4", "c7c5", "g1f3", "d7d6"],
+    ["e2e4", "e7e6", "d2d4", "d7d5"],
+    ["e2e4", "c7c6", "d2d4", "d7d5"],
+    ["d2d4", "d7d5", "c2c4", "e7e6"],
+    ["d2d4", "d7d5", "c2c4", "c7c6"],
+    ["d2d4", "g8f6", "c2c4", "g7g6"],
+    ["d2d4", "g8f6", "c2c4", "e7e6", "g1f3"],
+    ["c2c4", "e7e5", "b1c3"],
+    ["g1f3", "d7d5", "g2g3"],
+    ["e2e4", "d7d5", "e4d5", "d8d5", "b1c3"],
+]
+
+
+class EngineConfig:
+    """Configuration d'un moteur : profondeur, temps par coup et poids d'évaluation."""
+
+    def __init__(self, name: str, depth: int = ChessAI.DEPTH, movetime: Optional[float] = None,
+                 eval_params: Optional[Dict[str, float]] = None) -> None:
+        self.name = name
+        self.depth = depth
+        self.movetime = movetime  # En secondes ; None = profondeur fixe uniquement
+        self.eval_params = eval_params or {}
+
+    def search(self, game_state: ChessEngine.GameState,
+               valid_moves: List[ChessEngine.Move]) -> Tuple[Optional[ChessEngine.Move], ChessAI.SearchInfo]:
+        """Lance ChessAI avec cette configuration."""
+        saved_params = dict(ChessAI.EVAL_PARAMS)
+        ChessAI.EVAL_PARAMS.update(self.eval_params)
+        try:
+            deadline = time.perf_counter() + self.movetime if self.movetime else None
+            depth = ChessAI.MAX_DEPTH if self.movetime else self.depth
+            return ChessAI.searchBestMove(game_state, valid_moves, depth, ChessAI.SearchInfo(deadline=deadline))
+        finally:
+            ChessAI.EVAL_PARAMS.clear()
+            ChessAI.EVAL_PARAMS.update(saved_params)
+
+
+def adjudicate(game_state: ChessEngine.GameState) -> Optional[Tuple[str, str]]:
+    """
+    Retourne (résultat, motif) si la partie est terminée, None sinon.
+    Doit être appelée après getValidMoves().
+    """
+    if game_state.checkmate and not game_state.stalemate:
+        return ("0-1" if game_state.white_to_move else "1-0"), "checkmate"
+    if game_state.fifty_move_counter >= 100:
+        return "1/2-1/2", "fifty-move rule"
+    if game_state.insufficient_material():
+        return "1/2-1/2", "insufficient material"
+    if game_state.position_history.get(game_state.get_position_key(), 0) >= 3:
+        return "1/2-1/2", "threefold repetition"
+    if game_state.stalemate:
+        return "1/2-1/2", "stalemate"
+    if len(game_state.move_log) >= MAX_PLIES:
+        return "1/2-1/2", "max plies"
+    return None
+
+
+def play_game(task: Tuple[int, List[str], EngineConfig, EngineConfig]) -> Dict[str, Any]:
+    """Joue une partie complète entre deux configurations (exécutée dans un processus du pool)."""
+    index, opening, white, black = task
+    game_state = ChessEngine.GameState()
+    san_moves: List[str] = []
+    stats = {white.name: [0, 0.0, 0], black.name: [0, 0.0, 0]}  # noeuds, temps, coups
+    for text in opening:
+        move = game_state.parse_uci_move(text)
+        san_moves.append(game_state.get_san(move))
+        game_state.makeMove(move, validate=False)
+
+    while True:
+        valid_moves = game_state.getValidMoves()
+        outcome = adjudicate(game_state)
+        if outcome is not None:
+            break
+        engine = white if game_state.white_to_move else black
+        start = time.perf_counter()
+        move, info = engine.search(game_state, list(valid_moves))
+        elapsed = time.perf_counter() - start
+        if move is None:
+            move = valid_moves[0]
+        stats[engine.name][0] += info.nodes
+        stats[engine.name][1] += elapsed
+        stats[engine.name][2] += 1
+        san_moves.append(game_state.get_san(move))
+        game_state.makeMove(move, validate=False)
+
+    result, termination = outcome
+    headers = {
+        "Event": "ChessMatch", "Site": "?", "Date": date.today().strftime("%Y.%m.%d"),
+        "Round": str(index + 1), "White": white.name, "Black": black.name,
+        "Result": result, "Termination": termination,
+    }
+    return {"index": index, "white": white.name, "black": black.name, "result": result,
+            "termination": termination, "stats": stats, "pgn": ChessPGN.format_pgn(headers, san_moves, result)}
+
+
+def build_tasks(games: int, engine_a: EngineConfig, engine_b: EngineConfig,
+                openings: List[List[str]]) -> Iterator[Tuple[int, List[str], EngineConfig, EngineConfig]]:
+    """Chaque ouverture est jouée deux fois, couleurs inversées."""
+    for index in range(games):
+        opening = openings[(index // 2) % len(openings)]
+        if index % 2 == 0:
+            yield index, opening, engine_a, engine_b
+        else:
+            yield index, opening, engine_b, engine_a
+
+
+def elo_difference(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """Écart Elo et demi-largeur de l'intervalle de confiance à 95 %."""
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / games
+
+    def to_elo(s: float) -> float:
+        s = min(max(s, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / s - 1)
+
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+    return to_elo(score), (to_elo(score + margin) - to_elo(score - margin)) / 2
+
+
+def run_match(games: int, engine_a: EngineConfig, engine_b: EngineConfig, pgn_output: Optional[TextIO] = None,
+              workers: Optional[int] = None, openings: Optional[List[List[str]]] = None,
+              output: Any = print) -> Dict[str, Any]:
+    """
+    Joue le match sur un pool de processus et écrit chaque partie en PGN dès
+    qu'elle se termine. Retourne le résumé (du point de vue de engine_a).
+    """
+    wins = draws = losses = 0
+    totals = {engine_a.name: [0, 0.0, 0], engine_b.name: [0, 0.0, 0]}
+    tasks = build_tasks(games, engine_a, engine_b, openings or OPENINGS)
+    with Pool(processes=workers or os.cpu_count()) as pool:
+        for game in pool.imap_unordered(play_game, tasks):
+            if pgn_output is not None:
+                pgn_output.write(game["pgn"])
+                pgn_output.flush()
+            if game["result"] == "1/2-1/2":
+                draws += 1
+            elif (game["result"] == "1-0") == (game["white"] == engine_a.name):
+                wins += 1
+            else:
+                losses += 1
+            for name, (nodes, elapsed, moves) in game["stats"].items():
+                totals[name][0] += nodes
+                totals[name][1] += elapsed
+                totals[name][2] += moves
+            output(f"Partie {game['index'] + 1} : {game['white']} - {game['black']} {game['result']} "
+                   f"({game['termination']})  [+{wins} ={draws} -{losses}]")
+
+    elo, margin = elo_difference(wins, draws, losses)
+    played = wins + draws + losses
+    summary = {"wins": wins, "draws": draws, "losses": losses,
+               "score": (wins + draws / 2) / played if played else 0.0, "elo": elo, "elo_margin": margin}
+    output("=" * 40)
+    output(f"{engine_a.name} vs {engine_b.name} : +{wins} ={draws} -{losses}  "
+           f"score {summary['score'] * 100:.1f} %  Elo {elo:+.1f} ± {margin:.1f}")
+    for name, (nodes, elapsed, moves) in totals.items():
+        nps = int(nodes / elapsed) if elapsed > 0 else 0
+        per_move = elapsed / moves * 1000 if moves else 0.0
+        summary[name] = {"nps": nps, "ms_per_move": per_move}
+        output(f"  {name} : {nps} noeuds/s, {per_move:.0f} ms/coup")
+    return summary
+
+
+def parse_eval_params(items: List[str]) -> Dict[str, float]:
+    params = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        if key not in ChessAI.EVAL_PARAMS:
+            raise argparse.ArgumentTypeError(f"paramètre d'évaluation inconnu : {key}")
+        params[key] = float(value)
+    return params
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match entre deux configurations de ChessAI")
+    parser.add_argument("--games", type=int, default=len(OPENINGS) * 2)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pgn", default=None, help="Fichier PGN de sortie (stdout si absent)")
+    for engine in ("a", "b"):
+        parser.add_argument(f"--depth-{engine}", type=int, default=ChessAI.DEPTH)
+        parser.add_argument(f"--movetime-{engine}", type=float, default=None, help="Secondes par coup")
+        parser.add_argument(f"--eval-{engine}", nargs="*", default=[], metavar="NOM=VALEUR")
+    args = parser.parse_args()
+    engine_a = EngineConfig("A", args.depth_a, args.movetime_a, parse_eval_params(args.eval_a))
+    engine_b = EngineConfig("B", args.depth_b, args.movetime_b, parse_eval_params(args.eval_b))
+    if args.pgn:
+        with open(args.pgn, "w") as pgn_file:
+            run_match(args.games, engine_a, engine_b, pgn_file, args.workers)
+    else:
+        run_match(args.games, engine_a, engine_b, sys.stdout, args.workers,
+                  output=lambda line: print(line, file=sys.stderr))
@@ -0,0 +1,191 @@
+"""
+Module ChessMate
+-----------------
+Recherche de mat forcé en N coups par preuve en profondeur (df-pn).
+
+Le camp au trait (l'attaquant) ne joue que des coups qui donnent échec ; le
+défenseur joue tous ses coups légaux, c'est-à-dire ses parades. Chaque noeud
+porte un nombre de preuve (coups restant à prouver pour forcer le mat) et un
+nombre de réfutation ; la recherche développe toujours le noeud le plus
+prometteur, sous des seuils qui évitent de remonter à la racine à chaque
+itération. Les nombres sont conservés dans une table indexée par (clé de
+position, demi-coups restants), partagée entre les profondeurs : chercher un
+mat en 1, puis en 2, ... jusqu'à N donne le mat le plus court au prix d'une
+seule recherche ou presque.
+
+Les coups sont ceux de getLegalMoves (règles de déplacement seules) : les
+nulles arbitrées par getValidMoves (matériel insuffisant, 50 coups,
+répétition) ne doivent pas masquer un mat, ni en cacher l'issue.
+
+Exemple :
+    line, info = solve_mate(ChessEngine.GameState.from_fen(fen), 3)
+    if line:
+        print(f"Mat en {(len(line) + 1) // 2} :", " ".join(m.getUCINotation() for m in line))
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import ChessEngine
+import ChessAI
+
+INFINITY: int = 10 ** 9
+UNKNOWN: Tuple[int, int] = (1, 1)  # Nombres d'un noeud pas encore développé
+PROVEN: Tuple[int, int] = (0, INFINITY)
+DISPROVEN: Tuple[int, int] = (INFINITY, 0)
+
+
+class MateSolver:
+    """
+    Solveur de mat pour la position de game_state (le camp au trait attaque).
+    Les limites de search_info (noeuds, échéance, arrêt) interrompent la
+    recherche par ChessAI.SearchStopped ; la table reste valable pour un appel suivant.
+    """
+
+    def __init__(self, game_state: ChessEngine.GameState, search_info: Optional[ChessAI.SearchInfo] = None) -> None:
+        self.game_state = game_state
+        self.search_info = search_info or ChessAI.SearchInfo()
+        self.table: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.limited = True
+
+    def solve(self, max_moves: int) -> Optional[List[ChessEngine.Move]]:
+        """Variante du mat le plus court en au plus max_moves coups, None s'il n'y en a pas."""
+        for moves in range(1, max_moves + 1):
+            plies = 2 * moves - 1
+            if self.prove(plies):
+                return self.mating_line(plies)
+        return None
+
+    def prove(self, plies: int) -> bool:
+        """Vrai si la position courante est gagnante en au plus plies demi-coups."""
+        key = (self.game_state.get_position_key(), plies)
+        if 0 not in self.table.get(key, UNKNOWN):
+            self._mid(plies, INFINITY, INFINITY)
+        return self.table[key][0] == 0
+
+    def mating_line(self, plies: int) -> List[ChessEngine.Move]:
+        """
+        Variante principale d'une position prouvée : l'attaquant choisit le mat
+        le plus court, le défenseur la parade qui le retarde le plus. Les
+        limites de recherche sont suspendues, la preuve étant déjà établie.
+        """
+        self.limited = False
+        line: List[ChessEngine.Move] = []
+        try:
+            while plies > 0:
+                attacker = plies % 2 == 1
+                best: Optional[Tuple[int, ChessEngine.Move]] = None
+                for move in self._moves(plies):
+                    self.game_state.makeMove(move, validate=False)
+                    length = self._shortest_proof(plies - 1)
+                    self.game_state.undoMove()
+                    if length is None:
+                        continue
+                    if best is None or (length < best[0] if attacker else length > best[0]):
+                        best = (length, move)
+                if best is None:
+                    break
+                line.append(best[1])
+                self.game_state.makeMove(best[1], validate=False)
+                plies = best[0]
+        finally:
+            for _ in line:
+                self.game_state.undoMove()
+            self.limited = True
+        return line
+
+    def _shortest_proof(self, plies: int) -> Optional[int]:
+        """Plus petit nombre de demi-coups (même parité, au plus plies) prouvant le mat."""
+        for depth in range(plies % 2, plies + 1, 2):
+            if self.prove(depth):
+                return depth
+        return None
+
+    def _moves(self, plies: int) -> List[ChessEngine.Move]:
+        """Coups de l'attaquant donnant échec (plies impair) ou parades du défenseur."""
+        moves = self.game_state.getLegalMoves()
+        if plies % 2 == 0:
+            return list(moves)
+        checks: List[ChessEngine.Move] = []
+        for move in moves:
+            self.game_state.makeMove(move, validate=False)
+            if self.game_state.checkForPinsAndChecks()[0]:
+                checks.append(move)
+            self.game_state.undoMove()
+        return checks
+
+    def _terminal(self, plies: int, moves: List[ChessEngine.Move]) -> Optional[Tuple[int, int]]:
+        """Nombres d'un noeud dont l'issue est connue sans le développer, None sinon."""
+        if plies % 2 == 0:
+            if not moves:
+                # Sans coup légal : mat si le défenseur est en échec, pat sinon
+                return PROVEN if self.game_state.checkForPinsAndChecks()[0] else DISPROVEN
+            return DISPROVEN if plies == 0 else None
+        return DISPROVEN if not moves else None
+
+    def _mid(self, plies: int, threshold_pn: int, threshold_dn: int) -> None:
+        """Développe le noeud courant tant que ses nombres restent sous les seuils."""
+        info = self.search_info
+        info.nodes += 1
+        if self.limited and info.nodes & 31 == 0 and info.should_stop():
+            raise ChessAI.SearchStopped()
+        game_state = self.game_state
+        key = (game_state.get_position_key(), plies)
+        moves = self._moves(plies)
+        terminal = self._terminal(plies, moves)
+        if terminal is not None:
+            self.table[key] = terminal
+            return
+        attacker = plies % 2 == 1
+        while True:
+            # Noeud OU (attaquant) : une preuve suffit ; noeud ET (défenseur) : toutes sont nécessaires
+            pn, dn = (INFINITY, 0) if attacker else (0, INFINITY)
+            children: List[Tuple[int, int]] = []
+            for move in moves:
+                game_state.makeMove(move, validate=False)
+                child = self.table.get((game_state.get_position_key(), plies - 1), UNKNOWN)
+                game_state.undoMove()
+                children.append(child)
+                if attacker:
+                    pn, dn = min(pn, child[0]), min(INFINITY, dn + child[1])
+                else:
+                    pn, dn = min(INFINITY, pn + child[0]), min(dn, child[1])
+            # Enfant le plus prometteur : plus petit nombre de preuve (OU) ou de réfutation (ET)
+            side = 0 if attacker else 1
+            order = sorted(range(len(moves)), key=lambda index: children[index][side])
+            best_index = order[0]
+            best_numbers = children[best_index]
+            second = children[order[1]][side] if len(order) > 1 else INFINITY
+            self.table[key] = (pn, dn)
+            if pn >= threshold_pn or dn >= threshold_dn:
+                return
+            if attacker:
+                child_pn = min(threshold_pn, second + 1)
+                child_dn = min(INFINITY, threshold_dn - dn + best_numbers[1])
+            else:
+                child_pn = min(INFINITY, threshold_pn - pn + best_numbers[0])
+                child_dn = min(threshold_dn, second + 1)
+            game_state.makeMove(moves[best_index], validate=False)
+            try:
+                self._mid(plies - 1, child_pn, child_dn)
+            finally:
+                game_state.undoMove()
+
+
+def solve_mate(game_state: ChessEngine.GameState, max_moves: int,
+               search_info: Optional[ChessAI.SearchInfo] = None) -> Tuple[Optional[List[ChessEngine.Move]], ChessAI.SearchInfo]:
+    """
+    Cherche un mat en au plus max_moves coups pour le camp au trait.
+    Retourne la variante du mat le plus court (None si aucun mat n'est trouvé
+    ou si une limite est atteinte) et les statistiques de la recherche ; en
+    cas de succès, search_info.score est un score de mat de ChessAI.
+    """
+    solver = MateSolver(game_state, search_info)
+    try:
+        line = solver.solve(max_moves)
+    except ChessAI.SearchStopped:
+        line = None
+    if line:
+        solver.search_info.depth = len(line)
+        solver.search_info.score = ChessAI.CHECKMATE - len(line)
+        solver.search_info.pv = line
+    return line, solver.search_info
@@ -0,0 +1,214 @@
+"""
+Module ChessPGN
+----------------
+Lecture et écriture de parties au format PGN.
+
+La lecture est paresseuse : read_games() est un générateur qui lit le flux
+ligne par ligne et ne garde en mémoire que la partie en cours, quelle que soit
+la taille du fichier. Les coups SAN sont rejoués dans un GameState en les
+comparant aux coups de getValidMoves. L'écriture produit une SAN correcte
+(désambiguïsation, échec, mat, pièce de promotion).
+
+Usage : python ChessPGN.py parties.pgn   (affiche le débit en parties/seconde)
+"""
+
+import re
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+import ChessEngine
+
+RESULTS: Tuple[str, ...] = ("1-0", "0-1", "1/2-1/2", "*")
+MAX_LINE_LENGTH: int = 80
+MOVE_NUMBER = re.compile(r"^\d+\.+")
+HEADER_VALUE = re.compile(r'"((?:\\.|[^"\\])*)"')  # Chaîne entre guillemets, échappements \\ et \" compris
+ESCAPED_CHAR = re.compile(r"\\(.)")
+
+
+class PGNGame:
+    """Une partie lue dans un fichier PGN : en-têtes, coups SAN et résultat."""
+
+    def __init__(self) -> None:
+        self.headers: Dict[str, str] = {}
+        self.moves: List[str] = []
+        self.result: str = "*"
+
+    def start_fen(self) -> str:
+        return self.headers.get("FEN", ChessEngine.START_FEN)
+
+    def replay(self) -> ChessEngine.GameState:
+        """
+        Rejoue la partie et retourne l'état final.
+        Lève ValueError si un coup est illégal ou ambigu.
+        """
+        game_state = ChessEngine.GameState.from_fen(self.start_fen())
+        for san in self.moves:
+            move = game_state.parse_san_move(san)
+            if move is None:
+                raise ValueError(f"Coup invalide dans la partie : {san}")
+            game_state.makeMove(move, validate=False)
+        return game_state
+
+
+def _tokenize(line: str, state: Dict[str, int]) -> Iterator[str]:
+    """
+    Découpe une ligne de coups en jetons en ignorant les commentaires { } et ;,
+    les variantes ( ), les NAG ($n) et les numéros de coups. state conserve
+    l'imbrication des commentaires et variantes d'une ligne à l'autre.
+    """
+    token = ""
+    for char in line:
+        if state["comment"]:
+            if char == "}":
+                state["comment"] = 0
+            continue
+        if char == "{":
+            state["comment"] = 1
+        elif char == ";" and not state["variation"]:
+            break
+        elif char == "(":
+            state["variation"] += 1
+        elif char == ")":
+            state["variation"] = max(0, state["variation"] - 1)
+        elif not state["variation"] and not char.isspace():
+            token += char
+            continue
+        if token:
+            yield token
+            token = ""
+    if token:
+        yield token
+
+
+def read_games(stream: TextIO) -> Iterator[PGNGame]:
+    """Lit les parties une à une depuis un flux texte."""
+    game: Optional[PGNGame] = None
+    in_movetext = False
+    state = {"comment": 0, "variation": 0}
+    for line in stream:
+        stripped = line.strip()
+        if not state["comment"] and stripped.startswith("[") and stripped.endswith("]"):
+            if game is not None and in_movetext:
+                yield game
+                game = None
+            if game is None:
+                game = PGNGame()
+                in_movetext = False
+            key, _, value = stripped[1:-1].partition(" ")
+            quoted = HEADER_VALUE.match(value.strip())
+            game.headers[key] = ESCAPED_CHAR.sub(r"\1", quoted.group(1)) if quoted else value.strip()
+            continue
+        if not stripped and not state["comment"]:
+            continue
+        if game is None:
+            game = PGNGame()
+        in_movetext = True
+        for token in _tokenize(stripped, state):
+            if token in RESULTS:
+                game.result = token
+                yield game
+                game = None
+                in_movetext = False
+                break
+            if token.startswith("$"):
+                continue
+            # Retire les numéros de coups (« 12. », « 12... », « 12.e4 »)
+            token = MOVE_NUMBER.sub("", token)
+            if token:
+                game.moves.append(token)
+    if game is not None and (game.moves or game.headers):
+        yield game
+
+
+def iter_replayed(stream: TextIO) -> Iterator[Tuple[PGNGame, ChessEngine.GameState]]:
+    """Lit et rejoue chaque partie ; les parties invalides sont ignorées."""
+    for game in read_games(stream):
+        try:
+            yield game, game.replay()
+        except ValueError:
+            continue
+
+
+def format_pgn(headers: Dict[str, str], san_moves: List[str], result: str, start_fullmove: int = 1,
+               black_first: bool = False) -> str:
+    """Assemble une partie PGN (en-têtes puis coups, lignes de 80 caractères au plus)."""
+    lines = ['[{} "{}"]'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+             for key, value in headers.items()]
+    tokens: List[str] = []
+    move_number = start_fullmove
+    white_turn = not black_first
+    if black_first and san_moves:
+        tokens.append(f"{move_number}...")
+    for san in san_moves:
+        if white_turn:
+            tokens.append(f"{move_number}.")
+        tokens.append(san)
+        if not white_turn:
+            move_number += 1
+        white_turn = not white_turn
+    tokens.append(result)
+    movetext: List[str] = []
+    current = ""
+    for token in tokens:
+        if current and len(current) + 1 + len(token) > MAX_LINE_LENGTH:
+            movetext.append(current)
+            current = token
+        else:
+            current = f"{current} {token}" if current else token
+    movetext.append(current)
+    return "\n".join(lines) + "\n\n" + "\n".join(movetext) + "\n\n"
+
+
+def game_result(game_state: ChessEngine.GameState) -> str:
+    """Résultat PGN de la position courante (« * » si la partie continue)."""
+    game_state.getValidMoves()
+    if game_state.checkmate and not game_state.stalemate:
+        return "0-1" if game_state.white_to_move else "1-0"
+    if game_state.stalemate:
+        return "1/2-1/2"
+    return "*"
+
+
+def game_to_pgn(game_state: ChessEngine.GameState, headers: Optional[Dict[str, str]] = None,
+                result: Optional[str] = None) -> str:
+    """Convertit une partie (GameState et son move_log) en texte PGN."""
+    replay = ChessEngine.GameState.from_fen(game_state.start_fen)
+    start_fullmove, black_first = replay.start_fullmove, not replay.white_to_move
+    san_moves: List[str] = []
+    for move in game_state.move_log:
+        replay_move = replay.parse_uci_move(move.getUCINotation())
+        if replay_move is None:
+            raise ValueError(f"Coup incohérent avec la position de départ : {move}")
+        san_moves.append(replay.get_san(replay_move))
+        replay.makeMove(replay_move, validate=False)
+    result = result or game_result(game_state)
+    all_headers = {"Event": "?", "Site": "?", "Date": "????.??.??", "Round": "?",
+                   "White": "?", "Black": "?", "Result": result}
+    all_headers.update(headers or {})
+    all_headers["Result"] = result
+    if game_state.start_fen != ChessEngine.START_FEN:
+        all_headers["SetUp"] = "1"
+        all_headers["FEN"] = game_state.start_fen
+    return format_pgn(all_headers, san_moves, result, start_fullmove, black_first)
+
+
+def write_game(stream: TextIO, game_state: ChessEngine.GameState, headers: Optional[Dict[str, str]] = None,
+               result: Optional[str] = None) -> None:
+    stream.write(game_to_pgn(game_state, headers, result))
+
+
+if __name__ == "__main__":
+    games = plies = errors = 0
+    start_time = time.perf_counter()
+    with open(sys.argv[1], encoding="utf-8", errors="replace") as pgn_file:
+        for pgn_game in read_games(pgn_file):
+            try:
+                plies += len(pgn_game.replay().move_log)
+                games += 1
+            except ValueError as e:
+                errors += 1
+                print(f"Partie ignorée ({e})", file=sys.stderr)
+    elapsed = time.perf_counter() - start_time
+    print(f"{games} parties ({errors} erreurs), {plies} demi-coups en {elapsed:.2f} s : "
+          f"{games / elapsed if elapsed else 0:.1f} parties/s, {plies / elapsed if elapsed else 0:.0f} demi-coups/s")
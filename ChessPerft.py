@@ -0,0 +1,172 @@
+"""
+Module ChessPerft
+------------------
+Perft : nombre de positions atteintes en N demi-coups, pour valider le
+générateur de coups contre des valeurs de référence (REFERENCE_POSITIONS).
+
+Les promotions comptent pour quatre coups (dame, tour, fou, cavalier), comme
+dans les valeurs publiées. Les coups sont ceux de getLegalMoves : règles de
+déplacement seules, sans nulle par répétition ni règle des 50 coups.
+
+parallel_divide() répartit les coups de la racine entre les processus d'un
+Pool : chaque tâche reçoit la position sérialisée (pickle de GameState, soit
+la FEN et l'historique de répétition) et le coup en notation UCI, et renvoie
+le nombre de feuilles sous ce coup. Une table de transposition optionnelle
+(ChessEval.HashTable, une par processus) mémorise les sous-arbres déjà
+comptés, par clé de position et profondeur.
+
+Usage : python ChessPerft.py 5 [--fen FEN] [--processes N] [--hash-bits 20]
+        python ChessPerft.py --check   (compare aux valeurs de référence)
+"""
+
+import argparse
+import multiprocessing
+import pickle
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import ChessEngine
+import ChessEval
+
+PROMOTION_PIECES: str = "QRBN"
+PERFT_HASH_BITS: int = 20
+
+# FEN et nombres de feuilles aux profondeurs 1, 2, 3, ...
+REFERENCE_POSITIONS: Dict[str, Tuple[str, List[int]]] = {
+    "initiale": (ChessEngine.START_FEN, [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 [48, 2039, 97862, 4085603]),
+    "position 3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    "position 4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                   [6, 264, 9467, 422333]),
+    "position 5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+}
+
+
+def _table_check(game_state: ChessEngine.GameState, depth: int) -> Tuple[int, int, Tuple[int, int]]:
+    """La clé de position ignore roques et prise en passant : ils complètent la profondeur."""
+    return depth, game_state.castling, game_state.enpassant_possible
+
+
+def perft(game_state: ChessEngine.GameState, depth: int, table: Optional[ChessEval.HashTable] = None) -> int:
+    """Nombre de feuilles de l'arbre des coups légaux de profondeur depth."""
+    if depth == 0:
+        return 1
+    moves = game_state.getLegalMoves()
+    if depth == 1:
+        return sum(len(PROMOTION_PIECES) if move.is_pawn_promotion else 1 for move in moves)
+    if table is not None:
+        key, check = game_state.get_position_key(), _table_check(game_state, depth)
+        count = table.get(key, check)
+        if count is not None:
+            return count
+    count = 0
+    for move in list(moves):
+        for piece in (PROMOTION_PIECES if move.is_pawn_promotion else "Q"):
+            move.promotion_choice = piece
+            game_state.makeMove(move, validate=False)
+            count += perft(game_state, depth - 1, table)
+            game_state.undoMove()
+        move.promotion_choice = "Q"
+    if table is not None:
+        table.put(key, count, check)
+    return count
+
+
+def _root_moves(game_state: ChessEngine.GameState) -> List[str]:
+    """Coups de la racine en notation UCI, une entrée par pièce de promotion."""
+    notations: List[str] = []
+    for move in game_state.getLegalMoves():
+        uci = move.getUCINotation()
+        if move.is_pawn_promotion:
+            notations.extend(uci[:4] + piece.lower() for piece in PROMOTION_PIECES)
+        else:
+            notations.append(uci)
+    return notations
+
+
+def _perft_move(game_state: ChessEngine.GameState, uci: str, depth: int,
+                table: Optional[ChessEval.HashTable]) -> int:
+    # Recherche parmi getLegalMoves : parse_uci_move arbitre aussi les nulles
+    move = next(move for move in game_state.getLegalMoves() if move.getUCINotation()[:4] == uci[:4])
+    move.promotion_choice = uci[4].upper() if len(uci) > 4 else "Q"
+    game_state.makeMove(move, validate=False)
+    move.promotion_choice = "Q"
+    try:
+        return perft(game_state, depth - 1, table)
+    finally:
+        game_state.undoMove()
+
+
+def divide(game_state: ChessEngine.GameState, depth: int,
+           table: Optional[ChessEval.HashTable] = None) -> Dict[str, int]:
+    """Nombre de feuilles sous chaque coup de la racine (notation UCI), dans un seul processus."""
+    return {uci: _perft_move(game_state, uci, depth, table) for uci in _root_moves(game_state)}
+
+
+# Table de transposition propre à chaque processus du Pool
+_worker_table: Optional[ChessEval.HashTable] = None
+
+
+def _init_worker(hash_bits: Optional[int]) -> None:
+    global _worker_table
+    _worker_table = ChessEval.HashTable(hash_bits) if hash_bits else None
+
+
+def _worker(task: Tuple[bytes, str, int]) -> Tuple[str, int]:
+    state, uci, depth = task
+    return uci, _perft_move(pickle.loads(state), uci, depth, _worker_table)
+
+
+def parallel_divide(game_state: ChessEngine.GameState, depth: int, processes: Optional[int] = None,
+                    hash_bits: Optional[int] = None) -> Dict[str, int]:
+    """
+    divide() réparti entre processes processus (tous les coeurs par défaut).
+    Les coups sont distribués un par un : un processus libre prend le suivant,
+    ce qui équilibre les sous-arbres de tailles inégales. Avec hash_bits,
+    chaque processus garde une table de 2 ** hash_bits entrées d'une tâche à l'autre.
+    """
+    notations = _root_moves(game_state)
+    if depth <= 1 or processes == 1:
+        return divide(game_state, depth, ChessEval.HashTable(hash_bits) if hash_bits else None)
+    state = pickle.dumps(game_state)
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(hash_bits,)) as pool:
+        counts = dict(pool.imap_unordered(_worker, [(state, uci, depth) for uci in notations]))
+    return {uci: counts[uci] for uci in notations}
+
+
+def check_references(max_nodes: int, processes: Optional[int] = None, hash_bits: Optional[int] = None) -> bool:
+    """Compare perft aux valeurs de référence jusqu'à max_nodes feuilles. Vrai si tout concorde."""
+    success = True
+    for name, (fen, expected_counts) in REFERENCE_POSITIONS.items():
+        game_state = ChessEngine.GameState.from_fen(fen)
+        for depth, expected in enumerate(expected_counts, start=1):
+            if expected > max_nodes:
+                break
+            start_time = time.perf_counter()
+            count = sum(parallel_divide(game_state, depth, processes, hash_bits).values())
+            status = "ok" if count == expected else f"ERREUR (attendu {expected})"
+            success = success and count == expected
+            print(f"{name:<12} profondeur {depth} : {count:>9} {status}  ({time.perf_counter() - start_time:.2f} s)")
+    return success
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perft parallèle avec sortie divide")
+    parser.add_argument("depth", type=int, nargs="?", default=4)
+    parser.add_argument("--fen", default=ChessEngine.START_FEN)
+    parser.add_argument("--processes", type=int, default=None, help="Nombre de processus (tous les coeurs par défaut)")
+    parser.add_argument("--hash-bits", type=int, default=PERFT_HASH_BITS, help="Taille de la table (0 : sans table)")
+    parser.add_argument("--check", action="store_true", help="Valide les positions de référence")
+    parser.add_argument("--max-nodes", type=int, default=500000, help="Limite des vérifications de --check")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(0 if check_references(args.max_nodes, args.processes, args.hash_bits) else 1)
+    start_time = time.perf_counter()
+    counts = parallel_divide(ChessEngine.GameState.from_fen(args.fen), args.depth, args.processes, args.hash_bits)
+    elapsed = time.perf_counter() - start_time
+    for uci, count in counts.items():
+        print(f"{uci}: {count}")
+    total = sum(counts.values())
+    print(f"\nNoeuds : {total}  temps : {elapsed:.2f} s  ({total / elapsed if elapsed else 0:.0f} noeuds/s)")
@@ -0,0 +1,152 @@
+"""
+Module ChessSave
+-----------------
+Format de sauvegarde compact, sans pickle : la position de départ (FEN)
+suivie de la liste des coups, chacun codé sur 16 bits (case de départ,
+case d'arrivée, pièce de promotion). Le chargement rejoue les coups sans
+validation, en reconstruisant chaque Move directement depuis le plateau.
+
+Le même format sert de journal : GameJournal ajoute chaque coup joué (ou
+annulé) à la fin du fichier au fil de la partie. La sauvegarde automatique
+coûte donc deux octets par coup, et une partie interrompue (plantage,
+coupure) se récupère avec load_game, y compris si la dernière écriture est
+incomplète.
+
+Structure du fichier :
+    MAGIC (4 octets) | version (1 octet) | longueur FEN (u16) | FEN (UTF-8)
+    puis une suite de codes u16 little-endian, UNDO_CODE pour une annulation.
+"""
+
+import os
+import struct
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+import ChessEngine
+
+MAGIC: bytes = b"CPSV"
+VERSION: int = 1
+HEADER = struct.Struct("<4sBH")
+CODE = struct.Struct("<H")
+UNDO_CODE: int = 0xFFFF
+PROMOTION_PIECES: str = "QRBN"
+
+
+def encode_move(move: ChessEngine.Move) -> int:
+    """Code un coup sur 16 bits : départ (6 bits), arrivée (6 bits), promotion (2 bits)."""
+    promotion = PROMOTION_PIECES.index(move.promotion_choice) if move.is_pawn_promotion else 0
+    return ((move.start_row * 8 + move.start_col)
+            | (move.end_row * 8 + move.end_col) << 6
+            | promotion << 12)
+
+
+def decode_move(game_state: ChessEngine.GameState, code: int) -> ChessEngine.Move:
+    """
+    Reconstruit le coup dans la position courante sans générer les coups légaux.
+    Les drapeaux en passant et roque sont déduits du plateau.
+    Lève ValueError si la case de départ est vide.
+    """
+    start, end = code & 0x3F, (code >> 6) & 0x3F
+    start_sq, end_sq = divmod(start, 8), divmod(end, 8)
+    piece = game_state.board[start_sq[0]][start_sq[1]]
+    if piece == "--":
+        raise ValueError(f"Coup invalide dans la sauvegarde : case de départ vide ({code})")
+    is_enpassant = (piece[1] == 'p' and start_sq[1] != end_sq[1]
+                    and game_state.board[end_sq[0]][end_sq[1]] == "--")
+    is_castle = piece[1] == 'K' and abs(end_sq[1] - start_sq[1]) == 2
+    move = ChessEngine.Move(start_sq, end_sq, game_state.board, is_enpassant_move=is_enpassant,
+                            is_castle_move=is_castle)
+    if move.is_pawn_promotion:
+        move.promotion_choice = PROMOTION_PIECES[(code >> 12) & 0x3]
+    return move
+
+
+def _write_header(stream: BinaryIO, start_fen: str) -> None:
+    fen = start_fen.encode("utf-8")
+    stream.write(HEADER.pack(MAGIC, VERSION, len(fen)) + fen)
+
+
+def _encode_codes(codes: Iterable[int]) -> bytes:
+    return b"".join(CODE.pack(code) for code in codes)
+
+
+def save_game(game_state: ChessEngine.GameState, path: str) -> None:
+    """
+    Écrit la partie (FEN de départ et coups). L'écriture passe par un fichier
+    temporaire remplacé atomiquement : une sauvegarde interrompue ne détruit
+    pas la précédente.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as stream:
+        _write_header(stream, game_state.start_fen)
+        stream.write(_encode_codes(encode_move(move) for move in game_state.move_log))
+    os.replace(temp_path, path)
+
+
+def read_codes(path: str) -> Tuple[str, List[int]]:
+    """Retourne (FEN de départ, liste des codes). Un dernier code tronqué est ignoré."""
+    with open(path, "rb") as stream:
+        data = stream.read()
+    if len(data) < HEADER.size:
+        raise ValueError("Fichier de sauvegarde tronqué")
+    magic, version, fen_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Fichier de sauvegarde non reconnu")
+    start_fen = data[HEADER.size:HEADER.size + fen_length].decode("utf-8")
+    body = data[HEADER.size + fen_length:]
+    body = body[:len(body) - len(body) % CODE.size]
+    codes: List[int] = [code for (code,) in CODE.iter_unpack(body)]
+    return start_fen, codes
+
+
+def load_game(path: str) -> ChessEngine.GameState:
+    """Recharge une sauvegarde ou un journal en rejouant les coups sans validation."""
+    start_fen, codes = read_codes(path)
+    game_state = ChessEngine.GameState.from_fen(start_fen)
+    for code in codes:
+        if code == UNDO_CODE:
+            game_state.undoMove()
+        else:
+            game_state.makeMove(decode_move(game_state, code), validate=False)
+    return game_state
+
+
+class GameJournal:
+    """
+    Journal en ajout seul de la partie en cours : start() écrit l'en-tête (et
+    les coups déjà joués), puis chaque coup ou annulation ajoute deux octets.
+    Avec durable=True, chaque écriture est suivie d'un fsync.
+    """
+
+    def __init__(self, path: str, durable: bool = False) -> None:
+        self.path = path
+        self.durable = durable
+        self.stream: Optional[BinaryIO] = None
+
+    def start(self, game_state: ChessEngine.GameState) -> None:
+        """Commence un nouveau journal pour game_state (l'ancien est remplacé)."""
+        self.close()
+        self.stream = open(self.path, "wb")
+        _write_header(self.stream, game_state.start_fen)
+        self._write(_encode_codes(encode_move(move) for move in game_state.move_log))
+
+    def record_move(self, move: ChessEngine.Move) -> None:
+        self._write(CODE.pack(encode_move(move)))
+
+    def record_undo(self) -> None:
+        self._write(CODE.pack(UNDO_CODE))
+
+    def _write(self, data: bytes) -> None:
+        if self.stream is None:
+            return
+        self.stream.write(data)
+        self.stream.flush()
+        if self.durable:
+            os.fsync(self.stream.fileno())
+
+    def close(self, remove: bool = False) -> None:
+        """Ferme le journal ; remove=True le supprime (fin de session normale)."""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,243 @@
+"""
+Module ChessSoak
+-----------------
+Banc d'endurance : joue une longue partie (plusieurs centaines de demi-coups)
+et mesure, à chaque demi-coup, le coût des opérations du moteur pour vérifier
+qu'il ne dépend pas de la longueur de la partie.
+
+Mesures par demi-coup (colonnes de FIELDS) :
+    make_ms, undo_ms    makeMove puis undoMove du coup joué (rejoué ensuite)
+    movegen_ms          getLegalMoves de la nouvelle position
+    search_ms           ChessAI.searchBestMove à la profondeur demandée
+    search_nodes        noeuds visités par cette recherche
+    search_ms_per_node  search_ms / search_nodes
+    base_*              les mêmes mesures sur une copie neuve de la position
+                        (GameState.from_fen, sans historique)
+    traced_bytes        mémoire allouée (tracemalloc) après le demi-coup
+    peak_bytes          pic de mémoire pendant le demi-coup
+    pickled_bytes       taille de pickle.dumps(GameState)
+
+Les coups mesurés et cherchés sont ceux de getLegalMoves : getValidMoves
+renverrait une liste vide dès qu'une nulle (50 coups, répétition) est
+réclamable, et les demi-coups suivants ne mesureraient plus rien. Les tables
+d'évaluation de ChessAI sont vidées avant chaque demi-coup.
+
+La partie est scriptée (coups d'un fichier PGN) ou tirée au hasard avec une
+graine fixe : coups sans prise de préférence, en évitant ceux qui materaient
+ou pateraient l'adversaire et ceux qui mèneraient à une nulle, pour garder du
+matériel et aller au bout.
+
+Le temps brut d'une recherche dépend surtout de la position (mobilité,
+matériel), pas de la longueur de la partie : il reste dans le profil mais ne
+compte pas dans le verdict. Chaque coût de GATED_FIELDS est rapporté à celui
+de la copie neuve mesurée au même demi-coup, ce qui retire l'effet de la
+position et ne laisse que celui de l'historique. Le profil est écrit en CSV
+ou en JSON (selon l'extension). Le banc échoue (code de sortie 1) si l'un de
+ces rapports augmente de plus de MAX_TIME_GROWTH entre le début et la fin de
+la partie (droite de régression), si la mémoire allouée ou la taille picklée
+croissent de plus de MAX_MEMORY_SLOPE ou MAX_PICKLE_SLOPE octets par
+demi-coup, ou si une partie des demi-coups n'a pas été cherchée.
+
+Usage : python ChessSoak.py [--plies 500] [--pgn partie.pgn] [--output soak.csv]
+"""
+
+import argparse
+import csv
+import gc
+import json
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import ChessEngine
+import ChessAI
+import ChessPGN
+
+SOAK_PLIES: int = 500
+SOAK_SEARCH_DEPTH: int = 1
+MAX_TIME_GROWTH: float = 0.5  # Hausse relative tolérée de chaque coût rapporté à la référence, sur toute la partie
+MAX_MEMORY_SLOPE: float = 4096.0  # Octets par demi-coup
+# Octets par demi-coup ; la fenêtre de répétition picklée est bornée par la règle des 50 coups
+MAX_PICKLE_SLOPE: float = 8.0
+GATED_FIELDS = ("make_ms", "undo_ms", "movegen_ms", "search_ms_per_node")
+FIELDS = (("ply",) + GATED_FIELDS[:3] + ("search_ms", "search_nodes", "search_ms_per_node")
+          + tuple("base_" + field for field in GATED_FIELDS) + ("traced_bytes", "peak_bytes", "pickled_bytes"))
+
+
+def choose_move(game_state: ChessEngine.GameState, rng: random.Random) -> Optional[ChessEngine.Move]:
+    """
+    Coup de la partie aléatoire : les coups sans prise sont essayés d'abord,
+    dans un ordre tiré au hasard, et le premier qui laisse un coup légal à
+    l'adversaire sans mener à une nulle est joué. À défaut, le premier qui
+    laisse un coup légal. None si la partie ne peut pas continuer.
+    """
+    moves = list(game_state.getLegalMoves())
+    rng.shuffle(moves)
+    moves.sort(key=lambda move: move.piece_captured != "--")
+    fallback: Optional[ChessEngine.Move] = None
+    for move in moves:
+        game_state.makeMove(move, validate=False)
+        playable = game_state.has_legal_move()
+        draw = game_state.is_draw()
+        game_state.undoMove()
+        if playable and not draw:
+            return move
+        if playable and fallback is None:
+            fallback = move
+    return fallback
+
+
+def measure_ply(game_state: ChessEngine.GameState, move: ChessEngine.Move, depth: int) -> Dict[str, float]:
+    """
+    Coûts de makeMove, undoMove, getLegalMoves et de la recherche pour le coup
+    move, qui reste joué. Les tables d'évaluation de ChessAI sont vidées
+    avant : leur remplissage (borné) rendrait les recherches incomparables.
+    """
+    ChessAI.clear_eval_caches()
+    start = time.perf_counter()
+    game_state.makeMove(move, validate=False)
+    make_time = time.perf_counter()
+    game_state.undoMove()
+    undo_time = time.perf_counter()
+    game_state.makeMove(move, validate=False)
+    movegen_start = time.perf_counter()
+    legal_moves = game_state.getLegalMoves()
+    search_start = time.perf_counter()
+    search_info = ChessAI.SearchInfo()
+    if depth and legal_moves:
+        ChessAI.searchBestMove(game_state, list(legal_moves), depth, search_info)
+    search_ms = (time.perf_counter() - search_start) * 1000
+    return {
+        "make_ms": (make_time - start) * 1000,
+        "undo_ms": (undo_time - make_time) * 1000,
+        "movegen_ms": (search_start - movegen_start) * 1000,
+        "search_ms": search_ms,
+        "search_nodes": search_info.nodes,
+        "search_ms_per_node": search_ms / search_info.nodes if search_info.nodes else 0.0,
+    }
+
+
+def soak(plies: int = SOAK_PLIES, depth: int = SOAK_SEARCH_DEPTH, seed: int = 0,
+         script: Optional[List[str]] = None, start_fen: str = ChessEngine.START_FEN) -> List[Dict[str, float]]:
+    """
+    Joue jusqu'à plies demi-coups (ceux de script, en SAN, s'il est donné) et
+    retourne une ligne de mesures par demi-coup joué.
+    """
+    rng = random.Random(seed)
+    game_state = ChessEngine.GameState.from_fen(start_fen)
+    rows: List[Dict[str, float]] = []
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        for ply in range(1, plies + 1):
+            if script is not None:
+                move = game_state.parse_san_move(script[ply - 1]) if ply <= len(script) else None
+            else:
+                move = choose_move(game_state, rng)
+            if move is None:
+                break
+            tracemalloc.reset_peak()
+            # Référence : la même position sans historique, mesurée juste avant la partie elle-même
+            base = measure_ply(ChessEngine.GameState.from_fen(game_state.get_fen()), move, depth)
+            # La copie forme des cycles (méthodes liées de move_functions) : libérée avant les mesures de la
+            # partie pour ne fausser ni leurs temps ni traced_bytes
+            gc.collect()
+            row: Dict[str, float] = {"ply": ply}
+            row.update(measure_ply(game_state, move, depth))
+            row.update({"base_" + field: base[field] for field in GATED_FIELDS})
+            traced, peak = tracemalloc.get_traced_memory()
+            row.update({"traced_bytes": traced, "peak_bytes": peak, "pickled_bytes": len(pickle.dumps(game_state))})
+            rows.append(row)
+    finally:
+        if started:
+            tracemalloc.stop()
+    return rows
+
+
+def growth(rows: List[Dict[str, float]], values: List[float]) -> Dict[str, float]:
+    """
+    Droite de régression des valeurs en fonction du demi-coup : pente par
+    demi-coup, valeur au début et hausse relative entre le premier et le dernier.
+    """
+    plies = np.array([row["ply"] for row in rows], dtype=float)
+    if len(rows) < 2:
+        return {"slope": 0.0, "start": float(values[0]) if values else 0.0, "growth": 0.0}
+    slope, intercept = np.polyfit(plies, np.array(values, dtype=float), 1)
+    start, end = intercept + slope * plies[0], intercept + slope * plies[-1]
+    return {"slope": float(slope), "start": float(start),
+            "growth": float((end - start) / start) if start > 0 else 0.0}
+
+
+def summarize(rows: List[Dict[str, float]], max_time_growth: float = MAX_TIME_GROWTH,
+              max_memory_slope: float = MAX_MEMORY_SLOPE,
+              max_pickle_slope: float = MAX_PICKLE_SLOPE) -> Dict[str, object]:
+    """
+    Tendances de chaque mesure, tendance du rapport à la référence de chaque
+    coût de GATED_FIELDS (1 si la référence est nulle) et verdict du banc ("passed").
+    """
+    trends = {field: growth(rows, [row[field] for row in rows]) for field in FIELDS[1:]}
+    ratios = {field: growth(rows, [row[field] / row["base_" + field] if row["base_" + field] > 0 else 1.0
+                                   for row in rows]) for field in GATED_FIELDS}
+    # Un demi-coup sans recherche fausse les tendances (sauf profondeur 0 : aucun n'en a)
+    unsearched = sum(1 for row in rows if not row["search_nodes"])
+    passed = (all(ratio["growth"] <= max_time_growth for ratio in ratios.values())
+              and trends["traced_bytes"]["slope"] <= max_memory_slope
+              and trends["pickled_bytes"]["slope"] <= max_pickle_slope and unsearched in (0, len(rows)))
+    return {"plies": len(rows), "ratios": ratios, "trends": trends, "unsearched": unsearched,
+            "max_time_growth": max_time_growth, "max_memory_slope": max_memory_slope,
+            "max_pickle_slope": max_pickle_slope, "passed": passed}
+
+
+def write_profile(path: str, rows: List[Dict[str, float]], summary: Dict[str, object]) -> None:
+    """Écrit les mesures en JSON (avec le résumé) si path se termine par .json, en CSV sinon."""
+    with open(path, "w", newline="") as stream:
+        if path.endswith(".json"):
+            json.dump({"summary": summary, "plies": rows}, stream, indent=1)
+        else:
+            writer = csv.DictWriter(stream, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def report(summary: Dict[str, object], output: Callable[[str], None] = print) -> None:
+    output(f"Demi-coups joués : {summary['plies']}")
+    output(f"Coûts rapportés à une copie sans historique (hausse tolérée : {summary['max_time_growth']:.0%}) :")
+    for field, ratio in summary["ratios"].items():
+        output(f"  {field:<18} {ratio['start']:.2f} au début, hausse {ratio['growth']:+.1%}")
+    for field, trend in summary["trends"].items():
+        output(f"  {field:<18} pente {trend['slope']:+.4g} par demi-coup")
+    if 0 < summary["unsearched"] < summary["plies"]:
+        output(f"ÉCHEC : {summary['unsearched']} demi-coups sans recherche")
+    elif not summary["passed"]:
+        output("ÉCHEC : le coût dépend de la longueur de la partie")
+    else:
+        output("Réussi")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'endurance sur une longue partie")
+    parser.add_argument("--plies", type=int, default=SOAK_PLIES)
+    parser.add_argument("--depth", type=int, default=SOAK_SEARCH_DEPTH, help="Profondeur de recherche (0 : aucune)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pgn", default=None, help="Partie scriptée (première partie du fichier)")
+    parser.add_argument("--output", default="soak.csv", help="Profil en .csv ou .json")
+    parser.add_argument("--max-growth", type=float, default=MAX_TIME_GROWTH)
+    parser.add_argument("--max-memory-slope", type=float, default=MAX_MEMORY_SLOPE)
+    parser.add_argument("--max-pickle-slope", type=float, default=MAX_PICKLE_SLOPE)
+    args = parser.parse_args()
+    script, fen = None, ChessEngine.START_FEN
+    if args.pgn:
+        with open(args.pgn, encoding="utf-8", errors="replace") as pgn_file:
+            game = next(ChessPGN.read_games(pgn_file))
+        script, fen = game.moves, game.start_fen()
+    profile = soak(args.plies, args.depth, args.seed, script, fen)
+    result = summarize(profile, args.max_growth, args.max_memory_slope, args.max_pickle_slope)
+    write_profile(args.output, profile, result)
+    report(result)
+    sys.exit(0 if result["passed"] else 1)
@@ -0,0 +1,348 @@
+"""
+Module ChessTune
+-----------------
+Réglage des poids de l'évaluation à la manière de Texel.
+
+L'évaluation statique de ChessAI (staticEval) est linéaire en ses poids :
+valeur des pièces, tables de position (piece_position_scores, vues du côté
+des blancs) et termes de EVAL_PARAMS (centre, sécurité du roi, mobilité,
+structure de pions, bouclier). Chaque position est donc décrite par un
+vecteur creux de coefficients, et son évaluation est le produit scalaire de
+ce vecteur par le vecteur des poids.
+
+Le pipeline :
+  1. extract() lit un PGN au fil de l'eau, rejoue les parties et écrit, par
+     lots, les vecteurs creux et le résultat de la partie (1, 0,5 ou 0 pour
+     les blancs) dans un FeatureDataset sur disque : la mémoire ne dépend
+     que de la taille d'un lot, quel que soit le nombre de positions ;
+  2. fit_scale() choisit la constante K de la sigmoïde pour les poids actuels ;
+  3. fit() minimise la perte logistique entre sigmoid(K × évaluation) et le
+     résultat, par descente de gradient (Adam) sur des lots vectorisés ;
+  4. save_params() écrit les tables réglées dans un fichier JSON, que
+     load_params() recharge dans ChessEngine et ChessAI.
+
+Usage : python ChessTune.py parties.pgn --data donnees_tune --output tuned_params.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+import ChessEngine
+import ChessAI
+import ChessEval
+import ChessPGN
+
+TUNED_PIECES: str = "QRBNp"  # Le roi n'a ni valeur ni table de position
+MATERIAL_OFFSET: int = 0
+PST_OFFSET: int = MATERIAL_OFFSET + len(TUNED_PIECES)
+SCALAR_OFFSET: int = PST_OFFSET + len(TUNED_PIECES) * 64
+SCALAR_TERMS: Tuple[str, ...] = (("center_bonus", "king_safety_penalty", "mobility_bonus")
+                                 + ChessEval.PAWN_STRUCTURE_TERMS + ("pawn_shield_bonus",))
+FEATURE_COUNT: int = SCALAR_OFFSET + len(SCALAR_TERMS)
+
+RESULT_LABELS: Dict[str, float] = {"1-0": 1.0, "1/2-1/2": 0.5, "0-1": 0.0}
+CENTER_SQUARES: Tuple[Tuple[int, int], ...] = ((3, 3), (3, 4), (4, 3), (4, 4))
+ADJACENT_OFFSETS: Tuple[Tuple[int, int], ...] = ((-1, -1), (-1, 0), (-1, 1), (0, -1),
+                                                 (0, 1), (1, -1), (1, 0), (1, 1))
+BATCH_SIZE: int = 1 << 14
+SKIP_PLIES: int = 8  # Les premiers demi-coups (ouverture) ne sont pas utilisés
+
+
+# ------------------------------------------------------------------ coefficients
+
+def extract_features(game_state: ChessEngine.GameState) -> Optional[Tuple[List[int], List[float]]]:
+    """
+    Vecteur creux (indices, coefficients) de la position, du point de vue des
+    blancs, tel que staticEval vaut la somme des poids multipliés par les
+    coefficients. None si la partie est terminée (mat ou pat).
+    """
+    mobility = len(game_state.getLegalMoves())
+    if not mobility:
+        return None
+    board = game_state.board
+    features: Dict[int, float] = {}
+
+    def add(index: int, value: float) -> None:
+        features[index] = features.get(index, 0.0) + value
+
+    center = SCALAR_OFFSET + SCALAR_TERMS.index("center_bonus")
+    for r, c in game_state.get_piece_squares("w") | game_state.get_piece_squares("b"):
+        piece = board[r][c]
+        sign = 1 if piece[0] == "w" else -1
+        if piece[1] != "K":
+            index = TUNED_PIECES.index(piece[1])
+            add(MATERIAL_OFFSET + index, sign)
+            # Les tables noires sont les tables blanches lues à l'envers
+            row = r if piece[0] == "w" else ChessEngine.DIMENSION - 1 - r
+            add(PST_OFFSET + index * 64 + row * 8 + c, sign)
+        if (r, c) in CENTER_SQUARES:
+            add(center, sign)
+
+    king_row, king_col = game_state.white_king_location if game_state.white_to_move else game_state.black_king_location
+    enemy_color = "b" if game_state.white_to_move else "w"
+    attackers = sum(1 for dr, dc in ADJACENT_OFFSETS
+                    if 0 <= king_row + dr < ChessEngine.DIMENSION and 0 <= king_col + dc < ChessEngine.DIMENSION
+                    and board[king_row + dr][king_col + dc][0] == enemy_color)
+    stm_sign = 1 if game_state.white_to_move else -1
+    add(SCALAR_OFFSET + SCALAR_TERMS.index("king_safety_penalty"), -stm_sign * attackers)
+    add(SCALAR_OFFSET + SCALAR_TERMS.index("mobility_bonus"), stm_sign * mobility)
+
+    pawn_features = ChessEval.pawn_structure_features(ChessEval.pawn_squares(game_state, "w"),
+                                                      ChessEval.pawn_squares(game_state, "b"))
+    for name, value in pawn_features.items():
+        add(SCALAR_OFFSET + SCALAR_TERMS.index(name), value)
+    add(SCALAR_OFFSET + SCALAR_TERMS.index("pawn_shield_bonus"), ChessEval.king_shield_count(game_state))
+
+    indices = sorted(index for index, value in features.items() if value)
+    return indices, [features[index] for index in indices]
+
+
+def current_weights() -> np.ndarray:
+    """Vecteur des poids actuellement utilisés par ChessAI."""
+    weights = np.zeros(FEATURE_COUNT)
+    for index, piece in enumerate(TUNED_PIECES):
+        weights[MATERIAL_OFFSET + index] = ChessEngine.piece_score[piece]
+        start = PST_OFFSET + index * 64
+        weights[start:start + 64] = np.array(ChessEngine.piece_position_scores["w" + piece], dtype=float).ravel()
+    for index, name in enumerate(SCALAR_TERMS):
+        weights[SCALAR_OFFSET + index] = ChessAI.EVAL_PARAMS[name]
+    return weights
+
+
+def apply_weights(weights: np.ndarray) -> None:
+    """
+    Installe les poids dans ChessEngine et ChessAI. Les tables sont modifiées
+    sur place : les tables noires, qui partagent leurs lignes avec les
+    blanches, suivent automatiquement. Les caches d'évaluation sont vidés.
+    """
+    for index, piece in enumerate(TUNED_PIECES):
+        ChessEngine.piece_score[piece] = float(weights[MATERIAL_OFFSET + index])
+        table = ChessEngine.piece_position_scores["w" + piece]
+        start = PST_OFFSET + index * 64
+        for r in range(ChessEngine.DIMENSION):
+            for c in range(ChessEngine.DIMENSION):
+                table[r][c] = float(weights[start + r * 8 + c])
+    for index, name in enumerate(SCALAR_TERMS):
+        ChessAI.EVAL_PARAMS[name] = float(weights[SCALAR_OFFSET + index])
+    ChessAI.clear_eval_caches()
+
+
+def save_params(path: str, weights: np.ndarray) -> None:
+    """Écrit les poids en JSON : valeurs des pièces, tables de position et EVAL_PARAMS."""
+    params = {
+        "piece_score": {piece: round(float(weights[MATERIAL_OFFSET + index]), 4)
+                        for index, piece in enumerate(TUNED_PIECES)},
+        "piece_position_scores": {
+            piece: np.round(weights[PST_OFFSET + index * 64:PST_OFFSET + (index + 1) * 64], 4).reshape(8, 8).tolist()
+            for index, piece in enumerate(TUNED_PIECES)},
+        "eval_params": {name: round(float(weights[SCALAR_OFFSET + index]), 4)
+                        for index, name in enumerate(SCALAR_TERMS)},
+    }
+    with open(path, "w") as params_file:
+        json.dump(params, params_file, indent=1)
+
+
+def load_params(path: str) -> np.ndarray:
+    """Recharge un fichier écrit par save_params, l'installe et retourne le vecteur des poids."""
+    with open(path) as params_file:
+        params = json.load(params_file)
+    weights = current_weights()
+    for index, piece in enumerate(TUNED_PIECES):
+        weights[MATERIAL_OFFSET + index] = params["piece_score"][piece]
+        start = PST_OFFSET + index * 64
+        weights[start:start + 64] = np.array(params["piece_position_scores"][piece], dtype=float).ravel()
+    for index, name in enumerate(SCALAR_TERMS):
+        weights[SCALAR_OFFSET + index] = params["eval_params"].get(name, weights[SCALAR_OFFSET + index])
+    apply_weights(weights)
+    return weights
+
+
+# ------------------------------------------------------------------ données
+
+class FeatureDataset:
+    """
+    Positions étiquetées stockées sur disque en format creux, dans le
+    répertoire directory : nombre de coefficients par position (counts.bin),
+    indices et valeurs bout à bout (indices.bin, values.bin) et résultat
+    (labels.bin). Les ajouts se font par lots ; la lecture passe par memmap.
+    """
+
+    FILES: Dict[str, str] = {"counts": "<u2", "indices": "<u2", "values": "<f4", "labels": "<f4"}
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.paths = {name: os.path.join(directory, name + ".bin") for name in self.FILES}
+        for path in self.paths.values():
+            open(path, "ab").close()
+
+    def __len__(self) -> int:
+        return os.path.getsize(self.paths["counts"]) // np.dtype(self.FILES["counts"]).itemsize
+
+    def append(self, rows: List[Tuple[List[int], List[float], float]]) -> None:
+        arrays = {
+            "counts": [len(indices) for indices, _, _ in rows],
+            "indices": [index for indices, _, _ in rows for index in indices],
+            "values": [value for _, values, _ in rows for value in values],
+            "labels": [label for _, _, label in rows],
+        }
+        for name, data in arrays.items():
+            with open(self.paths[name], "ab") as stream:
+                stream.write(np.array(data, dtype=self.FILES[name]).tobytes())
+
+    def _array(self, name: str) -> np.ndarray:
+        dtype = np.dtype(self.FILES[name])
+        size = os.path.getsize(self.paths[name]) // dtype.itemsize
+        return np.memmap(self.paths[name], dtype=dtype, mode="r", shape=(size,)) if size else np.zeros(0, dtype)
+
+    def batch_bounds(self, batch_size: int) -> List[Tuple[int, int, int]]:
+        """(première position, nombre de positions, premier coefficient) de chaque lot."""
+        counts = self._array("counts")
+        bounds = []
+        offset = 0
+        for start in range(0, len(counts), batch_size):
+            size = min(batch_size, len(counts) - start)
+            bounds.append((start, size, offset))
+            offset += int(counts[start:start + size].sum(dtype=np.int64))
+        return bounds
+
+    def batches(self, batch_size: int = BATCH_SIZE,
+                rng: Optional[np.random.Generator] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Lots (ligne de chaque coefficient, indices, valeurs, résultats), lus
+        en memmap. Avec rng, l'ordre des lots est tiré au hasard.
+        """
+        arrays = {name: self._array(name) for name in self.FILES}
+        bounds = self.batch_bounds(batch_size)
+        order = rng.permutation(len(bounds)) if rng is not None else range(len(bounds))
+        for number in order:
+            start, size, offset = bounds[number]
+            counts = np.asarray(arrays["counts"][start:start + size], dtype=np.int64)
+            total = int(counts.sum())
+            rows = np.repeat(np.arange(size), counts)
+            yield (rows, np.asarray(arrays["indices"][offset:offset + total], dtype=np.int64),
+                   np.asarray(arrays["values"][offset:offset + total], dtype=np.float64),
+                   np.asarray(arrays["labels"][start:start + size], dtype=np.float64))
+
+
+def iter_labeled_positions(stream: TextIO, skip_plies: int = SKIP_PLIES) -> Iterator[Tuple[ChessEngine.GameState, float]]:
+    """
+    Rejoue les parties terminées d'un flux PGN et produit (position, résultat
+    pour les blancs) à chaque demi-coup, hors ouverture et positions d'échec.
+    """
+    for game in ChessPGN.read_games(stream):
+        label = RESULT_LABELS.get(game.result)
+        if label is None:
+            continue
+        try:
+            game_state = ChessEngine.GameState.from_fen(game.start_fen())
+        except ValueError:
+            continue
+        for ply, san in enumerate(game.moves):
+            if ply >= skip_plies and not game_state.checkForPinsAndChecks()[0]:
+                yield game_state, label
+            move = game_state.parse_san_move(san)
+            if move is None:
+                break
+            game_state.makeMove(move, validate=False)
+
+
+def extract(stream: TextIO, dataset: FeatureDataset, batch_size: int = BATCH_SIZE,
+            skip_plies: int = SKIP_PLIES) -> int:
+    """Ajoute au jeu de données les positions d'un flux PGN, par lots. Retourne leur nombre."""
+    rows: List[Tuple[List[int], List[float], float]] = []
+    count = 0
+    for game_state, label in iter_labeled_positions(stream, skip_plies):
+        features = extract_features(game_state)
+        if features is None:
+            continue
+        rows.append((features[0], features[1], label))
+        if len(rows) >= batch_size:
+            dataset.append(rows)
+            count += len(rows)
+            rows = []
+    if rows:
+        dataset.append(rows)
+        count += len(rows)
+    return count
+
+
+# ------------------------------------------------------------------ réglage
+
+def _probabilities(weights: np.ndarray, scale: float, rows: np.ndarray, indices: np.ndarray,
+                   values: np.ndarray, size: int) -> np.ndarray:
+    scores = np.bincount(rows, weights=values * weights[indices], minlength=size)
+    return 1.0 / (1.0 + np.exp(-scale * scores))
+
+
+def loss(dataset: FeatureDataset, weights: np.ndarray, scale: float, batch_size: int = BATCH_SIZE) -> float:
+    """Perte logistique moyenne de sigmoid(scale × évaluation) par rapport aux résultats."""
+    total, count = 0.0, 0
+    for rows, indices, values, labels in dataset.batches(batch_size):
+        p = np.clip(_probabilities(weights, scale, rows, indices, values, len(labels)), 1e-9, 1 - 1e-9)
+        total += float(-(labels * np.log(p) + (1 - labels) * np.log(1 - p)).sum())
+        count += len(labels)
+    return total / count if count else 0.0
+
+
+def fit_scale(dataset: FeatureDataset, weights: np.ndarray,
+              candidates: Optional[np.ndarray] = None, batch_size: int = BATCH_SIZE) -> float:
+    """Constante K de la sigmoïde qui minimise la perte pour les poids donnés."""
+    candidates = np.geomspace(0.01, 4.0, 40) if candidates is None else candidates
+    return float(min(candidates, key=lambda scale: loss(dataset, weights, scale, batch_size)))
+
+
+def fit(dataset: FeatureDataset, weights: np.ndarray, scale: float, epochs: int = 10,
+        learning_rate: float = 0.01, batch_size: int = BATCH_SIZE, seed: int = 0,
+        output: Callable[[str], None] = print) -> np.ndarray:
+    """
+    Minimise la perte logistique par Adam sur des lots : le gradient d'un lot
+    est calculé en une fois par np.bincount sur les coefficients creux.
+    Retourne les nouveaux poids (weights n'est pas modifié).
+    """
+    weights = weights.astype(float).copy()
+    moment, velocity = np.zeros_like(weights), np.zeros_like(weights)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    rng = np.random.default_rng(seed)
+    step = 0
+    for epoch in range(1, epochs + 1):
+        for rows, indices, values, labels in dataset.batches(batch_size, rng):
+            p = _probabilities(weights, scale, rows, indices, values, len(labels))
+            errors = scale * (p - labels) / len(labels)
+            gradient = np.bincount(indices, weights=values * errors[rows], minlength=len(weights))
+            step += 1
+            moment = beta1 * moment + (1 - beta1) * gradient
+            velocity = beta2 * velocity + (1 - beta2) * gradient ** 2
+            weights -= (learning_rate * (moment / (1 - beta1 ** step))
+                        / (np.sqrt(velocity / (1 - beta2 ** step)) + epsilon))
+        output(f"Époque {epoch}/{epochs} : perte {loss(dataset, weights, scale, batch_size):.5f}")
+    return weights
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Réglage des poids de l'évaluation (méthode de Texel)")
+    parser.add_argument("pgn", nargs="*", help="Parties à ajouter au jeu de données")
+    parser.add_argument("--data", default="tune_data", help="Répertoire du jeu de données")
+    parser.add_argument("--output", default="tuned_params.json")
+    parser.add_argument("--params", default=None, help="Poids de départ (fichier de save_params)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--learning-rate", type=float, default=0.01)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    data = FeatureDataset(args.data)
+    for pgn_path in args.pgn:
+        with open(pgn_path, encoding="utf-8", errors="replace") as pgn_file:
+            print(f"{pgn_path} : {extract(pgn_file, data, args.batch_size)} positions", file=sys.stderr)
+    if not len(data):
+        sys.exit("Jeu de données vide")
+    initial = load_params(args.params) if args.params else current_weights()
+    k = fit_scale(data, initial, batch_size=args.batch_size)
+    print(f"{len(data)} positions, K = {k:.3f}, perte initiale {loss(data, initial, k, args.batch_size):.5f}")
+    tuned = fit(data, initial, k, args.epochs, args.learning_rate, args.batch_size)
+    save_params(args.output, tuned)
+    print(f"Poids écrits dans {args.output}")
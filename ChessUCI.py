@@ -0,0 +1,209 @@
+"""
+Module ChessUCI
+----------------
+Interface UCI sans affichage pour ChessAI. N'importe que ChessEngine et
+ChessAI (pas de pygame), ce qui permet aux gestionnaires de tournoi de lancer
+le moteur en quelques millisecondes.
+
+Commandes prises en charge : uci, isready, ucinewgame, setoption (Hash, Threads),
+position startpos|fen ... [moves ...], go (depth, movetime, wtime, btime, winc,
+binc, movestogo, nodes, infinite), stop, quit.
+
+Usage : python ChessUCI.py
+"""
+
+import sys
+import threading
+import time
+from typing import List, Optional, TextIO
+
+import ChessEngine
+import ChessAI
+import ChessMate
+
+ENGINE_NAME: str = "ChessProject"
+ENGINE_AUTHOR: str = "BryanBlinDorard"
+DEFAULT_HASH_MB: int = 16
+MAX_HASH_MB: int = 1024
+TT_ENTRY_BYTES: int = 300  # Taille approximative d'une entrée de la table de transposition
+MOVE_OVERHEAD: float = 0.05  # Marge de sécurité (secondes) pour les contrôles de temps
+
+
+def format_score(info: ChessAI.SearchInfo) -> str:
+    """Convertit le score de la recherche en 'cp' ou 'mate' pour UCI."""
+    moves_to_mate = ChessAI.mateDistance(info.score)
+    if moves_to_mate is not None:
+        return f"mate {moves_to_mate}"
+    return f"cp {info.score * 100}"
+
+
+class UCIEngine:
+    """
+    Boucle UCI : lit les commandes sur l'entrée standard et lance la recherche
+    dans un thread, afin de pouvoir répondre à 'stop' et 'isready' pendant
+    qu'elle tourne.
+    """
+
+    def __init__(self, output: TextIO = sys.stdout) -> None:
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.game_state = ChessEngine.GameState()
+        self.hash_mb: int = DEFAULT_HASH_MB
+        self.threads: int = 1
+        self.stop_event = threading.Event()
+        self.search_thread: Optional[threading.Thread] = None
+
+    def send(self, line: str) -> None:
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, stream: TextIO = sys.stdin) -> None:
+        for line in stream:
+            if not self.handle(line):
+                break
+        self.stop_search()
+
+    def handle(self, line: str) -> bool:
+        """Traite une commande. Retourne False pour 'quit'."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max {MAX_HASH_MB}")
+            self.send("option name Threads type spin default 1 min 1 max 512")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop_search()
+            self.game_state = ChessEngine.GameState()
+        elif command == "setoption":
+            self.set_option(args)
+        elif command == "position":
+            self.stop_search()
+            self.set_position(args)
+        elif command == "go":
+            self.stop_search()
+            self.go(args)
+        elif command == "stop":
+            self.stop_search()
+        elif command == "quit":
+            return False
+        return True
+
+    def set_option(self, args: List[str]) -> None:
+        if "name" not in args:
+            return
+        value_index = args.index("value") if "value" in args else len(args)
+        name = " ".join(args[args.index("name") + 1:value_index]).lower()
+        value = " ".join(args[value_index + 1:])
+        try:
+            if name == "hash":
+                self.hash_mb = max(1, min(MAX_HASH_MB, int(value)))
+            elif name == "threads":
+                self.threads = max(1, int(value))
+                if self.threads > 1:
+                    self.send("info string la recherche reste mono-thread, Threads est ignoré")
+        except ValueError:
+            self.send(f"info string valeur invalide pour {name} : {value}")
+
+    def set_position(self, args: List[str]) -> None:
+        if not args:
+            return
+        moves_index = args.index("moves") if "moves" in args else len(args)
+        if args[0] == "startpos":
+            game_state = ChessEngine.GameState()
+        elif args[0] == "fen":
+            try:
+                game_state = ChessEngine.GameState.from_fen(" ".join(args[1:moves_index]))
+            except ValueError as e:
+                self.send(f"info string {e}")
+                return
+        else:
+            return
+        for text in args[moves_index + 1:]:
+            move = game_state.parse_uci_move(text)
+            if move is None:
+                self.send(f"info string coup illégal : {text}")
+                break
+            game_state.makeMove(move, validate=False)
+        self.game_state = game_state
+
+    def go(self, args: List[str]) -> None:
+        params = {}
+        infinite = False
+        i = 0
+        while i < len(args):
+            if args[i] == "infinite":
+                infinite = True
+            elif args[i] == "ponder":
+                pass
+            elif i + 1 < len(args):
+                try:
+                    params[args[i]] = int(args[i + 1])
+                except ValueError:
+                    pass
+                i += 1
+            i += 1
+
+        depth = params.get("depth", ChessAI.MAX_DEPTH)
+        start = time.perf_counter()
+        deadline: Optional[float] = None
+        if "movetime" in params:
+            deadline = start + max(0.0, params["movetime"] / 1000 - MOVE_OVERHEAD)
+        else:
+            time_left = params.get("wtime" if self.game_state.white_to_move else "btime")
+            if time_left is not None:
+                increment = params.get("winc" if self.game_state.white_to_move else "binc", 0)
+                moves_to_go = params.get("movestogo", 30)
+                budget = time_left / 1000 / max(1, moves_to_go) + increment / 1000 * 0.8
+                budget = min(budget, max(0.0, time_left / 1000 - MOVE_OVERHEAD))
+                deadline = start + budget
+        if not infinite and deadline is None and "nodes" not in params and "depth" not in params:
+            depth = ChessAI.DEPTH
+
+        self.stop_event.clear()
+        search_info = ChessAI.SearchInfo(max_nodes=params.get("nodes"), deadline=deadline,
+                                         stop_event=self.stop_event, info_callback=self.send_info,
+                                         tt_max_entries=self.hash_mb * 1024 * 1024 // TT_ENTRY_BYTES)
+        self.search_thread = threading.Thread(target=self.search,
+                                              args=(depth, search_info, infinite, params.get("mate")), daemon=True)
+        self.search_thread.start()
+
+    def search(self, depth: int, search_info: ChessAI.SearchInfo, infinite: bool, mate: Optional[int] = None) -> None:
+        valid_moves = self.game_state.getValidMoves()
+        if mate is not None:
+            # 'go mate N' : solveur de mat dédié, sans recherche alpha-beta
+            line, _ = ChessMate.solve_mate(self.game_state, mate, search_info)
+            best_move = line[0] if line else None
+            if line:
+                self.send_info(search_info)
+        else:
+            best_move, _ = ChessAI.searchBestMove(self.game_state, valid_moves, depth, search_info)
+        if best_move is None and valid_moves:
+            best_move = valid_moves[0]
+        if infinite:
+            # En mode infini, 'bestmove' n'est envoyé qu'après 'stop'
+            self.stop_event.wait()
+        self.send(f"bestmove {best_move.getUCINotation() if best_move else '0000'}")
+
+    def send_info(self, info: ChessAI.SearchInfo) -> None:
+        elapsed = info.elapsed()
+        nps = int(info.nodes / elapsed) if elapsed > 0 else 0
+        pv = " ".join(move.getUCINotation() for move in info.pv)
+        self.send(f"info depth {info.depth} score {format_score(info)} nodes {info.nodes} "
+                  f"nps {nps} time {int(elapsed * 1000)} pv {pv}".rstrip())
+
+    def stop_search(self) -> None:
+        if self.search_thread is not None:
+            self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+
+if __name__ == "__main__":
+    UCIEngine().run()
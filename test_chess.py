@@ -1,8 +1,30 @@
 import unittest
+from unittest import mock
 import time
 from multiprocessing import Process, Queue
 import ChessEngine
 import ChessAI
+import ChessBench
+import ChessUCI
+import ChessMatch
+import ChessAnalysis
+import ChessPGN
+import ChessSave
+import ChessCache
+import ChessDatabase
+import ChessMate
+import ChessEval
+import ChessTune
+import ChessExport
+import ChessPerft
+import ChessSoak
+import io
+import multiprocessing
+import json
+import os
+import pickle
+import random
+import tempfile
 import numpy as np
 
 from enum import Enum
@@ -49,9 +71,33 @@ class TestChessRules(unittest.TestCase):
         castling_moves = [m for m in valid_moves if m.is_castle_move]
         self.assertTrue(len(castling_moves) >= 1, "Au moins un roque devrait être possible")
 
+    def test_undo_restores_state(self):
+        # Faire puis annuler des coups restaure exactement roques, en passant, compteur et clé
+        fen = "r3k2r/8/8/3pP3/8/8/8/R3K2R w KQkq d6 3 20"
+        game = ChessEngine.GameState.from_fen(fen)
+        key = game.get_position_key()
+        for text in ("a1b1", "e1f1", "e5d6", "h1h8"):
+            game.makeMove(game.parse_uci_move(text), validate=False)
+            self.assertEqual(game.get_position_key(), game.compute_position_key())
+            game.undoMove()
+            self.assertEqual(game.get_fen(), fen)
+        self.assertEqual(game.get_position_key(), key)
+        self.assertEqual(game.position_history, {key: 1})
+
+    def test_piece_lists(self):
+        # Cases occupées et signature matérielle suivent captures, promotions et annulations
+        game = ChessEngine.GameState.from_fen("3r2k1/4P3/8/8/8/8/8/4K3 w - - 0 1")
+        self.assertEqual(game.material_signature(), "KPvKR")
+        game.makeMove(game.parse_uci_move("e7d8q"), validate=False)
+        self.assertEqual(game.material_signature(), "KQvK")
+        self.assertEqual(game.get_piece_squares("w"), {(0, 3), (7, 4)})
+        game.undoMove()
+        self.assertEqual(game.material_signature(), "KPvKR")
+        self.assertEqual(game.get_piece_squares("b"), {(0, 3), (0, 6)})
+
     def test_repetition(self):
         # Simule la répétition de la position
-        initial_hash = self.game.get_board_hash_str()
+        initial_hash = self.game.get_position_key()
         move = self.game.getValidMoves()[0]
         self.game.makeMove(move, validate=False)
         self.game.undoMove()
@@ -67,6 +113,97 @@ class TestChessRules(unittest.TestCase):
         valid_moves = self.game.getValidMoves()
         self.assertEqual(len(valid_moves), 0, "La règle des 50 coups doit provoquer un draw (aucun mouvement)")
 
+    def test_terminal_detection(self):
+        # has_legal_move et is_draw ne générent pas la liste et ne modifient pas l'état
+        self.assertTrue(self.game.has_legal_move())
+        self.assertFalse(self.game.is_draw())
+        mate = ChessEngine.GameState.from_fen("3R2k1/5ppp/8/8/8/8/8/6K1 b - - 0 1")
+        self.assertFalse(mate.has_legal_move())
+        self.assertFalse(mate.checkmate)
+        self.assertIsNone(mate._legal_moves)
+        # Pat : toutes les cases du roi sont contrôlées
+        stalemate = ChessEngine.GameState.from_fen("7k/8/6QK/8/8/8/8/8 b - - 0 1")
+        self.assertFalse(stalemate.has_legal_move())
+        # L'échec se pare par interposition du fou
+        blocked = ChessEngine.GameState.from_fen("3R2k1/5ppp/8/8/8/b7/8/6K1 b - - 0 1")
+        self.assertTrue(blocked.has_legal_move())
+        self.assertTrue(ChessEngine.GameState.from_fen("4k3/8/8/8/8/8/4P3/R3K3 w - - 100 80").is_draw())
+
+    def test_fen(self):
+        # La position initiale et une position quelconque doivent survivre à un aller-retour FEN
+        self.assertEqual(self.game.get_fen(), ChessEngine.START_FEN)
+        fen = "r3k2r/ppp2ppp/2n1bn2/3qp3/3P4/2N1BN2/PPP2PPP/R2QK2R b Kq d3 0 9"
+        game = ChessEngine.GameState.from_fen(fen)
+        self.assertEqual(game.get_fen(), fen)
+        self.assertEqual(game.enpassant_possible, (5, 3))
+        self.assertEqual(game.white_king_location, (7, 4))
+        for invalid in ("4k3/8/8/8/8/8/8/K7 w - z9 0 1", "4k3/8/8/8/8/8/8/K7 w - e4 0 1", "4k3/8/8/8/8/8/8/K7 w - e 0 1",
+                        "4k3/8/8/8/8/8/8/K7 w - - x 1", "4k3/8/8/8/8/8/8/K7 w - - 0 y", "8/8/8/8/8/8/8/8 w - - 0 1",
+                        "4k3/8/8/8/8/8/8/KK6 w - - 0 1", "4k3/8/8/8/8/8/8/K7 x - - 0 1"):
+            with self.assertRaises(ValueError):
+                ChessEngine.GameState.from_fen(invalid)
+        # Une FEN rejetée laisse la position et les historiques intacts
+        self.game.makeMove(self.game.parse_uci_move("e2e4"), validate=False)
+        before = (self.game.get_fen(), self.game.white_king_location, self.game.black_king_location,
+                  len(self.game.move_log), len(self.game.undo_stack), dict(self.game.position_history))
+        for invalid in ("4k3/8/8/8/8/8/8/K7 w - e9 0 1", "4k3/8/8/8/8/8/8/K7 w - - x 1"):
+            with self.assertRaises(ValueError):
+                self.game.load_fen(invalid)
+            self.assertEqual((self.game.get_fen(), self.game.white_king_location, self.game.black_king_location,
+                              len(self.game.move_log), len(self.game.undo_stack), dict(self.game.position_history)),
+                             before)
+
+    def test_pickle_state(self):
+        # Seules la position et les répétitions atteignables sont transmises
+        for _ in range(2):
+            for text in ("g1f3", "g8f6", "f3g1", "f6g8"):
+                self.game.makeMove(self.game.parse_uci_move(text), validate=False)
+        short_size = len(pickle.dumps(self.game))
+        for _ in range(20):
+            for text in ("g1f3", "g8f6", "f3g1", "f6g8"):
+                self.game.makeMove(self.game.parse_uci_move(text), validate=False)
+        copy = pickle.loads(pickle.dumps(self.game))
+        self.assertEqual(copy.get_fen(), self.game.get_fen())
+        self.assertEqual(copy.get_position_key(), self.game.get_position_key())
+        self.assertEqual(copy.position_history[copy.get_position_key()], 23)
+        self.assertLessEqual(len(pickle.dumps(self.game)), short_size + 4)  # Seul le numéro de coup grandit
+        self.assertEqual(len(copy.getValidMoves()), len(self.game.getValidMoves()))  # Nulle par répétition conservée
+
+    def test_move_index(self):
+        # Les coups sont retrouvés par case de départ et par couple (départ, arrivée)
+        self.assertEqual(sorted(m.getUCINotation() for m in self.game.get_moves_from((6, 4))), ["e2e3", "e2e4"])
+        self.assertEqual(self.game.get_move((7, 6), (5, 5)).getUCINotation(), "g1f3")
+        self.assertIsNone(self.game.get_move((7, 6), (5, 6)))
+        # En cas de nulle, aucun coup valide mais les coups légaux restent indexés
+        game = ChessEngine.GameState.from_fen("4k3/8/8/8/8/8/4P3/R3K3 w - - 100 80")
+        self.assertEqual(game.get_moves_from((6, 4)), [])
+        self.assertEqual(len(game.get_moves_from((6, 4), legal=True)), 2)
+
+    def test_san(self):
+        # Désambiguïsation, échec et roque en notation algébrique standard
+        game = ChessEngine.GameState.from_fen("4k3/8/8/8/8/8/4K3/R6R w - - 0 1")
+        moves = {m.getUCINotation(): m for m in game.getValidMoves()}
+        self.assertEqual(game.get_san(moves["a1d1"]), "Rad1")
+        self.assertEqual(game.get_san(moves["a1a8"]), "Ra8+")
+        game = ChessEngine.GameState.from_fen("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1")
+        castle = next(m for m in game.getValidMoves() if m.getUCINotation() == "e1g1")
+        self.assertEqual(game.get_san(castle), "O-O")
+        game = ChessEngine.GameState.from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        mate = next(m for m in game.getValidMoves() if m.getUCINotation() == "d1d8")
+        self.assertEqual(game.get_san(mate), "Rd8#")
+
+    def test_parse_promotion_copies_move(self):
+        # Analyser une sous-promotion sans la jouer ne modifie pas les coups en cache
+        game = ChessEngine.GameState.from_fen("8/P6k/8/8/8/8/7p/K7 w - - 0 1")
+        self.assertEqual(game.parse_uci_move("a7a8n").promotion_choice, "N")
+        self.assertEqual(game.parse_san_move("a8=R").promotion_choice, "R")
+        self.assertIn("a7a8q", [m.getUCINotation() for m in game.getValidMoves()])
+        game.makeMove(game.get_move((1, 0), (0, 0)), validate=False)
+        self.assertEqual(game.board[0][0], "wQ")
+        game.undoMove()
+        game.makeMove(game.parse_uci_move("a7a8n"))
+        self.assertEqual(game.board[0][0], "wN")
+
 class TestAI(unittest.TestCase):
     def setUp(self):
         self.game = ChessEngine.GameState()
@@ -87,5 +224,383 @@ class TestAI(unittest.TestCase):
         else:
             self.fail("Aucun coup n'a été renvoyé par l'IA")
 
+    def test_mate_search(self):
+        # Le solveur trouve le mat le plus court ; la recherche principale distingue les distances de mat
+        game = ChessEngine.GameState.from_fen("2r3k1/p4p2/3Rp2p/1p2P1pK/8/1P4P1/P3Q2P/1q6 b - - 0 1")
+        line, info = ChessMate.solve_mate(game, 4)
+        self.assertEqual([m.getUCINotation() for m in line], ["b1g6", "h5g4", "g6f5", "g4h5", "f5h3"])
+        self.assertEqual(ChessAI.mateDistance(info.score), 3)
+        self.assertIsNone(ChessMate.solve_mate(game, 2)[0])
+        game = ChessEngine.GameState.from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        best_move, info = ChessAI.searchBestMove(game, game.getValidMoves(), 3)
+        self.assertEqual(best_move.getUCINotation(), "d1d8")
+        self.assertEqual(ChessAI.mateDistance(info.score), 1)
+
+    def test_mate_ignores_draw_rules(self):
+        # Une pièce de plus ou un compteur des 50 coups arrivant à 100 ne changent rien au mat
+        for fen, mate in (("7k/8/6K1/8/8/8/8/Q7 w - - 0 1", "a1a8"), ("6k1/8/6K1/8/8/8/8/R7 w - - 0 1", "a1a8"),
+                          ("6k1/5ppp/8/8/8/8/8/R5K1 w - - 99 80", "a1a8")):
+            line = ChessMate.solve_mate(ChessEngine.GameState.from_fen(fen), 2)[0]
+            self.assertEqual([move.getUCINotation() for move in line], [mate])
+
+    def test_pawn_structure(self):
+        # Blancs : pions doublés en c, trois pions isolés et passés ; noirs : pion isolé et passé non avancé
+        params = dict(ChessAI.EVAL_PARAMS, doubled_pawn_penalty=1, isolated_pawn_penalty=10,
+                      backward_pawn_penalty=0, passed_pawn_bonus=100)
+        score = ChessEval.pawn_structure_score([(3, 2), (4, 2), (3, 0)], [(1, 7)], params)
+        self.assertEqual(score, -1 - 10 * 3 + 100 * (3 + 2 + 3) + 10)
+        game = ChessEngine.GameState.from_fen("4k3/8/8/P1P5/2P5/8/7p/4K3 w - - 0 1")
+        table = ChessEval.HashTable(4)
+        first = ChessEval.pawn_score(game, params, table)
+        self.assertEqual(ChessEval.pawn_score(game, params, table), first)
+        self.assertEqual(table.hit_rate(), 0.5)
+
+class TestBench(unittest.TestCase):
+    def test_bench_signature(self):
+        # Le bench est déterministe et explore exactement le nombre de noeuds enregistré
+        nodes_1, _ = ChessBench.run_bench(depth=2, output=lambda line: None)
+        nodes_2, _ = ChessBench.run_bench(depth=2, output=lambda line: None)
+        self.assertEqual(nodes_1, nodes_2, "Le bench doit être déterministe")
+        self.assertEqual(nodes_1, ChessBench.SIGNATURES[2], "Signature modifiée : mettre à jour SIGNATURES")
+
+class TestMatch(unittest.TestCase):
+    def test_elo_difference(self):
+        # Score de 50 % : écart nul ; score de 75 % : environ +191 Elo
+        self.assertEqual(ChessMatch.elo_difference(5, 0, 5)[0], 0.0)
+        self.assertAlmostEqual(ChessMatch.elo_difference(3, 0, 1)[0], 190.8, places=1)
+
+    def test_adjudication(self):
+        # Mat, 50 coups, matériel insuffisant et répétition terminent la partie
+        for fen, expected in (("3R2k1/5ppp/8/8/8/8/8/6K1 b - - 0 1", ("1-0", "checkmate")),
+                              ("4k3/8/8/8/8/8/4P3/R3K3 w - - 100 80", ("1/2-1/2", "fifty-move rule")),
+                              ("4k3/8/8/8/8/8/8/4K3 w - - 0 1", ("1/2-1/2", "insufficient material"))):
+            game_state = ChessEngine.GameState.from_fen(fen)
+            game_state.getValidMoves()
+            self.assertEqual(ChessMatch.adjudicate(game_state), expected)
+        game_state = ChessEngine.GameState()
+        for _ in range(2):
+            for text in ("g1f3", "g8f6", "f3g1", "f6g8"):
+                game_state.makeMove(game_state.parse_uci_move(text), validate=False)
+        game_state.getValidMoves()
+        self.assertEqual(ChessMatch.adjudicate(game_state), ("1/2-1/2", "threefold repetition"))
+        self.assertIsNone(ChessMatch.adjudicate(ChessEngine.GameState()))
+
+    def test_eval_params_override(self):
+        # Les poids d'une configuration ne valent que pendant sa recherche
+        saved = dict(ChessAI.EVAL_PARAMS)
+        seen = []
+        engine = ChessMatch.EngineConfig("B", 1, eval_params={"mobility_bonus": 0.0})
+        with mock.patch.object(ChessAI, "searchBestMove",
+                               side_effect=lambda *args: seen.append(dict(ChessAI.EVAL_PARAMS)) or (None, ChessAI.SearchInfo())):
+            engine.search(ChessEngine.GameState(), [])
+        self.assertEqual(seen[0]["mobility_bonus"], 0.0)
+        self.assertEqual(ChessAI.EVAL_PARAMS, saved)
+
+    def test_eval_caches_per_config(self):
+        # Deux configurations aux poids différents qui alternent gardent chacune leur cache d'évaluation
+        game_state = ChessEngine.GameState()
+        engine_a = ChessMatch.EngineConfig("A", 1)
+        engine_b = ChessMatch.EngineConfig("B", 1, eval_params={"mobility_bonus": 0.0})
+        ChessAI.clear_eval_caches()
+        for engine in (engine_a, engine_b):
+            engine.search(game_state, list(game_state.getValidMoves()))
+            self.assertEqual(ChessAI.EVAL_CACHE.hits, 0)
+        for engine in (engine_a, engine_b):
+            engine.search(game_state, list(game_state.getValidMoves()))
+            # La seconde recherche ne trouve que des positions déjà évaluées avec ces poids
+            self.assertGreater(ChessAI.EVAL_CACHE.hits, 0)
+            self.assertEqual(ChessAI.EVAL_CACHE.hits, ChessAI.EVAL_CACHE.probes // 2)
+
+    def test_run_match(self):
+        # Deux parties à profondeur 1, couleurs inversées, écrites en PGN au fil de l'eau
+        output = io.StringIO()
+        saved = dict(ChessAI.EVAL_PARAMS)
+        engine_a = ChessMatch.EngineConfig("A", 1)
+        engine_b = ChessMatch.EngineConfig("B", 1, eval_params={"mobility_bonus": 0.0})
+        summary = ChessMatch.run_match(2, engine_a, engine_b, output, workers=1, output=lambda line: None)
+        self.assertEqual(ChessAI.EVAL_PARAMS, saved)
+        self.assertEqual(summary["wins"] + summary["draws"] + summary["losses"], 2)
+        games = list(ChessPGN.read_games(io.StringIO(output.getvalue())))
+        self.assertEqual(len(games), 2)
+        self.assertEqual(sorted((g.headers["White"], g.headers["Black"]) for g in games), [("A", "B"), ("B", "A")])
+        for game in games:
+            self.assertIn(game.result, ("1-0", "0-1", "1/2-1/2"))
+            self.assertEqual(game.headers["Result"], game.result)
+            self.assertIn("Termination", game.headers)
+            self.assertEqual(game.moves[:5], ["e4", "e5", "Nf3", "Nc6", "Bb5"])
+            final = game.replay()
+            final.getValidMoves()
+            self.assertEqual(ChessMatch.adjudicate(final), (game.result, game.headers["Termination"]))
+
+class TestAnalysis(unittest.TestCase):
+    def test_batch_analysis(self):
+        # Une FEN et une partie de deux demi-coups donnent quatre résultats
+        items = ["6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", ["e2e4", "e7e5"]]
+        results = {r["id"]: r for r in ChessAnalysis.analyse(items, depth=1, workers=1, max_in_flight=2)}
+        self.assertEqual(set(results), {0, (1, 0), (1, 1), (1, 2)})
+        self.assertEqual(results[0]["best_move"], "d1d8")
+        self.assertIsNone(results[(1, 2)]["error"])
+        self.assertGreater(results[(1, 2)]["nodes"], 0)
+
+    def test_invalid_inputs(self):
+        # Une FEN invalide donne un résultat en erreur sans interrompre le lot
+        items = ["8/8/8/8/8/8/8/8 w - z9 0 1", ("not a fen", ["e2e4"]), ["e2e4"]]
+        results = {r["id"]: r for r in ChessAnalysis.analyse(items, depth=1, workers=2)}
+        self.assertEqual(set(results), {0, (1, 0), (2, 0), (2, 1)})
+        self.assertIsNotNone(results[0]["error"])
+        self.assertIsNotNone(results[(1, 0)]["error"])
+        self.assertIsNone(results[(2, 1)]["error"])
+        self.assertIn("ValueError", ChessAnalysis.analyse_position((0, "8/8 w", [], 1, None, None))["error"])
+
+class TestPGN(unittest.TestCase):
+    PGN_TEXT = """[Event "Test"]
+[White "A"]
+[Black "B"]
+
+1. e4 {commentaire
+sur deux lignes} e5 2. Nf3 (2. f4 exf4) Nc6 $1 3. Bc4 Nf6 4. 0-0 Be7 5. d4 exd4 6.e5 d5!? 1/2-1/2
+
+[Event "Promotion"]
+[SetUp "1"]
+[FEN "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"]
+
+1. a8=N Kd7 *
+"""
+
+    def test_read_and_replay(self):
+        # Lecture paresseuse : commentaires, variantes, NAG et roque « 0-0 » sont gérés
+        games = list(ChessPGN.iter_replayed(io.StringIO(self.PGN_TEXT)))
+        self.assertEqual(len(games), 2)
+        game, game_state = games[0]
+        self.assertEqual(game.result, "1/2-1/2")
+        self.assertEqual(len(game_state.move_log), 12)
+        self.assertEqual(game_state.get_fen(), "r1bqk2r/ppp1bppp/2n2n2/3pP3/2Bp4/5N2/PPP2PPP/RNBQ1RK1 w kq d6 0 7")
+        # La promotion en cavalier est conservée malgré le matériel insuffisant
+        self.assertEqual(games[1][1].board[0][0], "wN")
+
+    def test_write_round_trip(self):
+        # Écrire puis relire une partie redonne la même position
+        game, game_state = next(ChessPGN.iter_replayed(io.StringIO(self.PGN_TEXT)))
+        text = ChessPGN.game_to_pgn(game_state, game.headers, game.result)
+        self.assertIn("4. O-O Be7", text)
+        _, replayed = next(ChessPGN.iter_replayed(io.StringIO(text)))
+        self.assertEqual(replayed.get_fen(), game_state.get_fen())
+        # Les en-têtes avec barre oblique inverse et guillemet final survivent à l'aller-retour
+        headers = {"Event": 'a\\b "q"', "Site": "\\", "Round": "1"}
+        text = ChessPGN.format_pgn(headers, ["e4"], "*")
+        self.assertEqual(next(ChessPGN.read_games(io.StringIO(text))).headers, headers)
+
+class TestSave(unittest.TestCase):
+    def test_save_and_journal(self):
+        # Roque, en passant et sous-promotion survivent à la sauvegarde et au journal
+        game_state = ChessEngine.GameState.from_fen("r3k2r/1P6/8/8/3pP3/8/8/R3K2R b KQkq e3 0 1")
+        with tempfile.TemporaryDirectory() as directory:
+            journal = ChessSave.GameJournal(os.path.join(directory, "partie.journal"))
+            journal.start(game_state)
+            for text in ("d4e3", "e1g1", "e8c8", "b7c8n"):
+                move = game_state.parse_uci_move(text)
+                game_state.makeMove(move, validate=False)
+                journal.record_move(move)
+            game_state.undoMove()
+            journal.record_undo()
+            save_path = os.path.join(directory, "partie.cps")
+            ChessSave.save_game(game_state, save_path)
+            self.assertEqual(ChessSave.load_game(save_path).get_fen(), game_state.get_fen())
+            # Une écriture interrompue (octet isolé) est ignorée à la récupération
+            journal.stream.write(b"\x01")
+            journal.close()
+            self.assertEqual(ChessSave.load_game(journal.path).get_fen(), game_state.get_fen())
+            game_state.makeMove(game_state.parse_uci_move("b7c8n"), validate=False)
+            ChessSave.save_game(game_state, save_path)
+            self.assertEqual(ChessSave.load_game(save_path).board[0][2], "wN")
+
+class TestCache(unittest.TestCase):
+    def test_analysis_cache(self):
+        # Une analyse plus profonde remplace la précédente ; les roques distinguent les positions
+        game_state = ChessEngine.GameState()
+        move = game_state.parse_uci_move("e2e4")
+        with tempfile.TemporaryDirectory() as directory:
+            with ChessCache.AnalysisCache(os.path.join(directory, "cache.sqlite"), max_entries=10) as cache:
+                cache.store(game_state, 3, ChessAI.EVAL_PARAMS, move, 12, [move])
+                cache.store(game_state, 2, ChessAI.EVAL_PARAMS, game_state.parse_uci_move("d2d4"), 5, [])
+                self.assertEqual(cache.lookup(game_state, 3, ChessAI.EVAL_PARAMS)["move"], "e2e4")
+                self.assertIsNone(cache.lookup(game_state, 4, ChessAI.EVAL_PARAMS))
+                self.assertIsNone(cache.lookup(game_state, 3, {}))
+                no_castling = ChessEngine.GameState.from_fen(ChessEngine.START_FEN.replace("KQkq", "-"))
+                self.assertIsNone(cache.lookup(no_castling, 1, ChessAI.EVAL_PARAMS))
+                for text in ("e2e4", "e7e5", "g1f3", "b8c6", "f1b5", "a7a6", "b5a4", "g8f6", "e1g1", "f8e7", "f1e1"):
+                    game_state.makeMove(game_state.parse_uci_move(text), validate=False)
+                    cache.store(game_state, 1, {}, game_state.getValidMoves()[0], 0, [])
+                self.assertLessEqual(len(cache), 10)
+
+    def test_cache_in_spawned_process(self):
+        # Le chemin du cache est transmis au processus de l'IA, même démarré par spawn
+        context = multiprocessing.get_context("spawn")
+        game_state = ChessEngine.GameState.from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.sqlite")
+            return_queue = context.Queue()
+            process = context.Process(target=ChessAI.findBestMove,
+                                      args=(game_state, game_state.getValidMoves(), return_queue, path))
+            process.start()
+            self.assertEqual(return_queue.get(timeout=60).getUCINotation(), "d1d8")
+            process.join()
+            with ChessCache.AnalysisCache(path) as cache:
+                self.assertEqual(cache.lookup(game_state, ChessAI.DEPTH, ChessAI.EVAL_PARAMS)["move"], "d1d8")
+
+class TestDatabase(unittest.TestCase):
+    def test_position_index(self):
+        # Les positions sont retrouvées avant et après fusion de l'index, avec les statistiques de coups
+        with tempfile.TemporaryDirectory() as directory:
+            with ChessDatabase.GameDatabase(directory) as database:
+                for moves, result in ((["e2e4", "e7e5", "g1f3"], "1-0"), (["d2d4", "d7d5"], "1/2-1/2"),
+                                      (["g1f3", "e7e5", "e2e4"], "0-1")):
+                    game_state = ChessEngine.GameState()
+                    for text in moves:
+                        game_state.makeMove(game_state.parse_uci_move(text), validate=False)
+                    database.add_game_state(game_state, result)
+                database.compact()
+                database.add_game(ChessEngine.START_FEN, [ChessSave.encode_move(ChessEngine.GameState().parse_uci_move("e2e4"))], "*")
+                game_state = ChessEngine.GameState()
+                stats = database.move_stats(game_state)
+                self.assertEqual(stats["e2e4"], {"games": 2, "white": 1, "draws": 0, "black": 0})
+                self.assertEqual(stats["g1f3"]["black"], 1)
+                for text in ("e2e4", "e7e5", "g1f3"):
+                    game_state.makeMove(game_state.parse_uci_move(text), validate=False)
+                self.assertEqual(sorted(database.find(game_state)), [(0, 3), (2, 3)])
+                self.assertEqual(database.load_game(2).board, game_state.board)  # Même position par transposition
+
+    def test_pending_cache_and_fen_offsets(self):
+        # Les positions ajoutées après la lecture des positions en attente sont retrouvées ;
+        # chaque partie est rechargée depuis sa propre FEN de départ
+        fens = ["4k3/8/8/8/8/8/4P3/4K3 w - - 0 1", ChessEngine.START_FEN, "4k3/4p3/8/8/8/8/8/4K3 b - - 0 1"]
+        with tempfile.TemporaryDirectory() as directory:
+            with ChessDatabase.GameDatabase(directory) as database:
+                for fen in fens:
+                    game_state = ChessEngine.GameState.from_fen(fen)
+                    game_state.makeMove(game_state.getLegalMoves()[0], validate=False)
+                    self.assertEqual(database.find(game_state), [])
+                    database.add_game_state(game_state, "*")
+                    self.assertEqual(len(database.find(game_state)), 1)
+                for game_id, fen in enumerate(fens):
+                    self.assertEqual(database.load_game(game_id).start_fen, fen)
+                    self.assertEqual(len(database.load_game(game_id).move_log), 1)
+            with ChessDatabase.GameDatabase(directory) as database:
+                self.assertEqual(len(database.pending()), 6)
+
+class TestTune(unittest.TestCase):
+    def test_features_and_fit(self):
+        # Les coefficients multipliés par les poids redonnent staticEval ; le réglage fait baisser la perte
+        weights = ChessTune.current_weights()
+        pgn = ('[Result "1-0"]\n\n1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4. c3 Nf6 5. d4 exd4 6. cxd4 Bb4+ 7. Bd2 Bxd2+ '
+               '8. Nbxd2 d5 9. exd5 Nxd5 10. Qb3 Nce7 11. O-O c6 12. Rfe1 O-O 1-0\n')
+        for game_state, label in ChessTune.iter_labeled_positions(io.StringIO(pgn), skip_plies=0):
+            self.assertEqual(label, 1.0)
+            indices, values = ChessTune.extract_features(game_state)
+            ChessAI.EVAL_CACHE.clear()
+            self.assertAlmostEqual(sum(weights[i] * v for i, v in zip(indices, values)),
+                                   ChessAI.staticEval(game_state)[0])
+        with tempfile.TemporaryDirectory() as directory:
+            dataset = ChessTune.FeatureDataset(directory)
+            self.assertEqual(ChessTune.extract(io.StringIO(pgn), dataset, batch_size=5, skip_plies=0), 22)
+            self.assertEqual(len(dataset), 22)
+            scale = ChessTune.fit_scale(dataset, weights, batch_size=8)
+            tuned = ChessTune.fit(dataset, weights, scale, epochs=2, batch_size=8, output=lambda text: None)
+            self.assertLess(ChessTune.loss(dataset, tuned, scale), ChessTune.loss(dataset, weights, scale))
+            path = os.path.join(directory, "params.json")
+            ChessTune.save_params(path, tuned)
+            try:
+                loaded = ChessTune.load_params(path)
+                self.assertTrue(np.allclose(loaded, ChessTune.current_weights()))
+                self.assertTrue(np.allclose(loaded, tuned, atol=1e-3))
+            finally:
+                ChessTune.apply_weights(weights)
+
+class TestExport(unittest.TestCase):
+    def test_tensor_shards(self):
+        # Les positions sont réparties en fichiers .npy de taille fixe, le dernier ramené à sa taille
+        pgn = '[Result "0-1"]\n\n1. e4 d5 2. e5 f5 3. exf6 Nxf6 0-1\n\n[Result "1-0"]\n\n1. d4 1-0\n'
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(ChessExport.export_pgn(io.StringIO(pgn), directory, shard_size=4, chunk_size=3), 7)
+            shards = ChessExport.load_shards(directory, "planes")
+            self.assertEqual([shard.shape for shard in shards], [(4, 12, 8, 8), (3, 12, 8, 8)])
+            planes = np.concatenate(shards)
+            features = np.concatenate(ChessExport.load_shards(directory, "features"))
+            moves = np.concatenate(ChessExport.load_shards(directory, "moves"))
+            results = np.concatenate(ChessExport.load_shards(directory, "results"))
+            del shards
+        self.assertTrue((planes[0] == ChessExport.position_planes(ChessEngine.GameState())).all())
+        self.assertEqual(planes[5].sum(), 31)  # Après exf6 en passant
+        self.assertEqual(features[4][ChessExport.FEATURE_NAMES.index("ep_f")], 1)
+        self.assertEqual(features[1][ChessExport.FEATURE_NAMES.index("white_to_move")], 0)
+        self.assertEqual(int(moves[0]), ChessSave.encode_move(ChessEngine.GameState().parse_uci_move("e2e4")))
+        self.assertEqual(results.tolist(), [2] * 6 + [1])
+
+class TestPerft(unittest.TestCase):
+    def test_reference_counts(self):
+        # Roques, prises en passant clouées (position 3) et promotions (position 4)
+        for name, depth in (("kiwipete", 2), ("position 3", 3), ("position 4", 3)):
+            fen, expected = ChessPerft.REFERENCE_POSITIONS[name]
+            self.assertEqual(ChessPerft.perft(ChessEngine.GameState.from_fen(fen), depth), expected[depth - 1], name)
+        counts = ChessPerft.parallel_divide(ChessEngine.GameState(), 3, processes=2, hash_bits=12)
+        self.assertEqual(len(counts), 20)
+        self.assertEqual(counts["e2e4"], 600)
+        self.assertEqual(sum(counts.values()), 8902)
+
+    def test_castling_rights_after_rook_capture(self):
+        # Prendre une tour hors de sa case d'origine ne retire pas de droit de roque
+        game_state = ChessEngine.GameState.from_fen("r3k3/8/8/8/8/1N6/8/r5K1 w q - 0 1")
+        game_state.makeMove(game_state.parse_uci_move("b3a1"), validate=False)
+        self.assertEqual(game_state.castling, ChessEngine.CASTLE_BQS)
+
+class TestSoak(unittest.TestCase):
+    def test_soak_profile(self):
+        # Une mesure par demi-coup ; une hausse du coût au cours de la partie fait échouer le banc
+        rows = ChessSoak.soak(plies=30, depth=0, seed=1)
+        self.assertEqual([row["ply"] for row in rows], list(range(1, 31)))
+        self.assertTrue(all(row["pickled_bytes"] > 0 and row["peak_bytes"] > 0 for row in rows))
+        self.assertEqual(ChessSoak.summarize(rows, max_time_growth=float("inf"))["plies"], 30)
+        # Seuls les coûts rapportés à la copie sans historique comptent : le temps brut de recherche non
+        steady = [dict(row, make_ms=1.0, undo_ms=1.0, movegen_ms=1.0, base_make_ms=1.0, base_undo_ms=1.0,
+                       base_movegen_ms=1.0, traced_bytes=1000, pickled_bytes=100) for row in rows]
+        self.assertTrue(ChessSoak.summarize([dict(row, search_ms=float(row["ply"])) for row in steady])["passed"])
+        self.assertFalse(ChessSoak.summarize([dict(row, undo_ms=float(row["ply"])) for row in steady])["passed"])
+        self.assertFalse(ChessSoak.summarize([dict(row, pickled_bytes=20 * row["ply"]) for row in steady])["passed"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "soak.json")
+            ChessSoak.write_profile(path, rows, ChessSoak.summarize(rows))
+            with open(path) as profile:
+                self.assertEqual(len(json.load(profile)["plies"]), 30)
+
+    def test_soak_searches_every_ply(self):
+        # Nulle par la règle des 50 coups dès le départ : chaque demi-coup doit malgré tout être cherché
+        rows = ChessSoak.soak(plies=4, depth=1, script=["Ra2", "Ra7", "Ra1", "Ra8"],
+                              start_fen="r3k3/8/8/8/8/8/8/R3K3 w - - 100 80")
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(all(row["search_nodes"] > 0 for row in rows))
+        limits = {"max_time_growth": float("inf"), "max_memory_slope": float("inf"), "max_pickle_slope": float("inf")}
+        self.assertTrue(ChessSoak.summarize(rows, **limits)["passed"])
+        rows[2]["search_nodes"] = 0
+        self.assertFalse(ChessSoak.summarize(rows, **limits)["passed"])
+        # La partie aléatoire évite les nulles : aucune position jouée n'en est une
+        game_state, rng = ChessEngine.GameState(), random.Random(3)
+        for _ in range(40):
+            game_state.makeMove(ChessSoak.choose_move(game_state, rng), validate=False)
+            self.assertFalse(game_state.is_draw())
+
+class TestUCI(unittest.TestCase):
+    def test_position_and_go(self):
+        # Le moteur UCI doit jouer le mat en un coup et renvoyer 'bestmove'
+        output = io.StringIO()
+        engine = ChessUCI.UCIEngine(output)
+        engine.handle("position startpos moves e2e4 e7e5")
+        self.assertEqual(len(engine.game_state.move_log), 2)
+        engine.handle("position fen 6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        engine.handle("go depth 2")
+        engine.search_thread.join()
+        lines = output.getvalue().splitlines()
+        self.assertIn("bestmove d1d8", lines)
+        self.assertTrue(any(line.startswith("info depth 2") for line in lines))
+
 if __name__ == "__main__":
     unittest.main()